@@ -190,12 +190,29 @@ class DeploymentAnalyzer:
     Class for analyzing deployment data from Excel/CSV files.
     """
     
+    # Colorbar labels for the pivot table layers
+    LAYER_LABELS = {
+        'mean': 'Average Delay (minutes)',
+        'count': 'Number of Images',
+        'max': 'Maximum Delay (minutes)'
+    }
+    
     def __init__(self):
         """Initialize the analyzer with empty data structures."""
         self.df = None
         self.cleaned_data = None
         self.pivot_table = None
+        self.pivot_layer = 'mean'
         self.loaded_files = []
+        self._arrival_keys = None
+        self._arrival_first_valid = 0
+        self._delay_prefix_count = None
+        self._delay_prefix_sum = None
+        self._delay_min_values = None
+        self._delay_max_values = None
+        self._delay_block_size = 1
+        self._delay_block_min = None
+        self._delay_block_max = None
         
     def import_file(self, file_path):
         """
@@ -336,13 +353,182 @@ class DeploymentAnalyzer:
                 df['Monat'] = df['Bildankunft'].dt.month
                 df['Jahr'] = df['Bildankunft'].dt.year
                 
+                # Keep rows sorted by arrival time so periods can be sliced by binary search
+                df = df.sort_values('Bildankunft', kind='mergesort', na_position='first')
+                
             self.cleaned_data = df
+            self._build_time_index()
             return df
             
         except Exception as e:
             messagebox.showerror("Processing Error", f"Error processing data: {str(e)}")
             return None
                 
+    def _build_time_index(self):
+        """
+        Build the arrival time search keys over the (sorted) cleaned data.
+        """
+        self._arrival_keys = None
+        self._arrival_first_valid = 0
+        self._delay_prefix_count = None
+        self._delay_prefix_sum = None
+        self._delay_min_values = None
+        self._delay_max_values = None
+        self._delay_block_min = None
+        self._delay_block_max = None
+        
+        if self.cleaned_data is None or 'Bildankunft' not in self.cleaned_data.columns:
+            return
+            
+        arrivals = self.cleaned_data['Bildankunft']
+        if not arrivals.is_monotonic_increasing:
+            self.cleaned_data = self.cleaned_data.sort_values('Bildankunft', kind='mergesort', na_position='first')
+            arrivals = self.cleaned_data['Bildankunft']
+            
+        # NaT sorts first and maps to the smallest int64, so the keys stay monotonic
+        self._arrival_keys = arrivals.to_numpy(dtype='datetime64[ns]').view('int64')
+        self._arrival_first_valid = int(arrivals.isna().sum())
+        
+        # Prefix sums over the time-sorted delays for constant-time period statistics
+        if 'Verzögerung_Minuten' in self.cleaned_data.columns:
+            delays = self.cleaned_data['Verzögerung_Minuten'].to_numpy(dtype='float64')
+            valid = ~np.isnan(delays)
+            self._delay_prefix_count = np.concatenate(([0], np.cumsum(valid, dtype='int64')))
+            self._delay_prefix_sum = np.concatenate(([0.0], np.cumsum(np.where(valid, delays, 0.0))))
+    
+    def _build_delay_blocks(self):
+        """
+        Build the block minima and maxima of the time-sorted delays.
+        
+        Built on the first period statistics request only. Blocks of about
+        sqrt(n) rows keep the extra memory linear in the number of rows.
+        """
+        delays = self.cleaned_data['Verzögerung_Minuten'].to_numpy(dtype='float64')
+        valid = ~np.isnan(delays)
+        self._delay_min_values = np.where(valid, delays, np.inf)
+        self._delay_max_values = np.where(valid, delays, -np.inf)
+        
+        self._delay_block_size = max(1, int(np.sqrt(len(delays))))
+        starts = np.arange(0, len(delays), self._delay_block_size)
+        self._delay_block_min = np.minimum.reduceat(self._delay_min_values, starts) if len(delays) else np.empty(0)
+        self._delay_block_max = np.maximum.reduceat(self._delay_max_values, starts) if len(delays) else np.empty(0)
+    
+    def _block_range_reduce(self, values, block_values, lo, hi, ufunc, initial):
+        """
+        Reduce values[lo:hi] with ufunc from whole blocks plus the rows at both ends.
+        
+        Args:
+            values: Per-row values
+            block_values: Reduction of each block of values
+            lo: First row (inclusive)
+            hi: Last row (exclusive)
+            ufunc: np.minimum or np.maximum
+            initial: Identity of ufunc
+            
+        Returns:
+            float: The reduced value
+        """
+        block = self._delay_block_size
+        first_block = -(-lo // block)
+        last_block = hi // block
+        if first_block >= last_block:
+            return float(ufunc.reduce(values[lo:hi], initial=initial))
+            
+        return float(ufunc.reduce([
+            ufunc.reduce(values[lo:first_block * block], initial=initial),
+            ufunc.reduce(block_values[first_block:last_block], initial=initial),
+            ufunc.reduce(values[last_block * block:hi], initial=initial)
+        ]))
+    
+    def _period_bounds(self, start, end):
+        """
+        Get the positional bounds of the rows that arrived within [start, end).
+        
+        Args:
+            start: Start of the period (inclusive)
+            end: End of the period (exclusive)
+            
+        Returns:
+            tuple: (lo, hi) positions, or None if there is no arrival time index
+        """
+        if self.cleaned_data is None:
+            return None
+            
+        if self._arrival_keys is None or len(self._arrival_keys) != len(self.cleaned_data):
+            self._build_time_index()
+            if self._arrival_keys is None:
+                return None
+                
+        lo = max(self._arrival_first_valid,
+                 int(np.searchsorted(self._arrival_keys, pd.Timestamp(start).value, side='left')))
+        hi = int(np.searchsorted(self._arrival_keys, pd.Timestamp(end).value, side='left'))
+        return lo, max(lo, hi)
+    
+    def slice_period(self, start, end):
+        """
+        Get the rows that arrived within [start, end) without scanning or copying.
+        
+        Args:
+            start: Start of the period (inclusive)
+            end: End of the period (exclusive)
+            
+        Returns:
+            DataFrame: Positional slice of the time-sorted cleaned data
+        """
+        if self.cleaned_data is None:
+            return None
+            
+        bounds = self._period_bounds(start, end)
+        if bounds is None:
+            return self.cleaned_data.iloc[0:0]
+            
+        lo, hi = bounds
+        return self.cleaned_data.iloc[lo:hi]
+    
+    def get_period_statistics(self, start, end):
+        """
+        Calculate basic statistics for the rows that arrived within [start, end).
+        
+        Uses the prefix sums and block minima/maxima built over the
+        time-sorted delays, so the cost grows with the square root of the
+        number of rows instead of the size of the period.
+        
+        Args:
+            start: Start of the period (inclusive)
+            end: End of the period (exclusive)
+            
+        Returns:
+            dict: Statistics dictionary
+        """
+        bounds = self._period_bounds(start, end)
+        if bounds is None or self._delay_prefix_count is None:
+            return {
+                'total_records': 0,
+                'avg_delay': 0,
+                'min_delay': 0,
+                'max_delay': 0
+            }
+            
+        lo, hi = bounds
+        count = int(self._delay_prefix_count[hi] - self._delay_prefix_count[lo])
+        if count == 0:
+            return {
+                'total_records': hi - lo,
+                'avg_delay': float('nan'),
+                'min_delay': float('nan'),
+                'max_delay': float('nan')
+            }
+            
+        if self._delay_block_min is None:
+            self._build_delay_blocks()
+        
+        return {
+            'total_records': hi - lo,
+            'avg_delay': (self._delay_prefix_sum[hi] - self._delay_prefix_sum[lo]) / count,
+            'min_delay': self._block_range_reduce(self._delay_min_values, self._delay_block_min, lo, hi, np.minimum, np.inf),
+            'max_delay': self._block_range_reduce(self._delay_max_values, self._delay_block_max, lo, hi, np.maximum, -np.inf)
+        }
+    
     def _combine_date_time(self, row):
         """
         Combine date from activation timestamp with time from IPTC timestamp.
@@ -374,13 +560,53 @@ class DeploymentAnalyzer:
         except:
             return pd.NaT
     
-    def create_pivot_table(self, max_delay=None, granularity="daily"):
+    @staticmethod
+    def _bincount_grid(row_codes, column_codes, values, shape, layer='mean', fill_value=float('nan')):
+        """
+        Aggregate values into a grid of cells addressed by integer codes.
+        
+        Args:
+            row_codes: Row index of each value
+            column_codes: Column index of each value
+            values: Values to aggregate (NaN values are skipped)
+            shape: Number of rows and columns of the grid
+            layer: Aggregation ('mean', 'count' or 'max')
+            fill_value: Value for cells without data (count cells are 0)
+            
+        Returns:
+            ndarray: Grid of aggregated values
+        """
+        n_rows, n_cols = shape
+        valid = ~np.isnan(values)
+        cells = row_codes[valid] * n_cols + column_codes[valid]
+        values = values[valid]
+        
+        count = np.bincount(cells, minlength=n_rows * n_cols)
+        
+        if layer == 'count':
+            grid = count.astype('float64')
+        elif layer == 'max':
+            grid = np.full(n_rows * n_cols, -np.inf)
+            np.maximum.at(grid, cells, values)
+            grid[count == 0] = fill_value
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                grid = np.bincount(cells, weights=values, minlength=n_rows * n_cols) / count
+            grid[count == 0] = fill_value
+            
+        return grid.reshape(n_rows, n_cols)
+    
+    def create_pivot_table(self, max_delay=None, granularity="daily", layer="mean"):
         """
         Create a pivot table of processing delays.
         
+        Cells are addressed by integer time codes and aggregated with
+        np.bincount, so the result does not depend on the locale.
+        
         Args:
             max_delay: Maximum delay to include (in minutes)
             granularity: Time granularity ('daily', 'weekly', 'monthly', 'yearly', 'hourly')
+            layer: Aggregation per cell ('mean', 'count' or 'max')
             
         Returns:
             DataFrame: Pivot table
@@ -388,168 +614,72 @@ class DeploymentAnalyzer:
         if self.cleaned_data is None:
             return None
             
-        # Make a copy to avoid modifying the original
-        data = self.cleaned_data.copy()
+        arrivals = self.cleaned_data['Bildankunft']
+        delays = self.cleaned_data['Verzögerung_Minuten'].to_numpy(dtype='float64')
         
-        # Apply max delay filter if specified
+        # Skip rows without an arrival time and apply max delay filter if specified
+        keep = arrivals.notna().to_numpy()
         if max_delay is not None:
-            data = data[data['Verzögerung_Minuten'] <= max_delay]
+            keep &= delays <= max_delay
+        arrivals = arrivals[keep]
+        delays = delays[keep]
         
         # Ensure all hours are represented (0-23)
         all_hours = list(range(24))
+        hours = arrivals.dt.hour.to_numpy(dtype='int64')
         
         # Create pivot table based on granularity
         if granularity == "daily":
-            # Pivot by day of month and hour
-            data['Day'] = data['Bildankunft'].dt.day
-            data['Hour'] = data['Bildankunft'].dt.hour
-            
-            pivot = pd.pivot_table(
-                data,
-                values='Verzögerung_Minuten',
-                index='Day',
-                columns='Hour',
-                aggfunc='mean',
-                fill_value=0
-            )
+            # Pivot by day of month and hour, keeping only days with data
+            days = arrivals.dt.day.to_numpy(dtype='int64') - 1
+            grid = self._bincount_grid(days, hours, delays, (31, 24), layer, fill_value=0)
+            present = np.bincount(days[~np.isnan(delays)], minlength=31) > 0
             
-            # Ensure all hours are included
-            pivot = pivot.reindex(columns=all_hours, fill_value=0)
+            pivot = pd.DataFrame(grid[present], index=pd.Index(np.arange(1, 32)[present], name='Day'),
+                                 columns=pd.Index(all_hours, name='Hour'))
             
         elif granularity == "weekly":
-            try:
-                # Pivot by day of week and hour
-                try:
-                    # Try with different pandas versions
-                    try:
-                        # Using day_name() method for newer pandas
-                        data['Weekday'] = data['Bildankunft'].dt.day_name().str[:3]
-                    except:
-                        # For older pandas versions
-                        data['Weekday'] = data['Bildankunft'].dt.strftime('%a')
-                except:
-                    # Last resort fallback
-                    data['Weekday'] = data['Bildankunft'].dt.weekday
-                    weekday_map = {0: 'Mon', 1: 'Tue', 2: 'Wed', 3: 'Thu', 4: 'Fri', 5: 'Sat', 6: 'Sun'}
-                    data['Weekday'] = data['Weekday'].map(weekday_map)
-                
-                data['Hour'] = data['Bildankunft'].dt.hour
-                
-                # Define weekday order
-                weekday_order = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                
-                # Create pivot table
-                pivot = pd.pivot_table(
-                    data,
-                    values='Verzögerung_Minuten',
-                    index='Weekday',
-                    columns='Hour',
-                    aggfunc='mean'
-                )
-                
-                # Ensure all weekdays and hours are included by reindexing
-                pivot = pivot.reindex(index=weekday_order, columns=all_hours)
-                
-                # Fill NaN values with 0 for values and use None (a different color) for missing data points
-                pivot = pivot.fillna(value=float('nan'))
+            # Pivot by day of week (0 = Monday) and hour
+            weekday_order = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+            weekdays = arrivals.dt.dayofweek.to_numpy(dtype='int64')
+            grid = self._bincount_grid(weekdays, hours, delays, (7, 24), layer)
             
-            except Exception as e:
-                print(f"Error creating weekly pivot table: {str(e)}")
-                # Fallback to a simpler weekly view
-                try:
-                    data['Day'] = data['Bildankunft'].dt.day
-                    data['Hour'] = data['Bildankunft'].dt.hour
-                    
-                    pivot = pd.pivot_table(
-                        data,
-                        values='Verzögerung_Minuten',
-                        index='Day',
-                        columns='Hour',
-                        aggfunc='mean'
-                    )
-                    
-                    # Ensure all hours are included
-                    pivot = pivot.reindex(columns=all_hours)
-                    pivot = pivot.fillna(value=float('nan'))
-                except Exception as e2:
-                    print(f"Failed to create fallback pivot: {str(e2)}")
-                    return None
+            pivot = pd.DataFrame(grid, index=pd.Index(weekday_order, name='Weekday'),
+                                 columns=pd.Index(all_hours, name='Hour'))
             
         elif granularity == "monthly":
-            # Pivot by month and hour
-            data['Month'] = data['Bildankunft'].dt.month
-            data['Hour'] = data['Bildankunft'].dt.hour
-            
-            pivot = pd.pivot_table(
-                data,
-                values='Verzögerung_Minuten',
-                index='Month',
-                columns='Hour',
-                aggfunc='mean'
-            )
-            
-            # Ensure all months (1-12) and hours are included
-            all_months = list(range(1, 13))
-            pivot = pivot.reindex(index=all_months, columns=all_hours)
-            
-            # Fill missing values with NaN to render as white/empty cells
-            pivot = pivot.fillna(value=float('nan'))
+            # Pivot by month and hour, including all months (1-12)
+            months = arrivals.dt.month.to_numpy(dtype='int64') - 1
+            grid = self._bincount_grid(months, hours, delays, (12, 24), layer)
             
             # Map month numbers to month names
-            month_names = {
-                1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
-                7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'
-            }
-            pivot.index = [month_names.get(m, m) for m in pivot.index]
+            month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+            pivot = pd.DataFrame(grid, index=month_names, columns=pd.Index(all_hours, name='Hour'))
             
             # Calculate global min and max for monthly averages
             self.global_min = pivot.min().min()
             self.global_max = pivot.max().max()
         
         elif granularity == "yearly":
-            # Create a date column combining year, month, and day for each entry
-            data['Date'] = pd.to_datetime(data['Bildankunft'].dt.date)
-            data['Hour'] = data['Bildankunft'].dt.hour
-            
-            # Sort the data by date for a chronological view
-            data = data.sort_values('Date')
-            
-            # Create pivot table with date as index and hour as columns
-            pivot = pd.pivot_table(
-                data,
-                values='Verzögerung_Minuten',
-                index='Date',
-                columns='Hour',
-                aggfunc='mean'
-            )
-            
-            # Ensure all hours are included
-            pivot = pivot.reindex(columns=all_hours)
-            pivot = pivot.fillna(value=float('nan'))
+            # Pivot by calendar date and hour, in chronological order
+            dates = arrivals.dt.normalize().to_numpy()
+            unique_dates, date_codes = np.unique(dates, return_inverse=True)
+            grid = self._bincount_grid(date_codes.astype('int64'), hours, delays, (len(unique_dates), 24), layer)
             
             # Format the date index to be more readable
-            pivot.index = [d.strftime('%b %d') for d in pivot.index]
+            pivot = pd.DataFrame(grid, index=[d.strftime('%b %d') for d in pd.to_datetime(unique_dates)],
+                                 columns=pd.Index(all_hours, name='Hour'))
         
         else:  # "hourly" (combined view)
-            # Pivot by hour only, combining all dates
-            data['Hour'] = data['Bildankunft'].dt.hour
-            
-            # Use a dummy index to get a 1-row heatmap
-            data['All Data'] = 'All Data'
-            
-            pivot = pd.pivot_table(
-                data,
-                values='Verzögerung_Minuten',
-                index='All Data',
-                columns='Hour',
-                aggfunc='mean'
-            )
+            # Pivot by hour only, combining all dates into a 1-row heatmap
+            grid = self._bincount_grid(np.zeros(len(hours), dtype='int64'), hours, delays, (1, 24), layer)
             
-            # Ensure all hours are included
-            pivot = pivot.reindex(columns=all_hours)
-            pivot = pivot.fillna(value=float('nan'))
+            pivot = pd.DataFrame(grid, index=pd.Index(['All Data'], name='All Data'),
+                                 columns=pd.Index(all_hours, name='Hour'))
         
         self.pivot_table = pivot
+        self.pivot_layer = layer
         return pivot
     
     def create_heatmap(self, cmap='YlOrRd', figsize=(10, 6), granularity=None):
@@ -680,7 +810,7 @@ class DeploymentAnalyzer:
                 annot=False,  # No annotations as requested by user
                 linewidths=linewidth,
                 ax=ax,
-                cbar_kws={'label': 'Average Delay (minutes)'},
+                cbar_kws={'label': self.LAYER_LABELS.get(self.pivot_layer, 'Average Delay (minutes)')},
                 mask=mask,  # Mask NaN values
                 vmin=vmin,  # Custom range for color scaling
                 vmax=vmax,
@@ -2078,12 +2208,10 @@ class SimpleAnalysisGUI:
                 self.root.after(0, lambda: self.run_button.config(state="normal"))
                 return
             
-            # Filter data for the selected month and year
-            filtered_df = self.analyzer.cleaned_data.copy()
-            filtered_df = filtered_df[
-                (filtered_df['Bildankunft'].dt.month == month) & 
-                (filtered_df['Jahr'] == year)
-            ]
+            # Slice the selected month from the time-sorted data
+            month_start = datetime(int(year), int(month), 1)
+            month_end = datetime(int(year) + int(month) // 12, int(month) % 12 + 1, 1)
+            filtered_df = self.analyzer.slice_period(month_start, month_end)
             
             # Check if we have data
             if len(filtered_df) == 0:
@@ -2093,17 +2221,10 @@ class SimpleAnalysisGUI:
                 self.root.after(0, lambda: self.run_button.config(state="normal"))
                 return
             
-            # Store the original data
-            original_df = self.analyzer.cleaned_data
-            
-            # Temporarily replace with filtered data
-            self.analyzer.cleaned_data = filtered_df
-            
-            # Create pivot table with the filtered data
-            pivot_table = self.analyzer.create_pivot_table(granularity="daily")
-            
-            # Restore original data
-            self.analyzer.cleaned_data = original_df
+            # Create pivot table on a temporary analyzer so the shared data is left untouched
+            temp_analyzer = DeploymentAnalyzer()
+            temp_analyzer.cleaned_data = filtered_df
+            pivot_table = temp_analyzer.create_pivot_table(granularity="daily")
             
             if not self.is_running:
                 return
@@ -2118,12 +2239,7 @@ class SimpleAnalysisGUI:
                 self.root.after(0, self._create_heatmap_main_thread)
                 
                 # Update statistics
-                stats = {
-                    'total_records': len(filtered_df),
-                    'avg_delay': filtered_df['Verzögerung_Minuten'].mean(),
-                    'min_delay': filtered_df['Verzögerung_Minuten'].min(),
-                    'max_delay': filtered_df['Verzögerung_Minuten'].max()
-                }
+                stats = self.analyzer.get_period_statistics(month_start, month_end)
                 
                 self.root.after(0, lambda: self._update_stats_from_dict(stats))
                 self.root.after(0, lambda: self.update_status(f"Analysis complete for {month}/{year}"))
@@ -2166,11 +2282,10 @@ class SimpleAnalysisGUI:
                 self.root.after(0, lambda: self.run_button.config(state="normal"))
                 return
                 
-            # Filter data for the selected year
-            filtered_df = self.analyzer.cleaned_data.copy()
-            
-            # Use 'Bildankunft' to filter by year rather than 'Jahr' column
-            filtered_df = filtered_df[filtered_df['Bildankunft'].dt.year == year]
+            # Slice the selected year from the time-sorted data
+            year_start = datetime(int(year), 1, 1)
+            year_end = datetime(int(year) + 1, 1, 1)
+            filtered_df = self.analyzer.slice_period(year_start, year_end)
             
             # Check if we have data
             if len(filtered_df) == 0:
@@ -2180,14 +2295,10 @@ class SimpleAnalysisGUI:
                 self.root.after(0, lambda: self.run_button.config(state="normal"))
                 return
             
-            # Store the original data
-            original_df = self.analyzer.cleaned_data
-            
-            # Temporarily replace with filtered data
-            self.analyzer.cleaned_data = filtered_df
-            
-            # Create pivot table with the filtered data - using month and day
-            pivot_table = self.analyzer.create_pivot_table(granularity="yearly")
+            # Create pivot table on a temporary analyzer so the shared data is left untouched
+            temp_analyzer = DeploymentAnalyzer()
+            temp_analyzer.cleaned_data = filtered_df
+            pivot_table = temp_analyzer.create_pivot_table(granularity="yearly")
             
             # Store the pivot table for the main thread to use
             self.current_pivot_table = pivot_table
@@ -2196,16 +2307,8 @@ class SimpleAnalysisGUI:
             # Use the main thread to create and display the heatmap
             self.root.after(0, self._create_heatmap_main_thread)
             
-            # Update statistics based on filtered data
-            stats = {
-                'total_records': len(filtered_df),
-                'avg_delay': filtered_df['Verzögerung_Minuten'].mean(),
-                'min_delay': filtered_df['Verzögerung_Minuten'].min(),
-                'max_delay': filtered_df['Verzögerung_Minuten'].max()
-            }
-            
-            # Restore original data
-            self.analyzer.cleaned_data = original_df
+            # Update statistics based on the selected year
+            stats = self.analyzer.get_period_statistics(year_start, year_end)
             
             if not self.is_running:
                 return
@@ -2250,9 +2353,6 @@ class SimpleAnalysisGUI:
     def _run_week_analysis(self, year, week_num):
         """Run analysis for a specific week."""
         try:
-            # Filter data for the selected week
-            data = self.analyzer.cleaned_data
-            
             try:
                 # Try to convert week number to date range
                 # The %w format specifier expects 0 for Sunday, but some systems use 1 for Monday
@@ -2263,20 +2363,13 @@ class SimpleAnalysisGUI:
                     # Try with Sunday as first day of week
                     first_day = datetime.strptime(f'{year}-W{week_num}', '%Y-W%W')
             
-                last_day = first_day + timedelta(days=6)
-                
-                # Filter data for the date range
-                week_data = data[(data['Bildankunft'].dt.date >= first_day.date()) & 
-                                (data['Bildankunft'].dt.date <= last_day.date())]
+                # Slice the week from the time-sorted data
+                week_data = self.analyzer.slice_period(first_day, first_day + timedelta(days=7))
                 
                 if len(week_data) == 0:
-                    # Try a broader approach - get the week directly from the data
-                    try:
-                        # For newer pandas versions
-                        week_data = data[data['Bildankunft'].dt.isocalendar().week == week_num]
-                    except AttributeError:
-                        # For older pandas versions
-                        week_data = data[data['Bildankunft'].apply(lambda x: x.isocalendar()[1]) == week_num]
+                    # Try a broader approach - use the ISO calendar week instead
+                    first_day = datetime.fromisocalendar(int(year), int(week_num), 1)
+                    week_data = self.analyzer.slice_period(first_day, first_day + timedelta(days=7))
                 
                 if len(week_data) == 0:
                     self.root.after(0, lambda: self.update_status(f"No data available for week {week_num} of {year}"))
@@ -2299,12 +2392,7 @@ class SimpleAnalysisGUI:
                     self.root.after(0, self._create_heatmap_main_thread)
                     
                     # Update statistics based on filtered data
-                    stats = {
-                        'total_records': len(week_data),
-                        'avg_delay': week_data['Verzögerung_Minuten'].mean(),
-                        'min_delay': week_data['Verzögerung_Minuten'].min(),
-                        'max_delay': week_data['Verzögerung_Minuten'].max()
-                    }
+                    stats = self.analyzer.get_period_statistics(first_day, first_day + timedelta(days=7))
                     
                     self.root.after(0, lambda: self._update_stats_from_dict(stats))
                     self.root.after(0, lambda: self.update_status(f"Analysis complete for week {week_num} of {year}"))
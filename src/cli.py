@@ -12,6 +12,7 @@ import os
 import sys
 import argparse
 import logging
+import time
 from datetime import datetime, timedelta
 import pandas as pd
 
@@ -20,7 +21,10 @@ from modules.data_preparation.csv_importer import CSVImporter
 from modules.data_preparation.data_cleaner import DataCleaner
 from modules.data_preparation.database import Database
 from modules.interactive_analysis.timeline_analyzer import TimelineAnalyzer
+from modules.interactive_analysis.period_comparison import PeriodComparator
 from modules.interactive_analysis.anomaly_detector import AnomalyDetector
+from modules.interactive_analysis.streaming_detector import StreamingDetector
+from modules.reporting_engine.batch_renderer import BatchRenderer
 
 # Configure logging
 logging.basicConfig(
@@ -181,6 +185,154 @@ def analyze_timeline(args):
         except ValueError as e:
             logger.error(f"Error comparing time periods: {str(e)}")
 
+def render_report(args):
+    """Render a batch of report figures in parallel."""
+    logger.info("Rendering report figures")
+    
+    # Connect to the database
+    db = Database(db_path=args.db_path)
+    
+    # Create timeline analyzer
+    analyzer = TimelineAnalyzer(db_connection=db)
+    
+    # Set time range if provided
+    date_range = None
+    if args.start_date and args.end_date:
+        start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+        date_range = (start_date, end_date)
+    
+    # Load data once for all figures
+    success = analyzer.load_data(date_range=date_range)
+    if not success:
+        logger.error("Failed to load data for report")
+        return
+    
+    renderer = BatchRenderer(
+        analyzer.data,
+        output_dir=os.path.join('output', args.output_dir),
+        workers=args.workers,
+        dpi=args.dpi
+    )
+    jobs = renderer.build_jobs(
+        granularities=args.granularities,
+        metrics=args.metrics,
+        monthly_heatmaps=not args.no_monthly_heatmaps
+    )
+    results = renderer.render(jobs)
+    
+    failed = [result['path'] for result in results if not result['success']]
+    if failed:
+        logger.error(f"Failed to render {len(failed)} figures")
+    else:
+        logger.info(f"Saved {len(results)} figures to {renderer.output_dir}")
+
+def compare_periods(args):
+    """Compare every period with its previous period or the same period last year."""
+    logger.info(f"Comparing {args.granularity} periods against {args.against} period")
+    
+    # Create output directory if it doesn't exist
+    os.makedirs('output', exist_ok=True)
+    
+    # Connect to the database
+    db = Database(db_path=args.db_path)
+    
+    # Create timeline analyzer
+    analyzer = TimelineAnalyzer(db_connection=db)
+    
+    # Set time range if provided, extended back so the first periods have a baseline
+    date_range = None
+    first_period = None
+    if args.start_date and args.end_date:
+        start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+        frequency = PeriodComparator.BUCKET_FREQUENCIES[args.granularity]
+        first_period = pd.Timestamp(start_date).to_period(frequency)
+        lag = 1 if args.against == 'previous' else PeriodComparator.YEAR_LAGS[args.granularity]
+        date_range = ((first_period - lag).start_time.to_pydatetime(), end_date)
+    
+    # Load data
+    success = analyzer.load_data(date_range=date_range)
+    if not success:
+        logger.error("Failed to load data for comparison")
+        return
+    
+    # Compare all periods in one pass
+    table = analyzer.compare_period_matrix(
+        granularity=args.granularity,
+        against=args.against,
+        metrics=tuple(args.metrics)
+    )
+    
+    if table is None:
+        logger.error("Failed to compare periods")
+        return
+    
+    # Drop the periods that were only loaded as baselines
+    if first_period is not None:
+        table = table[table['period'] >= first_period.start_time].reset_index(drop=True)
+    
+    print(table.to_string(index=False))
+    
+    # Save comparison table to CSV
+    output_path = os.path.join('output', args.output or f"comparison_{args.granularity}_{args.against}.csv")
+    table.to_csv(output_path, index=False)
+    logger.info(f"Saved comparison table to {output_path}")
+
+def detect_change_points(args):
+    """Detect regime changes in the bucketed delay series."""
+    logger.info("Detecting change points")
+    
+    # Create output directory if it doesn't exist
+    os.makedirs('output', exist_ok=True)
+    
+    # Connect to the database
+    db = Database(db_path=args.db_path)
+    
+    # Create timeline analyzer
+    analyzer = TimelineAnalyzer(db_connection=db)
+    
+    # Set time range if provided
+    date_range = None
+    if args.start_date and args.end_date:
+        start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+        date_range = (start_date, end_date)
+    
+    # Load data
+    success = analyzer.load_data(date_range=date_range)
+    if not success:
+        logger.error("Failed to load data for change point detection")
+        return
+    
+    # Set time granularity
+    analyzer.set_time_granularity(args.granularity)
+    
+    regimes = analyzer.detect_change_points(
+        metric=args.metric,
+        method=args.method,
+        penalty=args.penalty,
+        min_size=args.min_size,
+        threshold=args.threshold
+    )
+    
+    if regimes is None:
+        logger.error("Failed to detect change points")
+        return
+    
+    if regimes.empty:
+        logger.info("No change points detected")
+        return
+    
+    print(f"\n{len(regimes)} change points ({args.method}, {args.metric} per {args.granularity}):")
+    for _, regime in regimes.iterrows():
+        print(f"{regime['change_time']}: {regime['before_mean']:.2f} -> {regime['after_mean']:.2f} minutes "
+              f"({regime['pct_change']:+.1f}%)")
+    
+    output_path = os.path.join('output', args.output or f"change_points_{args.method}_{args.granularity}.csv")
+    regimes.to_csv(output_path, index=False)
+    logger.info(f"Saved change points to {output_path}")
+
 def detect_anomalies(args):
     """Detect anomalies in the data."""
     logger.info("Detecting anomalies")
@@ -210,13 +362,42 @@ def detect_anomalies(args):
     # Set threshold method
     detector.set_threshold_method(args.method, value=args.threshold)
     
+    # Sweep thresholds instead of a single detection run if requested
+    if args.sweep:
+        sweep = detector.sweep_thresholds()
+        if sweep is None:
+            logger.error("Failed to sweep thresholds")
+            return
+        
+        print(sweep.to_string(index=False, float_format=lambda value: f"{value:.2f}"))
+        
+        output_path = os.path.join('output', args.output or 'threshold_sweep.csv')
+        sweep.to_csv(output_path, index=False)
+        logger.info(f"Saved threshold sweep to {output_path}")
+        
+        detector.plot_threshold_sensitivity(
+            sweep,
+            save_path=os.path.join('output', 'threshold_sweep.png')
+        )
+        return
+    
     # Detect anomalies
-    anomalies = detector.detect_anomalies()
+    if args.persist:
+        # Persisted runs cover the whole database; only new imports are scored
+        anomalies = detector.detect_incremental(full=args.full)
+        if anomalies is not None and date_range:
+            anomalies = anomalies[anomalies['date'].between(*date_range)]
+            detector.anomalies = anomalies
+    else:
+        anomalies = detector.detect_anomalies()
     
     if anomalies is None or len(anomalies) == 0:
         logger.info("No anomalies detected")
         return
     
+    # Group anomalies into incidents
+    incidents = detector.get_incidents(max_gap=args.max_gap)
+    
     # Print anomaly summary
     summary = detector.get_summary()
     logger.info("Anomaly detection summary:")
@@ -225,10 +406,17 @@ def detect_anomalies(args):
     print(f"Min delay: {summary['min_delay']:.2f} minutes")
     print(f"Max delay: {summary['max_delay']:.2f} minutes")
     print(f"Average delay: {summary['avg_delay']:.2f} minutes")
+    if incidents is not None:
+        print(f"Incidents: {summary['incident_count']} (max gap {args.max_gap})")
+        
+        incidents_path = os.path.join('output', f"incidents_{args.method}.csv")
+        incidents.to_csv(incidents_path, index=False)
+        logger.info(f"Saved incidents to {incidents_path}")
     
     # Create anomaly plot
     fig = detector.plot_anomalies(
-        save_path=os.path.join('output', f"anomalies_{args.method}.png")
+        save_path=os.path.join('output', f"anomalies_{args.method}.png"),
+        mode=args.plot_mode
     )
     if fig:
         logger.info(f"Created anomaly plot using {args.method} method")
@@ -239,6 +427,77 @@ def detect_anomalies(args):
         anomalies.to_csv(output_path, index=False)
         logger.info(f"Saved anomalies to {output_path}")
 
+def monitor_anomalies(args):
+    """Score newly imported rows with the streaming anomaly detector."""
+    logger.info("Monitoring new rows for anomalies")
+    
+    # Resume from the saved state, or start a new detector
+    detector = None
+    if os.path.exists(args.state_file):
+        detector = StreamingDetector.load(args.state_file)
+    if detector is None:
+        detector = StreamingDetector(
+            alpha=0.05 if args.alpha is None else args.alpha,
+            threshold=3.0 if args.threshold is None else args.threshold,
+            per_hour=bool(args.per_hour),
+            warmup=30 if args.warmup is None else args.warmup
+        )
+    else:
+        # Thresholds only affect the flagging and apply to the saved statistics
+        if args.threshold is not None:
+            detector.threshold = args.threshold
+        if args.warmup is not None:
+            detector.warmup = args.warmup
+        
+        # The saved statistics were built with the saved alpha and grouping
+        if args.alpha is not None and args.alpha != detector.alpha:
+            logger.warning(f"Ignoring --alpha {args.alpha}: {args.state_file} was built with alpha {detector.alpha}; "
+                           f"remove the state file to start over")
+        if args.per_hour is not None and args.per_hour != detector.per_hour:
+            logger.warning(f"Ignoring --per-hour: {args.state_file} was built with per_hour={detector.per_hour}; "
+                           f"remove the state file to start over")
+    
+    db = Database(db_path=args.db_path)
+    query = """
+        SELECT 
+            id, bildankunft_timestamp, activation_timestamp, 
+            processing_delay_minutes
+        FROM image_data
+        WHERE id > ?
+        ORDER BY id
+    """
+    
+    while True:
+        # Only rows imported after the watermark are loaded
+        watermark = detector.watermark or 0
+        new_rows = db.query_data(query, (watermark,))
+        
+        if new_rows is None:
+            logger.error("Failed to load new rows")
+            return
+        
+        if len(new_rows) > 0:
+            scored = detector.update(new_rows)
+            detector.watermark = int(new_rows['id'].max())
+            detector.save(args.state_file)
+            
+            anomalies = scored[scored['is_anomaly']]
+            for _, row in anomalies.iterrows():
+                print(f"{row['bildankunft_timestamp']}: {row['processing_delay_minutes']:.2f} minutes "
+                      f"(expected {row['expected_delay']:.2f}, score {row['anomaly_score']:.2f})")
+            
+            # Append anomalies to CSV if requested
+            if args.output and len(anomalies) > 0:
+                output_path = os.path.join('output', args.output)
+                anomalies.to_csv(output_path, mode='a', index=False, header=not os.path.exists(output_path))
+                logger.info(f"Appended {len(anomalies)} anomalies to {output_path}")
+        else:
+            logger.info(f"No new rows after id {watermark}")
+        
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+
 def main():
     """Main entry point for the CLI."""
     parser = argparse.ArgumentParser(description='Image Distribution Analysis Tool')
@@ -264,15 +523,71 @@ def main():
     analyze_parser.add_argument('--compare-with', choices=['prev_day', 'prev_week', 'prev_month'], help='Compare with previous period')
     analyze_parser.add_argument('--db-path', default='db/image_distribution.db', help='Database path')
     
+    # Report command
+    report_parser = subparsers.add_parser('report', help='Render a batch of report figures in parallel')
+    report_parser.add_argument('--granularities', nargs='+', default=['minute', 'hour', 'day', 'week', 'month', 'year'], choices=['minute', 'hour', 'day', 'week', 'month', 'year'], help='Time granularities of the timeline plots')
+    report_parser.add_argument('--metrics', nargs='+', default=['count', 'mean', 'median', 'min', 'max'], choices=['count', 'mean', 'median', 'min', 'max'], help='Metrics of the timeline plots')
+    report_parser.add_argument('--no-monthly-heatmaps', action='store_true', help='Skip the per-month weekday-hour heatmaps')
+    report_parser.add_argument('--workers', type=int, help='Number of worker processes (default: number of CPUs)')
+    report_parser.add_argument('--dpi', type=int, default=300, help='Resolution of the saved figures')
+    report_parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
+    report_parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
+    report_parser.add_argument('--output-dir', default='report', help='Directory below output/ to save the figures in')
+    report_parser.add_argument('--db-path', default='db/image_distribution.db', help='Database path')
+    
+    # Compare command
+    compare_parser = subparsers.add_parser('compare', help='Compare every period with a baseline period')
+    compare_parser.add_argument('--granularity', default='week', choices=['day', 'week', 'month', 'quarter', 'year'], help='Period size')
+    compare_parser.add_argument('--against', default='previous', choices=['previous', 'last_year'], help='Baseline period')
+    compare_parser.add_argument('--metrics', nargs='+', default=['count', 'mean'], choices=['count', 'sum', 'mean', 'std', 'min', 'max'], help='Metrics to compare')
+    compare_parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
+    compare_parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
+    compare_parser.add_argument('--output', help='Output CSV file name')
+    compare_parser.add_argument('--db-path', default='db/image_distribution.db', help='Database path')
+    
+    # Change point command
+    changepoints_parser = subparsers.add_parser('changepoints', help='Detect regime changes in the delay series')
+    changepoints_parser.add_argument('--granularity', default='hour', choices=['minute', 'hour', 'day', 'week', 'month', 'year'], help='Time granularity')
+    changepoints_parser.add_argument('--metric', default='mean', choices=['count', 'mean', 'median', 'min', 'max'], help='Metric of the series')
+    changepoints_parser.add_argument('--method', default='pelt', choices=['pelt', 'cusum'], help='Change point detection method')
+    changepoints_parser.add_argument('--penalty', type=float, help='PELT cost per change point (default: 2 * log(n))')
+    changepoints_parser.add_argument('--min-size', type=int, default=5, help='Minimum number of time groups per regime')
+    changepoints_parser.add_argument('--threshold', type=float, help='CUSUM alarm level in units of the noise level (default: log(n), at least 5; '
+                                     'on in-control noise about one false alarm per exp(threshold + 1.17) time groups, '
+                                     'i.e. every ~470 groups at 5 and ~0.3 per series at log(n))')
+    changepoints_parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
+    changepoints_parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
+    changepoints_parser.add_argument('--output', help='Output CSV file name')
+    changepoints_parser.add_argument('--db-path', default='db/image_distribution.db', help='Database path')
+    
     # Anomaly command
     anomaly_parser = subparsers.add_parser('anomaly', help='Detect anomalies')
-    anomaly_parser.add_argument('--method', default='zscore', choices=['zscore', 'iqr', 'percentile', 'absolute'], help='Anomaly detection method')
+    anomaly_parser.add_argument('--method', default='zscore', choices=['zscore', 'iqr', 'percentile', 'absolute', 'seasonal', 'mad'], help='Anomaly detection method')
     anomaly_parser.add_argument('--threshold', type=float, default=3.0, help='Anomaly threshold value')
+    anomaly_parser.add_argument('--persist', action='store_true', help='Store results in the database and only score rows imported since the last run')
+    anomaly_parser.add_argument('--full', action='store_true', help='With --persist, recompute the baseline and all results')
+    anomaly_parser.add_argument('--plot-mode', default='auto', choices=['auto', 'scatter', 'density'], help='Draw normal data as points or as a density image')
+    anomaly_parser.add_argument('--max-gap', default='30min', help='Largest gap between anomalies of one incident (e.g. 30min, 2h)')
+    anomaly_parser.add_argument('--sweep', action='store_true', help='Count anomalies over a grid of thresholds for every method instead')
     anomaly_parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
     anomaly_parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
     anomaly_parser.add_argument('--output', help='Output CSV file name')
     anomaly_parser.add_argument('--db-path', default='db/image_distribution.db', help='Database path')
     
+    # Monitor command
+    monitor_parser = subparsers.add_parser('monitor', help='Score newly imported rows with a streaming detector')
+    monitor_parser.add_argument('--state-file', default='output/monitor_state.json', help='File to keep the detector state in between runs')
+    monitor_parser.add_argument('--alpha', type=float, help='Weight of each new row in the moving statistics (default: 0.05; '
+                                'fixed once the state file exists)')
+    monitor_parser.add_argument('--threshold', type=float, help='Anomaly score threshold (default: 3.0; overrides the saved one)')
+    monitor_parser.add_argument('--per-hour', action='store_true', default=None, help='Keep separate statistics for each hour of the day '
+                                '(fixed once the state file exists)')
+    monitor_parser.add_argument('--warmup', type=int, help='Rows to see before flagging anomalies (default: 30; overrides the saved one)')
+    monitor_parser.add_argument('--follow', action='store_true', help='Keep polling the database for new rows')
+    monitor_parser.add_argument('--interval', type=float, default=60, help='Polling interval in seconds with --follow')
+    monitor_parser.add_argument('--output', help='Output CSV file name to append anomalies to')
+    monitor_parser.add_argument('--db-path', default='db/image_distribution.db', help='Database path')
+    
     args = parser.parse_args()
     
     # Execute the appropriate command
@@ -280,8 +595,16 @@ def main():
         import_data(args)
     elif args.command == 'analyze':
         analyze_timeline(args)
+    elif args.command == 'report':
+        render_report(args)
+    elif args.command == 'compare':
+        compare_periods(args)
+    elif args.command == 'changepoints':
+        detect_change_points(args)
     elif args.command == 'anomaly':
         detect_anomalies(args)
+    elif args.command == 'monitor':
+        monitor_anomalies(args)
     else:
         parser.print_help()
 
@@ -115,6 +115,38 @@ class Database:
                 )
             ''')
             
+            # Create tables for persisted anomaly detections
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS anomaly_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    method TEXT,
+                    params TEXT,
+                    watermark INTEGER,
+                    row_count INTEGER,
+                    baseline TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    UNIQUE (method, params)
+                )
+            ''')
+            
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS anomaly_results (
+                    run_id INTEGER,
+                    image_id INTEGER,
+                    anomaly_score REAL,
+                    PRIMARY KEY (run_id, image_id)
+                )
+            ''')
+            
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS anomaly_annotations (
+                    image_id INTEGER PRIMARY KEY,
+                    annotation TEXT,
+                    updated_at TEXT
+                )
+            ''')
+            
             self.conn.commit()
             logger.info("Database tables created successfully")
             return True
@@ -304,6 +336,42 @@ class Database:
         finally:
             self.close()
     
+    def iter_query(self, query, params=None, chunksize=50000):
+        """
+        Execute a query and yield its results in chunks.
+
+        Uses its own connection, so a consumer can read the chunks (e.g.
+        while streaming a response) independently of other queries.
+
+        Args:
+            query (str): SQL query to execute.
+            params (tuple): Parameters for the query.
+            chunksize (int): Number of rows per chunk.
+
+        Yields:
+            DataFrame: The next chunk of results.
+
+        Raises:
+            Exception: Errors are logged and re-raised, so a consumer cannot
+                       mistake the chunks read so far for the full result.
+        """
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            total_rows = 0
+            for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+                total_rows += len(chunk)
+                yield chunk
+
+            logger.info(f"Query streamed {total_rows} rows")
+
+        except Exception as e:
+            logger.error(f"Error executing query: {str(e)}")
+            raise
+
+        finally:
+            conn.close()
+
     def get_distinct_dates(self):
         """
         Get distinct dates available in the database.
@@ -316,4 +384,194 @@ class Database:
         
         if result is not None and not result.empty:
             return result['date'].tolist()
-        return [] 
\ No newline at end of file
+        return []
+    
+    def get_max_image_id(self):
+        """
+        Get the highest row id of the image data, used as data watermark.
+        
+        Returns:
+            int: Highest id, 0 if the table is empty.
+        """
+        result = self.query_data("SELECT MAX(id) AS max_id FROM image_data")
+        
+        if result is not None and not result.empty and pd.notna(result['max_id'].iloc[0]):
+            return int(result['max_id'].iloc[0])
+        return 0
+    
+    def get_anomaly_run(self, method, params):
+        """
+        Get the persisted anomaly detection run for a method and parameters.
+        
+        Args:
+            method (str): Detection method.
+            params (str): Detection parameters as JSON.
+            
+        Returns:
+            dict: id, watermark, row_count, baseline and timestamps of the run, or None.
+        """
+        if not self.conn:
+            if not self.connect():
+                return None
+        
+        try:
+            self.create_tables()
+            
+            self.cursor.execute('''
+                SELECT id, watermark, row_count, baseline, created_at, updated_at
+                FROM anomaly_runs
+                WHERE method = ? AND params = ?
+            ''', (method, params))
+            row = self.cursor.fetchone()
+            
+            if row is None:
+                return None
+            
+            return {
+                'id': row[0],
+                'watermark': row[1],
+                'row_count': row[2],
+                'baseline': json.loads(row[3]) if row[3] else None,
+                'created_at': row[4],
+                'updated_at': row[5]
+            }
+            
+        except Exception as e:
+            logger.error(f"Error loading anomaly run: {str(e)}")
+            return None
+            
+        finally:
+            self.close()
+    
+    def store_anomaly_run(self, method, params, watermark, row_count, baseline, results, replaced_image_ids=None):
+        """
+        Store the results of an anomaly detection run.
+        
+        Args:
+            method (str): Detection method.
+            params (str): Detection parameters as JSON.
+            watermark (int): Highest image id covered by the run.
+            row_count (int): Number of rows the baseline was computed from.
+            baseline (dict): Baseline statistics of the run.
+            results (DataFrame): image_id and anomaly_score of the detected anomalies.
+            replaced_image_ids (list): Rows that were scored again; their previous
+                                       results are replaced. None replaces all
+                                       results of the run.
+            
+        Returns:
+            bool: Success status of the operation.
+        """
+        if not self.conn:
+            if not self.connect():
+                return False
+        
+        try:
+            self.create_tables()
+            
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            baseline_json = json.dumps(baseline)
+            
+            # Insert or update the run
+            self.cursor.execute('''
+                INSERT INTO anomaly_runs (method, params, watermark, row_count, baseline, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (method, params) DO UPDATE SET
+                    watermark = excluded.watermark,
+                    row_count = excluded.row_count,
+                    baseline = excluded.baseline,
+                    updated_at = excluded.updated_at
+            ''', (method, params, watermark, row_count, baseline_json, now, now))
+            
+            self.cursor.execute('SELECT id FROM anomaly_runs WHERE method = ? AND params = ?', (method, params))
+            run_id = self.cursor.fetchone()[0]
+            
+            # Drop the results that are replaced by this run
+            if replaced_image_ids is None:
+                self.cursor.execute('DELETE FROM anomaly_results WHERE run_id = ?', (run_id,))
+            else:
+                self.cursor.executemany(
+                    'DELETE FROM anomaly_results WHERE run_id = ? AND image_id = ?',
+                    ((run_id, int(image_id)) for image_id in replaced_image_ids)
+                )
+            
+            self.cursor.executemany(
+                'INSERT OR REPLACE INTO anomaly_results (run_id, image_id, anomaly_score) VALUES (?, ?, ?)',
+                (
+                    (run_id, int(image_id), float(score))
+                    for image_id, score in zip(results['image_id'], results['anomaly_score'])
+                )
+            )
+            
+            self.conn.commit()
+            logger.info(f"Stored {len(results)} anomalies for {method} run (watermark {watermark})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error storing anomaly run: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return False
+            
+        finally:
+            self.close()
+    
+    def load_anomaly_results(self, method, params):
+        """
+        Load the persisted anomalies of a run with their image data and annotations.
+        
+        Args:
+            method (str): Detection method.
+            params (str): Detection parameters as JSON.
+            
+        Returns:
+            DataFrame: Anomalous rows with anomaly_score and annotation columns.
+        """
+        query = '''
+            SELECT 
+                d.id, d.bildankunft_timestamp, d.activation_timestamp, 
+                d.processing_delay_minutes, d.weekday, d.hour, d.date,
+                r.anomaly_score, COALESCE(a.annotation, '') AS annotation
+            FROM anomaly_runs AS run
+            JOIN anomaly_results AS r ON r.run_id = run.id
+            JOIN image_data AS d ON d.id = r.image_id
+            LEFT JOIN anomaly_annotations AS a ON a.image_id = d.id
+            WHERE run.method = ? AND run.params = ?
+            ORDER BY d.bildankunft_timestamp
+        '''
+        return self.query_data(query, (method, params))
+    
+    def store_anomaly_annotations(self, annotations):
+        """
+        Store annotations of anomalous images.
+        
+        Args:
+            annotations (dict): Mapping of image id to annotation text.
+            
+        Returns:
+            bool: Success status of the operation.
+        """
+        if not self.conn:
+            if not self.connect():
+                return False
+        
+        try:
+            self.create_tables()
+            
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.cursor.executemany(
+                'INSERT OR REPLACE INTO anomaly_annotations (image_id, annotation, updated_at) VALUES (?, ?, ?)',
+                ((int(image_id), annotation, now) for image_id, annotation in annotations.items())
+            )
+            
+            self.conn.commit()
+            logger.info(f"Stored {len(annotations)} anomaly annotations")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error storing anomaly annotations: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return False
+            
+        finally:
+            self.close() 
\ No newline at end of file
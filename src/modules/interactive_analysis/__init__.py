@@ -8,5 +8,19 @@ for the image distribution analysis system.
 from .dashboard import Dashboard
 from .timeline_analyzer import TimelineAnalyzer
 from .anomaly_detector import AnomalyDetector
+from .time_index import TimeIndex
+from .range_statistics import RangeStatistics
+from .period_comparison import PeriodComparator
+from .rolling_metrics import RollingWindow
+from .grid_aggregation import aggregate_grid
+from .downsampling import lttb_indices
+from .seasonal_baseline import SeasonalBaseline
+from .streaming_detector import StreamingDetector
+from .anomaly_scoring import score_matrix
+from .incidents import group_incidents
+from .change_points import pelt_change_points, cusum_change_points
+from .dataset_store import DatasetStore
+from .shared_dataset_store import SharedDatasetStore
+from .request_coalescing import RequestCoalescer
 
-__all__ = ['Dashboard', 'TimelineAnalyzer', 'AnomalyDetector'] 
\ No newline at end of file
+__all__ = ['Dashboard', 'TimelineAnalyzer', 'AnomalyDetector', 'TimeIndex', 'RangeStatistics', 'PeriodComparator', 'RollingWindow', 'aggregate_grid', 'lttb_indices', 'SeasonalBaseline', 'StreamingDetector', 'score_matrix', 'group_incidents', 'pelt_change_points', 'cusum_change_points', 'DatasetStore', 'SharedDatasetStore', 'RequestCoalescer'] 
\ No newline at end of file
@@ -8,13 +8,28 @@ image processing delay data.
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.colors import LogNorm
 from scipy import stats
 import logging
+import json
 from datetime import datetime, timedelta
 
+from .seasonal_baseline import SeasonalBaseline
+from .anomaly_scoring import score_matrix, score_values, delay_statistics, threshold_sweep, SCORING_METHODS, MAD_SCALE, DEFAULT_THRESHOLDS
+from .incidents import group_incidents
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Columns loaded from the image data for anomaly detection
+DETECTION_QUERY = """
+    SELECT 
+        id, bildankunft_timestamp, activation_timestamp, 
+        processing_delay_minutes, weekday, hour, date
+    FROM image_data
+"""
+
 class AnomalyDetector:
     """
     Class for detecting anomalies in image processing delay data.
@@ -30,35 +45,40 @@ class AnomalyDetector:
         self.db_connection = db_connection
         self.data = None
         self.anomalies = None
+        self.incidents = None
         self.threshold_method = 'zscore'  # Default method
         self.threshold_value = 3.0  # Default z-score threshold
-        self.available_methods = ['zscore', 'iqr', 'percentile', 'absolute']
+        self.available_methods = ['zscore', 'iqr', 'percentile', 'absolute', 'seasonal', 'mad']
+        self.seasonal_baseline = None
+        self.seasonal_min_samples = 30
+        self.score_matrix = None
+        self.score_thresholds = None
     
-    def load_data(self, data=None, date_range=None):
+    def load_data(self, data=None, date_range=None, copy=True):
         """
         Load data for anomaly detection, either from a DataFrame or from the database.
         
         Args:
             data (DataFrame): DataFrame containing image processing data.
             date_range (tuple): Start and end date for filtering.
+            copy (bool): Whether to copy a provided DataFrame; pass False to
+                         share a snapshot that no caller modifies.
             
         Returns:
             bool: Success status of the operation.
         """
         if data is not None:
             # Data provided directly
-            self.data = data.copy()
+            self.data = data.copy() if copy else data
+            self.seasonal_baseline = None
+            self.score_matrix = None
+            self.score_thresholds = None
             logger.info(f"Loaded {len(self.data)} rows from provided DataFrame")
             return True
             
         elif self.db_connection:
             # Fetch data from database
-            query = """
-                SELECT 
-                    bildankunft_timestamp, activation_timestamp, 
-                    processing_delay_minutes, weekday, hour, date
-                FROM image_data
-            """
+            query = DETECTION_QUERY
             
             # Add date filtering if specified
             params = None
@@ -76,6 +96,9 @@ class AnomalyDetector:
                     if col in self.data.columns:
                         self.data[col] = pd.to_datetime(self.data[col])
                 
+                self.seasonal_baseline = None
+                self.score_matrix = None
+                self.score_thresholds = None
                 logger.info(f"Loaded {len(self.data)} rows from database")
                 return True
                 
@@ -91,7 +114,7 @@ class AnomalyDetector:
         Set the threshold method and value for anomaly detection.
         
         Args:
-            method (str): Threshold method ('zscore', 'iqr', 'percentile', 'absolute').
+            method (str): Threshold method ('zscore', 'iqr', 'percentile', 'absolute', 'seasonal', 'mad').
             value (float): Threshold value.
             
         Returns:
@@ -109,6 +132,35 @@ class AnomalyDetector:
         logger.info(f"Threshold method set to {method} with value {self.threshold_value}")
         return True
     
+    def get_seasonal_baseline(self, min_samples=None):
+        """
+        Get the (weekday, hour) baselines of the loaded data.
+        
+        The baselines are computed once and reused by later calls until new
+        data is loaded or a different min_samples is requested.
+        
+        Args:
+            min_samples (int): Minimum number of values for a cell to use its own
+                               baseline (default: seasonal_min_samples).
+            
+        Returns:
+            SeasonalBaseline: The baselines, or None if no data is loaded.
+        """
+        if self.data is None:
+            logger.error("No data loaded")
+            return None
+            
+        if min_samples is None:
+            min_samples = self.seasonal_min_samples
+            
+        if self.seasonal_baseline is None or self.seasonal_baseline.min_samples != min_samples:
+            timestamps = pd.to_datetime(self.data['bildankunft_timestamp'])
+            self.seasonal_baseline = SeasonalBaseline(min_samples=min_samples).fit(
+                timestamps, self.data['processing_delay_minutes']
+            )
+            
+        return self.seasonal_baseline
+    
     def detect_anomalies(self):
         """
         Detect anomalies in the processing delay data.
@@ -163,9 +215,25 @@ class AnomalyDetector:
                 # Absolute threshold method
                 df['anomaly_score'] = df['processing_delay_minutes'] / self.threshold_value
                 df['is_anomaly'] = df['processing_delay_minutes'] > self.threshold_value
+                
+            elif self.threshold_method == 'seasonal':
+                # Z-score against the baseline of each row's weekday and hour
+                baseline = self.get_seasonal_baseline()
+                timestamps = pd.to_datetime(df['bildankunft_timestamp'])
+                df['expected_delay'], _ = baseline.expected(timestamps)
+                df['anomaly_score'] = np.abs(baseline.score(timestamps, df['processing_delay_minutes']))
+                df['is_anomaly'] = df['anomaly_score'] > self.threshold_value
+                
+            elif self.threshold_method == 'mad':
+                # Robust z-score from the median absolute deviation
+                median = df['processing_delay_minutes'].median()
+                mad = (df['processing_delay_minutes'] - median).abs().median()
+                df['anomaly_score'] = np.abs(df['processing_delay_minutes'] - median) / (MAD_SCALE * mad)
+                df['is_anomaly'] = df['anomaly_score'] > self.threshold_value
             
             # Store anomalies for later use
             self.anomalies = df[df['is_anomaly']]
+            self.incidents = None
             
             anomaly_count = len(self.anomalies)
             anomaly_percent = (anomaly_count / len(df)) * 100
@@ -177,6 +245,308 @@ class AnomalyDetector:
             logger.error(f"Error detecting anomalies: {str(e)}")
             return None
     
+    def _detection_params(self):
+        """Get the parameters that key persisted runs of the current method as JSON."""
+        params = {'threshold': float(self.threshold_value)}
+        if self.threshold_method == 'seasonal':
+            params['min_samples'] = self.seasonal_min_samples
+        return json.dumps(params, sort_keys=True)
+    
+    def _query_rows(self, condition='', params=None):
+        """Load image rows for detection, with string dates converted to datetime."""
+        rows = self.db_connection.query_data(DETECTION_QUERY + condition, params)
+        if rows is not None:
+            for col in ['bildankunft_timestamp', 'activation_timestamp', 'date']:
+                rows[col] = pd.to_datetime(rows[col])
+        return rows
+    
+    def _score_with_baseline(self, rows, baseline):
+        """Score rows of the current method against a stored baseline."""
+        values = rows['processing_delay_minutes'].to_numpy(dtype='float64')
+        if self.threshold_method == 'seasonal':
+            scores = np.abs(SeasonalBaseline.from_state(baseline).score(rows['bildankunft_timestamp'], values))
+            return scores, scores > self.threshold_value
+        return score_values(values, self.threshold_method, baseline, self.threshold_value)
+    
+    def detect_incremental(self, full=False, refit_ratio=0.1):
+        """
+        Detect anomalies over the whole database and persist the results.
+        
+        Runs are keyed by method and parameters and remember the highest
+        image id they cover (the data watermark) and their baseline. Later
+        calls only score rows imported past the watermark: against the
+        stored baseline for the global methods, and for the seasonal method
+        after recomputing the (weekday, hour) cells the new rows fall into,
+        whose rows are all scored again. The baseline of the global methods
+        is recomputed from all data once the new rows exceed refit_ratio of
+        the rows it was computed from.
+        
+        Args:
+            full (bool): Recompute the baseline and all results.
+            refit_ratio (float): Share of new rows that triggers a full run
+                                 for the global methods.
+            
+        Returns:
+            DataFrame: All persisted anomalies of the run, with annotations.
+        """
+        if not self.db_connection:
+            logger.error("No database connection for persisted detection")
+            return None
+            
+        method = self.threshold_method
+        params = self._detection_params()
+        run = None if full else self.db_connection.get_anomaly_run(method, params)
+        watermark = self.db_connection.get_max_image_id()
+        
+        try:
+            if run is not None and run['watermark'] >= watermark:
+                logger.info(f"Persisted {method} anomalies are up to date (watermark {watermark})")
+                
+            elif run is not None:
+                new_rows = self._query_rows(" WHERE id > ? AND id <= ?", (run['watermark'], watermark))
+                row_count = run['row_count'] + len(new_rows)
+                
+                if method == 'seasonal':
+                    # Recompute the baselines of the cells touched by the new rows
+                    baseline = SeasonalBaseline.from_state(run['baseline'])
+                    cells = np.unique(baseline.cell_codes(new_rows['bildankunft_timestamp']))
+                    cells = [int(cell) for cell in cells if cell >= 0]
+                    placeholders = ', '.join('?' * len(cells))
+                    rows = self._query_rows(
+                        " WHERE id <= ? AND ((CAST(strftime('%w', bildankunft_timestamp) AS INTEGER) + 6) % 7) * 24"
+                        f" + CAST(strftime('%H', bildankunft_timestamp) AS INTEGER) IN ({placeholders})",
+                        (watermark, *cells)
+                    )
+                    baseline.refit_cells(rows['bildankunft_timestamp'], rows['processing_delay_minutes'])
+                    baseline = baseline.get_state()
+                    
+                elif len(new_rows) > refit_ratio * max(run['row_count'], 1):
+                    logger.info(f"{len(new_rows)} new rows exceed the refit ratio; recomputing the baseline")
+                    return self.detect_incremental(full=True)
+                    
+                else:
+                    # Score only the new rows against the stored baseline
+                    baseline = run['baseline']
+                    rows = new_rows
+                    
+                scores, flags = self._score_with_baseline(rows, baseline)
+                results = pd.DataFrame({'image_id': rows['id'][flags], 'anomaly_score': scores[flags]})
+                self.db_connection.store_anomaly_run(
+                    method, params, watermark, row_count, baseline, results,
+                    replaced_image_ids=rows['id'].tolist()
+                )
+                logger.info(f"Scored {len(rows)} rows for {len(new_rows)} new rows with the {method} method")
+                
+            else:
+                # Full run over all data
+                rows = self._query_rows(" WHERE id <= ?", (watermark,))
+                values = rows['processing_delay_minutes'].to_numpy(dtype='float64')
+                if method == 'seasonal':
+                    baseline = SeasonalBaseline(min_samples=self.seasonal_min_samples).fit(
+                        rows['bildankunft_timestamp'], values
+                    ).get_state()
+                else:
+                    baseline = delay_statistics(values, {method: self.threshold_value})
+                    
+                scores, flags = self._score_with_baseline(rows, baseline)
+                results = pd.DataFrame({'image_id': rows['id'][flags], 'anomaly_score': scores[flags]})
+                self.db_connection.store_anomaly_run(method, params, watermark, len(rows), baseline, results)
+                logger.info(f"Scored all {len(rows)} rows with the {method} method")
+                
+        except Exception as e:
+            logger.error(f"Error detecting anomalies incrementally: {str(e)}")
+            return None
+            
+        # Serve the persisted anomalies, including earlier annotations
+        anomalies = self.db_connection.load_anomaly_results(method, params)
+        if anomalies is None:
+            return None
+        for col in ['bildankunft_timestamp', 'activation_timestamp', 'date']:
+            anomalies[col] = pd.to_datetime(anomalies[col])
+        anomalies['is_anomaly'] = True
+        
+        self.anomalies = anomalies
+        self.incidents = None
+        logger.info(f"Loaded {len(anomalies)} persisted {method} anomalies")
+        return anomalies
+    
+    def compute_score_matrix(self, thresholds=None):
+        """
+        Score the loaded data with all methods in one pass.
+        
+        Args:
+            thresholds (dict): Threshold per method; methods not listed use
+                               the defaults from anomaly_scoring.DEFAULT_THRESHOLDS.
+            
+        Returns:
+            DataFrame: Score and flag column per method, indexed like the data.
+        """
+        if self.data is None:
+            logger.error("No data loaded")
+            return None
+            
+        if 'processing_delay_minutes' not in self.data.columns:
+            logger.error("Required column 'processing_delay_minutes' not found")
+            return None
+            
+        self.score_matrix = score_matrix(
+            self.data['processing_delay_minutes'].to_numpy(dtype='float64'),
+            thresholds=thresholds,
+            index=self.data.index
+        )
+        self.score_thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        return self.score_matrix
+    
+    def get_method_anomalies(self, method):
+        """
+        Get the anomalies of one method from the score matrix.
+        
+        Switching between methods only selects columns of the matrix
+        computed by compute_score_matrix(), which is computed on first use.
+        
+        Args:
+            method (str): Scoring method (see anomaly_scoring.SCORING_METHODS).
+            
+        Returns:
+            DataFrame: Anomalies detected by the method.
+        """
+        if method not in SCORING_METHODS:
+            logger.error(f"Invalid method '{method}'. Valid options: {list(SCORING_METHODS)}")
+            return None
+            
+        if self.score_matrix is None and self.compute_score_matrix() is None:
+            return None
+            
+        flags = self.score_matrix[f"{method}_anomaly"].to_numpy()
+        anomalies = self.data[flags].copy()
+        anomalies['anomaly_score'] = self.score_matrix[f"{method}_score"].to_numpy()[flags].astype('float64')
+        anomalies['is_anomaly'] = True
+        
+        # Keep the summary in line with the selected method and the threshold
+        # the matrix was scored with (the defaults for a matrix set from outside)
+        self.threshold_method = method
+        self.threshold_value = (self.score_thresholds or DEFAULT_THRESHOLDS)[method]
+        self.anomalies = anomalies
+        self.incidents = None
+        
+        logger.info(f"Selected {len(anomalies)} anomalies of the {method} method")
+        return anomalies
+    
+    def sweep_thresholds(self, methods=None, grids=None):
+        """
+        Count the anomalies over a grid of thresholds for each method.
+        
+        Args:
+            methods (list): Methods to sweep (default: all available methods).
+            grids (dict): Thresholds per method (missing methods use
+                          anomaly_scoring.DEFAULT_SWEEP_GRIDS).
+            
+        Returns:
+            DataFrame: method, threshold, anomaly_count and anomaly_percentage.
+        """
+        if self.data is None:
+            logger.error("No data loaded")
+            return None
+            
+        if 'processing_delay_minutes' not in self.data.columns:
+            logger.error("Required column 'processing_delay_minutes' not found")
+            return None
+            
+        if methods is None:
+            methods = self.available_methods
+            
+        invalid_methods = [method for method in methods if method not in self.available_methods]
+        if invalid_methods:
+            logger.error(f"Invalid methods {invalid_methods}. Valid options: {self.available_methods}")
+            return None
+            
+        values = self.data['processing_delay_minutes'].to_numpy(dtype='float64')
+        
+        # Seasonal scores depend on the cached baselines, not on the threshold
+        extra_scores = {}
+        if 'seasonal' in methods:
+            timestamps = pd.to_datetime(self.data['bildankunft_timestamp'])
+            extra_scores['seasonal'] = np.abs(self.get_seasonal_baseline().score(timestamps, values))
+            
+        try:
+            return threshold_sweep(values, methods=list(methods), grids=grids, extra_scores=extra_scores)
+        except Exception as e:
+            logger.error(f"Error sweeping thresholds: {str(e)}")
+            return None
+    
+    def plot_threshold_sensitivity(self, sweep, figsize=(15, 8), save_path=None):
+        """
+        Plot the share of anomalies against the threshold for each method.
+        
+        Args:
+            sweep (DataFrame): Result of sweep_thresholds().
+            figsize (tuple): Figure size.
+            save_path (str): Path to save the figure.
+            
+        Returns:
+            matplotlib.figure.Figure: The created figure.
+        """
+        if sweep is None or sweep.empty:
+            logger.warning("No sweep results to plot")
+            return None
+            
+        methods = list(dict.fromkeys(sweep['method']))
+        n_cols = min(3, len(methods))
+        n_rows = int(np.ceil(len(methods) / n_cols))
+        
+        # Thresholds have different units per method, so each gets its own axes
+        fig, axes = plt.subplots(n_rows, n_cols, figsize=figsize, squeeze=False)
+        
+        for ax, method in zip(axes.flat, methods):
+            method_sweep = sweep[sweep['method'] == method]
+            ax.plot(method_sweep['threshold'], method_sweep['anomaly_percentage'], '-o', color='blue', markersize=4)
+            
+            # Mark the currently selected threshold
+            if method == self.threshold_method:
+                ax.axvline(self.threshold_value, color='red', linestyle='--', label=f"Current ({self.threshold_value:g})")
+                ax.legend()
+                
+            ax.set_title(method)
+            ax.set_xlabel('Threshold')
+            ax.set_ylabel('Anomalies (% of data)')
+            ax.grid(True, linestyle='--', alpha=0.7)
+            
+        # Hide unused axes
+        for ax in list(axes.flat)[len(methods):]:
+            ax.set_visible(False)
+            
+        fig.suptitle('Anomaly Threshold Sensitivity')
+        fig.tight_layout()
+        
+        # Save figure if path provided
+        if save_path:
+            fig.savefig(save_path, bbox_inches='tight', dpi=300)
+            logger.info(f"Saved threshold sensitivity plot to {save_path}")
+            
+        return fig
+    
+    def get_incidents(self, max_gap='30min', min_count=1):
+        """
+        Group the detected anomalies into incidents.
+        
+        Args:
+            max_gap (str): Largest gap between anomalies of one incident (e.g. '30min').
+            min_count (int): Minimum number of anomalies per incident.
+            
+        Returns:
+            DataFrame: start, end, duration, count, peak and mean delay per incident.
+        """
+        if self.anomalies is None:
+            logger.warning("No anomalies detected or detect_anomalies() not called yet")
+            return None
+            
+        try:
+            self.incidents = group_incidents(self.anomalies, max_gap=max_gap, min_count=min_count)
+            return self.incidents
+        except Exception as e:
+            logger.error(f"Error grouping incidents: {str(e)}")
+            return None
+    
     def get_summary(self):
         """
         Get a summary of detected anomalies.
@@ -208,6 +578,13 @@ class AnomalyDetector:
             'threshold': self.threshold_value
         }
         
+        # Add incident summaries if incidents were grouped
+        if self.incidents is not None:
+            summary['incident_count'] = len(self.incidents)
+            if len(self.incidents) > 0:
+                summary['largest_incident'] = int(self.incidents['count'].max())
+                summary['longest_incident_minutes'] = float(self.incidents['duration_minutes'].max())
+        
         # Add time-based summaries if timestamps are available
         if 'bildankunft_timestamp' in self.anomalies.columns:
             # Most common weekdays
@@ -222,13 +599,30 @@ class AnomalyDetector:
         
         return summary
     
-    def plot_anomalies(self, figsize=(15, 8), save_path=None):
+    def _anomaly_mask(self, data):
+        """Get a boolean mask of the rows of data that are in the detected anomalies."""
+        if 'id' in data.columns and 'id' in self.anomalies.columns:
+            return data['id'].isin(self.anomalies['id']).to_numpy()
+        return data.index.isin(self.anomalies.index)
+    
+    def plot_anomalies(self, figsize=(15, 8), save_path=None, mode='auto', density_threshold=50000,
+                       bins=(400, 150), max_markers=5000, dpi=300):
         """
         Plot the anomalies against the normal data.
         
+        In density mode the normal data is drawn as a rasterised 2D histogram
+        of time x delay, so the render time and file size do not grow with
+        the number of rows; the anomalies stay vector markers on top.
+        
         Args:
             figsize (tuple): Figure size.
             save_path (str): Path to save the figure.
+            mode (str): 'scatter', 'density' or 'auto' (density above density_threshold rows).
+            density_threshold (int): Number of rows from which 'auto' uses density mode.
+            bins (tuple): Number of time and delay bins of the density image.
+            max_markers (int): Maximum number of anomaly markers; the highest
+                               scoring anomalies are kept.
+            dpi (int): Resolution of the saved figure.
             
         Returns:
             matplotlib.figure.Figure: The created figure.
@@ -241,35 +635,67 @@ class AnomalyDetector:
             logger.warning("No anomalies detected or detect_anomalies() not called yet")
             return None
             
-        # Create the plot
-        fig, ax = plt.subplots(figsize=figsize)
-        
+        if mode not in ('auto', 'scatter', 'density'):
+            logger.error(f"Invalid mode '{mode}'. Valid options: ['auto', 'scatter', 'density']")
+            return None
+            
         # Ensure bildankunft_timestamp is datetime
         if 'bildankunft_timestamp' in self.data.columns:
             if not pd.api.types.is_datetime64_any_dtype(self.data['bildankunft_timestamp']):
                 self.data['bildankunft_timestamp'] = pd.to_datetime(self.data['bildankunft_timestamp'])
         
-        # Sort data by timestamp
-        sorted_data = self.data.sort_values('bildankunft_timestamp')
+        if mode == 'auto':
+            mode = 'density' if len(self.data) > density_threshold else 'scatter'
         
-        # Plot normal data
-        normal_data = sorted_data[~sorted_data['is_anomaly']]
-        ax.scatter(
-            normal_data['bildankunft_timestamp'],
-            normal_data['processing_delay_minutes'],
-            color='blue',
-            alpha=0.5,
-            label='Normal'
-        )
+        # Create the plot
+        fig, ax = plt.subplots(figsize=figsize)
+        
+        is_anomaly = self._anomaly_mask(self.data)
         
-        # Plot anomalies
-        anomaly_data = sorted_data[sorted_data['is_anomaly']]
+        if mode == 'density':
+            # Bin the normal rows into a fixed-size image; anomalies are drawn on top
+            valid = (self.data['bildankunft_timestamp'].notna() & self.data['processing_delay_minutes'].notna()).to_numpy()
+            valid &= ~is_anomaly
+            times = mdates.date2num(self.data['bildankunft_timestamp'].to_numpy()[valid])
+            delays = self.data['processing_delay_minutes'].to_numpy(dtype='float64')[valid]
+            
+            if len(times) > 0:
+                counts, time_edges, delay_edges = np.histogram2d(times, delays, bins=bins)
+                image = ax.imshow(
+                    np.ma.masked_equal(counts.T, 0),
+                    origin='lower',
+                    aspect='auto',
+                    extent=(time_edges[0], time_edges[-1], delay_edges[0], delay_edges[-1]),
+                    cmap='Blues',
+                    norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)),
+                    interpolation='nearest',
+                    rasterized=True
+                )
+                fig.colorbar(image, ax=ax, label='Images per bin')
+                ax.xaxis_date()
+        else:
+            # Plot normal data
+            normal_data = self.data[~is_anomaly]
+            ax.scatter(
+                normal_data['bildankunft_timestamp'],
+                normal_data['processing_delay_minutes'],
+                color='blue',
+                alpha=0.5,
+                label='Normal'
+            )
+        
+        # Plot anomalies, limited to the highest scoring ones
+        anomaly_data = self.anomalies
+        if max_markers is not None and len(anomaly_data) > max_markers:
+            anomaly_data = anomaly_data.nlargest(max_markers, 'anomaly_score')
+            logger.info(f"Showing the {max_markers} highest scoring of {len(self.anomalies)} anomalies")
+            
         ax.scatter(
             anomaly_data['bildankunft_timestamp'],
             anomaly_data['processing_delay_minutes'],
             color='red',
             marker='x',
-            s=100,
+            s=100 if mode == 'scatter' else 30,
             label='Anomaly'
         )
         
@@ -278,7 +704,9 @@ class AnomalyDetector:
             'zscore': 'Z-Score',
             'iqr': 'IQR',
             'percentile': 'Percentile',
-            'absolute': 'Absolute Threshold'
+            'absolute': 'Absolute Threshold',
+            'seasonal': 'Weekday-Hour Baseline',
+            'mad': 'Median Absolute Deviation'
         }.get(self.threshold_method, self.threshold_method)
         
         ax.set_title(f'Processing Delay Anomalies ({method_name} Method)')
@@ -290,14 +718,14 @@ class AnomalyDetector:
         ax.legend()
         
         # Rotate x-axis labels for better readability
-        plt.xticks(rotation=45)
+        plt.setp(ax.get_xticklabels(), rotation=45)
         
         # Tight layout for better spacing
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save figure if path provided
         if save_path:
-            plt.savefig(save_path, bbox_inches='tight', dpi=300)
+            fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
             logger.info(f"Saved anomaly plot to {save_path}")
         
         return fig
@@ -332,6 +760,14 @@ class AnomalyDetector:
         
         logger.info(f"Added {len(annotations)} annotations to anomalies")
         
+        # Persist the annotations by image id so they survive later runs
+        if self.db_connection and 'id' in annotated_anomalies.columns:
+            self.db_connection.store_anomaly_annotations({
+                annotated_anomalies.loc[idx, 'id']: annotation
+                for idx, annotation in annotations.items()
+                if idx in annotated_anomalies.index
+            })
+        
         # Update the stored anomalies
         self.anomalies = annotated_anomalies
         
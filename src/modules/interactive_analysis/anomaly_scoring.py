@@ -0,0 +1,234 @@
+"""
+Anomaly Scoring
+
+This module provides scoring of processing delays with every anomaly
+detection method at once (z-score, IQR, percentile, absolute threshold and
+robust median absolute deviation) from one sort of the delay array.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Methods scored by score_matrix()
+SCORING_METHODS = ('zscore', 'iqr', 'percentile', 'absolute', 'mad')
+
+# Threshold per method: z-score, IQR multiplier, top percent, minutes, robust z-score
+DEFAULT_THRESHOLDS = {
+    'zscore': 3.0,
+    'iqr': 1.5,
+    'percentile': 1.0,
+    'absolute': 60.0,
+    'mad': 3.5
+}
+
+# Threshold grids of threshold_sweep() per method
+DEFAULT_SWEEP_GRIDS = {
+    'zscore': np.round(np.arange(1.0, 6.01, 0.25), 2),
+    'iqr': np.round(np.arange(0.5, 5.01, 0.25), 2),
+    'percentile': np.array([0.1, 0.25, 0.5, 1.0, 2.0, 2.5, 5.0, 7.5, 10.0, 15.0, 20.0, 25.0]),
+    'absolute': np.arange(15.0, 241.0, 15.0),
+    'mad': np.round(np.arange(1.0, 8.01, 0.5), 2),
+    'seasonal': np.round(np.arange(1.0, 6.01, 0.25), 2)
+}
+
+# Scale that makes the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+
+def _sorted_quantile(sorted_values, q):
+    """Linearly interpolated quantile of an ascending array (as pandas computes it)."""
+    position = q * (len(sorted_values) - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def _exceedance_counts(sorted_values, thresholds):
+    """Count the values strictly above each threshold with one binary search each."""
+    return len(sorted_values) - np.searchsorted(sorted_values, thresholds, side='right')
+
+def delay_statistics(values, thresholds=None):
+    """
+    Compute the statistics every scoring method needs from one sort.
+
+    Args:
+        values: Processing delays.
+        thresholds (dict): Threshold per method (missing methods use DEFAULT_THRESHOLDS).
+
+    Returns:
+        dict: mean, std, median, mad, q1, q3 and percentile_bound.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    values = np.asarray(values, dtype='float64')
+    valid = np.sort(values[~np.isnan(values)])
+
+    if len(valid) == 0:
+        return {key: np.nan for key in ('mean', 'std', 'median', 'mad', 'q1', 'q3', 'percentile_bound')}
+
+    median = _sorted_quantile(valid, 0.5)
+    return {
+        'mean': float(valid.mean()),
+        'std': float(valid.std(ddof=1)) if len(valid) > 1 else np.nan,
+        'median': float(median),
+        'mad': float(np.median(np.abs(valid - median))),
+        'q1': float(_sorted_quantile(valid, 0.25)),
+        'q3': float(_sorted_quantile(valid, 0.75)),
+        'percentile_bound': float(_sorted_quantile(valid, 1 - thresholds['percentile'] / 100))
+    }
+
+def score_values(values, method, stats, threshold):
+    """
+    Score processing delays with one method against given statistics.
+
+    The statistics can come from other data than the values, e.g. from a
+    stored baseline when only newly imported rows are scored.
+
+    Args:
+        values: Processing delays.
+        method (str): Scoring method (see SCORING_METHODS).
+        stats (dict): Statistics as returned by delay_statistics().
+        threshold (float): Threshold of the method.
+
+    Returns:
+        tuple: (scores, flags) arrays.
+    """
+    values = np.asarray(values, dtype='float64')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if method == 'zscore':
+            scores = np.abs(values - stats['mean']) / stats['std']
+            flags = scores > threshold
+        elif method == 'iqr':
+            iqr = stats['q3'] - stats['q1']
+            lower_bound = stats['q1'] - threshold * iqr
+            upper_bound = stats['q3'] + threshold * iqr
+            scores = np.maximum(np.maximum(lower_bound - values, values - upper_bound) / iqr, 0)
+            flags = (values < lower_bound) | (values > upper_bound)
+        elif method == 'percentile':
+            scores = values / stats['percentile_bound']
+            flags = values > stats['percentile_bound']
+        elif method == 'absolute':
+            scores = values / threshold
+            flags = values > threshold
+        elif method == 'mad':
+            scores = np.abs(values - stats['median']) / (MAD_SCALE * stats['mad'])
+            flags = scores > threshold
+        else:
+            raise ValueError(f"Invalid method '{method}'. Valid options: {list(SCORING_METHODS)}")
+
+    return scores, flags
+
+def score_matrix(values, thresholds=None, index=None):
+    """
+    Score processing delays with all methods at once.
+
+    Scores follow AnomalyDetector.detect_anomalies() for each method; the
+    'mad' score is the robust z-score |x - median| / (1.4826 * MAD).
+
+    Args:
+        values: Processing delays.
+        thresholds (dict): Threshold per method (missing methods use DEFAULT_THRESHOLDS).
+        index: Index of the returned frame (e.g. the index of the data rows).
+
+    Returns:
+        DataFrame: float32 '{method}_score' and bool '{method}_anomaly' columns
+                   for every method in SCORING_METHODS.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    values = np.asarray(values, dtype='float64')
+    stats = delay_statistics(values, thresholds)
+
+    scores = {}
+    flags = {}
+    for method in SCORING_METHODS:
+        scores[method], flags[method] = score_values(values, method, stats, thresholds[method])
+
+    columns = {}
+    for method in SCORING_METHODS:
+        columns[f"{method}_score"] = scores[method].astype('float32')
+    for method in SCORING_METHODS:
+        columns[f"{method}_anomaly"] = flags[method]
+
+    matrix = pd.DataFrame(columns, index=index)
+    counts = ', '.join(f"{method}: {int(flags[method].sum())}" for method in SCORING_METHODS)
+    logger.info(f"Scored {len(values)} values with {len(SCORING_METHODS)} methods ({counts})")
+    return matrix
+
+def threshold_sweep(values, methods=None, grids=None, extra_scores=None):
+    """
+    Count the anomalies of each method over a grid of thresholds.
+
+    Every method reduces to "value above threshold" on one array that does
+    not depend on the threshold (the score, the delay or the IQR distance),
+    so each array is sorted once and all thresholds of the grid are answered
+    with searchsorted. Percentile bounds are interpolated from the same
+    sorted delays.
+
+    Args:
+        values: Processing delays.
+        methods (list): Methods to sweep (default: all of SCORING_METHODS and extra_scores).
+        grids (dict): Thresholds per method (missing methods use DEFAULT_SWEEP_GRIDS).
+        extra_scores (dict): Further methods given as score arrays that are
+                             flagged above the threshold (e.g. 'seasonal').
+
+    Returns:
+        DataFrame: method, threshold, anomaly_count and anomaly_percentage
+                   (of all rows) per method and threshold.
+    """
+    grids = {**DEFAULT_SWEEP_GRIDS, **(grids or {})}
+    extra_scores = extra_scores or {}
+    if methods is None:
+        methods = list(SCORING_METHODS) + list(extra_scores)
+
+    values = np.asarray(values, dtype='float64')
+    total = len(values)
+    sorted_values = np.sort(values[~np.isnan(values)])
+
+    tables = []
+    for method in methods:
+        if method not in grids:
+            raise ValueError(f"No threshold grid for method '{method}'")
+        thresholds = np.asarray(grids[method], dtype='float64')
+
+        if len(sorted_values) == 0:
+            counts = np.zeros(len(thresholds), dtype='int64')
+        elif method in extra_scores:
+            scores = np.asarray(extra_scores[method], dtype='float64')
+            counts = _exceedance_counts(np.sort(scores[~np.isnan(scores)]), thresholds)
+        elif method == 'absolute':
+            counts = _exceedance_counts(sorted_values, thresholds)
+        elif method == 'percentile':
+            bounds = np.array([_sorted_quantile(sorted_values, 1 - t / 100) for t in thresholds])
+            counts = _exceedance_counts(sorted_values, bounds)
+        elif method == 'iqr':
+            # Outside [q1 - k * iqr, q3 + k * iqr] is a distance above k in IQR units
+            q1 = _sorted_quantile(sorted_values, 0.25)
+            q3 = _sorted_quantile(sorted_values, 0.75)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                distance = np.maximum(q1 - sorted_values, sorted_values - q3) / (q3 - q1)
+            counts = _exceedance_counts(np.sort(distance[~np.isnan(distance)]), thresholds)
+        elif method in ('zscore', 'mad'):
+            if method == 'zscore':
+                center = sorted_values.mean()
+                scale = sorted_values.std(ddof=1) if len(sorted_values) > 1 else np.nan
+            else:
+                center = _sorted_quantile(sorted_values, 0.5)
+                scale = MAD_SCALE * np.median(np.abs(sorted_values - center))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                scores = np.abs(sorted_values - center) / scale
+            counts = _exceedance_counts(np.sort(scores[~np.isnan(scores)]), thresholds)
+        else:
+            raise ValueError(f"Invalid method '{method}'. Valid options: {list(SCORING_METHODS) + list(extra_scores)}")
+
+        tables.append(pd.DataFrame({
+            'method': method,
+            'threshold': thresholds,
+            'anomaly_count': counts.astype('int64'),
+            'anomaly_percentage': counts / total * 100 if total else 0.0
+        }))
+
+    sweep = pd.concat(tables, ignore_index=True)
+    logger.info(f"Swept {len(sweep)} thresholds over {len(methods)} methods")
+    return sweep
@@ -0,0 +1,253 @@
+"""
+Change Points
+
+This module provides change-point detection on bucketed processing delay
+series (CUSUM and penalised PELT segmentation of mean shifts), to find
+slow drifts and regime changes that per-row thresholds do not see.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CHANGE_POINT_METHODS = ('pelt', 'cusum')
+
+def robust_sigma(values):
+    """
+    Estimate the noise level of a series from its first differences.
+
+    The median absolute deviation of the differences is insensitive to the
+    mean shifts that are being searched for.
+
+    Args:
+        values (ndarray): Series values without NaN.
+
+    Returns:
+        float: Estimated standard deviation of the noise (1.0 if it cannot be estimated).
+    """
+    if len(values) < 3:
+        return 1.0
+
+    differences = np.diff(values)
+    sigma = 1.4826 * np.median(np.abs(differences - np.median(differences))) / np.sqrt(2)
+    if not sigma > 0:
+        sigma = np.std(values)
+    return float(sigma) if sigma > 0 else 1.0
+
+def clip_outliers(values, sigma, window, limit=3.0):
+    """
+    Clip values to within limit sigma of a rolling median of the series.
+
+    The rolling median follows level shifts but not bursts shorter than
+    half the window, so single outlying buckets are pulled back to the
+    level around them while regime changes are kept.
+
+    Args:
+        values (ndarray): Series values without NaN.
+        sigma (float): Noise level.
+        window (int): Number of buckets of the rolling median.
+        limit (float): Clipping distance in units of sigma.
+
+    Returns:
+        ndarray: The clipped values.
+    """
+    level = pd.Series(values).rolling(window, center=True, min_periods=1).median().to_numpy()
+    return np.clip(values, level - limit * sigma, level + limit * sigma)
+
+def pelt_change_points(values, penalty=None, min_size=5, sigma=None):
+    """
+    Find mean shifts with penalised segmentation (PELT).
+
+    Minimises the within-segment sum of squares of the standardised series
+    plus a penalty per change point. Outlying buckets are clipped first (see
+    clip_outliers()), so a single spike cannot pay for a change point. Segment costs come from prefix sums
+    and candidates that can no longer start an optimal segment are pruned,
+    which keeps the search close to linear in the series length.
+
+    Args:
+        values: Series values without NaN, in time order.
+        penalty (float): Cost of one change point (default: 2 * log(n), BIC-like).
+        min_size (int): Minimum number of buckets per segment.
+        sigma (float): Noise level (default: robust_sigma()).
+
+    Returns:
+        list: Positions where a new segment starts.
+    """
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    if n < 2 * min_size:
+        return []
+
+    if sigma is None:
+        sigma = robust_sigma(values)
+    if penalty is None:
+        penalty = 2 * np.log(n)
+
+    values = clip_outliers(values, sigma, 2 * min_size + 1)
+    standardised = (values - values.mean()) / sigma
+    prefix_sum = np.concatenate(([0.0], np.cumsum(standardised)))
+    prefix_sum_sq = np.concatenate(([0.0], np.cumsum(standardised * standardised)))
+
+    best_cost = np.full(n + 1, np.inf)
+    best_cost[0] = -penalty
+    last_change = np.zeros(n + 1, dtype='int64')
+    candidates = np.array([0], dtype='int64')
+
+    for end in range(min_size, n + 1):
+        eligible = candidates[end - candidates >= min_size]
+        lengths = end - eligible
+        segment_sum = prefix_sum[end] - prefix_sum[eligible]
+        costs = (
+            best_cost[eligible]
+            + (prefix_sum_sq[end] - prefix_sum_sq[eligible]) - segment_sum * segment_sum / lengths
+            + penalty
+        )
+
+        best = int(np.argmin(costs))
+        best_cost[end] = costs[best]
+        last_change[end] = eligible[best]
+
+        # Prune candidates that cannot beat the optimum from here on
+        keep = np.ones(len(candidates), dtype=bool)
+        keep[end - candidates >= min_size] = costs - penalty <= best_cost[end]
+        candidates = np.append(candidates[keep], end)
+
+    change_points = []
+    end = n
+    while end > 0:
+        start = int(last_change[end])
+        if start > 0:
+            change_points.append(start)
+        end = start
+
+    return sorted(change_points)
+
+def cusum_threshold(n):
+    """
+    Get the default CUSUM alarm level for a series length.
+
+    With a drift of 0.5 sigma, a two-sided CUSUM on in-control Gaussian
+    noise raises a false alarm about every exp(threshold + 1.166) buckets
+    (Siegmund's approximation). An alarm level of log(n) therefore keeps
+    the expected number of false alarms over the whole series around 0.3,
+    where the textbook level of 5 gives one about every 470 buckets.
+
+    Args:
+        n (int): Number of buckets.
+
+    Returns:
+        float: Alarm level in units of sigma (at least 5).
+    """
+    return max(5.0, float(np.log(max(n, 1))))
+
+def cusum_change_points(values, threshold=None, drift=0.5, sigma=None, min_size=5):
+    """
+    Find mean shifts with a two-sided CUSUM.
+
+    Deviations from the mean of the current regime (in units of sigma) are
+    accumulated; when the positive or negative sum exceeds the threshold, a
+    change is placed where that excursion began and a new regime starts.
+
+    Args:
+        values: Series values without NaN, in time order.
+        threshold (float): Alarm level of the cumulative sums in units of
+                           sigma (default: cusum_threshold() of the length).
+        drift (float): Allowed slack per bucket in units of sigma.
+        sigma (float): Noise level (default: robust_sigma()).
+        min_size (int): Minimum number of buckets per regime.
+
+    Returns:
+        list: Positions where a new segment starts.
+    """
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    if n < 2 * min_size:
+        return []
+
+    if sigma is None:
+        sigma = robust_sigma(values)
+    if threshold is None:
+        threshold = cusum_threshold(n)
+
+    # Spikes would also shift the running mean of their regime
+    values = clip_outliers(values, sigma, 2 * min_size + 1)
+    prefix_sum = np.concatenate(([0.0], np.cumsum(values)))
+    change_points = []
+    start = 0
+    upper = lower = 0.0
+    upper_start = lower_start = 0
+
+    for i in range(1, n):
+        # Mean of the current regime so far
+        regime_mean = (prefix_sum[i] - prefix_sum[start]) / (i - start)
+        # Clipped, so a single outlying bucket cannot raise an alarm on its own
+        deviation = min(max((values[i] - regime_mean) / sigma, -3.0), 3.0)
+
+        upper = max(0.0, upper + deviation - drift)
+        lower = max(0.0, lower - deviation - drift)
+        if upper == 0.0:
+            upper_start = i + 1
+        if lower == 0.0:
+            lower_start = i + 1
+
+        # Regimes shorter than min_size are merged into the previous one
+        if (upper > threshold or lower > threshold) and i + 1 - start >= 2 * min_size:
+            change = upper_start if upper > threshold else lower_start
+            change = min(max(change, start + min_size), i + 1 - min_size)
+            change_points.append(change)
+            start = change
+            upper = lower = 0.0
+            upper_start = lower_start = i + 1
+
+    # The last regime must also be long enough
+    if change_points and n - change_points[-1] < min_size:
+        change_points.pop()
+
+    return change_points
+
+def regime_table(times, values, change_points):
+    """
+    Describe each regime boundary with the statistics before and after it.
+
+    Args:
+        times: Time of each bucket.
+        values: Value of each bucket.
+        change_points (list): Positions where a new segment starts.
+
+    Returns:
+        DataFrame: change_time, before/after start, end, count, mean and std,
+                   and the shift of the mean (absolute and in percent).
+    """
+    times = pd.Series(pd.to_datetime(times)).reset_index(drop=True)
+    values = np.asarray(values, dtype='float64')
+    bounds = [0] + list(change_points) + [len(values)]
+
+    rows = []
+    for i in range(1, len(bounds) - 1):
+        before = values[bounds[i - 1]:bounds[i]]
+        after = values[bounds[i]:bounds[i + 1]]
+        before_mean = before.mean()
+        after_mean = after.mean()
+        rows.append({
+            'change_time': times[bounds[i]],
+            'before_start': times[bounds[i - 1]],
+            'before_end': times[bounds[i] - 1],
+            'before_count': len(before),
+            'before_mean': before_mean,
+            'before_std': before.std(ddof=1) if len(before) > 1 else np.nan,
+            'after_start': times[bounds[i]],
+            'after_end': times[bounds[i + 1] - 1],
+            'after_count': len(after),
+            'after_mean': after_mean,
+            'after_std': after.std(ddof=1) if len(after) > 1 else np.nan,
+            'shift': after_mean - before_mean,
+            'pct_change': (after_mean - before_mean) / before_mean * 100 if before_mean != 0 else np.nan
+        })
+
+    return pd.DataFrame(rows, columns=[
+        'change_time', 'before_start', 'before_end', 'before_count', 'before_mean', 'before_std',
+        'after_start', 'after_end', 'after_count', 'after_mean', 'after_std', 'shift', 'pct_change'
+    ])
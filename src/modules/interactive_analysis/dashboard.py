@@ -10,27 +10,105 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from dash import Dash, html, dcc, callback, Output, Input, State
+import plotly.io as pio
+from dash import Dash, html, dcc, callback, callback_context, no_update, Output, Input, State
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 from datetime import datetime, timedelta
 import logging
+import threading
+import time
+import json
+import uuid
+from urllib.parse import urlencode
+from flask import Response, request, g
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import flask_compress
+except ImportError:
+    flask_compress = None
+
+from .downsampling import downsample_frame, granularity_for_window, DEFAULT_POINT_BUDGET
+from .dataset_store import DatasetStore
+from .shared_dataset_store import SharedDatasetStore, ARROW_AVAILABLE
+from .exports import export_query, csv_stream, render_timeline_png, EXPORT_CHUNK_ROWS
+from .request_coalescing import RequestCoalescer, SupersededError
+from .incremental_aggregates import (
+    cell_summary, merge_cell_summaries, summary_statistics, summary_grid, merge_time_patterns
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Whether callback responses can be encoded with orjson and gzip-compressed
+ORJSON_AVAILABLE = orjson is not None
+COMPRESSION_AVAILABLE = flask_compress is not None
+
+# Plot width assumed when the browser has not reported one
+DEFAULT_PLOT_WIDTH = 1000
+
+# Values of the date range dropdown
+DATE_RANGE_VALUES = ['last_7_days', 'last_30_days', 'all']
+
+# Metrics of the timeline
+TIMELINE_METRICS = ['mean', 'median', 'count']
+
+# Values of the timeline granularity dropdown
+TIMELINE_GRANULARITIES = ['hour', 'day', 'week']
+
+# Granularities a zoomed timeline can switch between
+ZOOM_GRANULARITIES = ['minute', 'hour', 'day', 'week', 'month']
+
+# Reports the visible x range of the timeline and its pixel width after zooming
+TIMELINE_VIEWPORT_JS = """
+function(relayoutData) {
+    if (!relayoutData) {
+        return window.dash_clientside.no_update;
+    }
+    var graph = document.getElementById('timeline-graph');
+    var width = graph ? graph.offsetWidth : null;
+    if (relayoutData['xaxis.autorange']) {
+        return {width: width};
+    }
+    var range = relayoutData['xaxis.range'] ||
+        [relayoutData['xaxis.range[0]'], relayoutData['xaxis.range[1]']];
+    if (range[0] === undefined || range[1] === undefined) {
+        return window.dash_clientside.no_update;
+    }
+    return {start: range[0], end: range[1], width: width};
+}
+"""
+
 class Dashboard:
     """
     Class for creating an interactive web dashboard for data analysis.
     """
     
-    def __init__(self, db_connection=None, timeline_analyzer=None, anomaly_detector=None):
+    def __init__(self, db_connection=None, timeline_analyzer=None, anomaly_detector=None, dataset_dir=None,
+                 job_dir=None):
         """
         Initialize the Dashboard.
         
+        Callbacks do not use the given analyzers directly: each request works
+        on its own instances of their classes (and its own database
+        connection), so the app can be served by several threads or worker
+        processes. Leaving out an analyzer disables its part of the dashboard.
+        
         Args:
             db_connection: Database connection object.
             timeline_analyzer: TimelineAnalyzer instance.
             anomaly_detector: AnomalyDetector instance.
+            dataset_dir (str): Directory to share the selected datasets between
+                               worker processes as memory-mapped Arrow files
+                               (requires pyarrow); None keeps them in memory.
+            job_dir (str): Directory of a local disk queue to run the loading and
+                           analysis callbacks as background jobs with progress
+                           reporting (requires diskcache); None runs them in the request.
         """
         self.db_connection = db_connection
         self.timeline_analyzer = timeline_analyzer
@@ -38,6 +116,63 @@ class Dashboard:
         self.app = None
         self.available_dates = []
         self.data = None
+        self.max_timeline_points = DEFAULT_POINT_BUDGET
+        
+        self.incident_max_gap = '30min'
+        
+        # Seconds between polls for newly imported rows when live updates are on
+        self.refresh_interval = 30
+        
+        # Identical requests in progress are computed once; a dropdown change
+        # waits briefly for the next one and cancels the older requests of its tab
+        self.request_coalescer = RequestCoalescer(debounce=0.1)
+        
+        # Background jobs run in their own processes and share datasets through files
+        if job_dir and not dataset_dir:
+            dataset_dir = os.path.join(job_dir, 'datasets')
+        
+        # Selected datasets stay on the server; callbacks pass their token.
+        # Score matrices and timeline aggregates of the stored datasets are
+        # kept by dataset token.
+        if dataset_dir and ARROW_AVAILABLE:
+            self.dataset_store = SharedDatasetStore(dataset_dir)
+            self.score_store = SharedDatasetStore(os.path.join(dataset_dir, 'scores'))
+            self.aggregate_store = SharedDatasetStore(os.path.join(dataset_dir, 'aggregates'), max_entries=32)
+        else:
+            if dataset_dir:
+                logger.warning("pyarrow is not installed; datasets are kept in memory per worker")
+            self.dataset_store = DatasetStore()
+            self.score_store = DatasetStore()
+            self.aggregate_store = DatasetStore(max_entries=32)
+        self._scoring_lock = threading.Lock()
+        
+        self.job_manager = self._create_job_manager(job_dir) if job_dir else None
+    
+    def _create_job_manager(self, job_dir):
+        """
+        Create the local disk queue for background callbacks.
+        
+        Args:
+            job_dir (str): Directory of the queue.
+            
+        Returns:
+            DiskcacheManager: The job manager, or None if it cannot be used.
+        """
+        if not isinstance(self.dataset_store, SharedDatasetStore):
+            logger.warning("Background jobs need a shared dataset store (pyarrow); callbacks run in the request")
+            return None
+            
+        try:
+            import diskcache
+            from dash import DiskcacheManager
+            
+            manager = DiskcacheManager(diskcache.Cache(job_dir), expire=3600)
+            logger.info(f"Running dashboard computations as background jobs queued in {job_dir}")
+            return manager
+            
+        except ImportError as e:
+            logger.warning(f"Background jobs unavailable ({str(e)}); callbacks run in the request")
+            return None
     
     def initialize_app(self):
         """
@@ -46,9 +181,17 @@ class Dashboard:
         Returns:
             Dash: The initialized Dash application.
         """
-        # Create the Dash app
+        # Encode figures with orjson (much faster on large arrays) when installed
+        if ORJSON_AVAILABLE:
+            pio.json.config.default_engine = "orjson"
+        else:
+            logger.info("orjson is not installed; callback responses use the standard JSON encoder")
+            
+        # Create the Dash app; responses are gzip-compressed when flask-compress is installed
         self.app = Dash(
             __name__,
+            compress=COMPRESSION_AVAILABLE,
+            background_callback_manager=self.job_manager,
             external_stylesheets=[dbc.themes.BOOTSTRAP],
             meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}]
         )
@@ -68,6 +211,12 @@ class Dashboard:
         # Register callbacks
         self._register_callbacks()
         
+        # Register the export downloads
+        self._register_export_routes()
+        
+        # Log the size and build time of callback responses
+        self._register_payload_logging()
+        
         return self.app
     
     def _create_layout(self):
@@ -78,13 +227,13 @@ class Dashboard:
             
         # Create date range options
         date_ranges = [
-            {"label": "Last 7 Days", "value": "last_7_days"},
-            {"label": "Last 30 Days", "value": "last_30_days"},
-            {"label": "All Data", "value": "all"}
+            {"label": "Last 7 Days", "value": DATE_RANGE_VALUES[0]},
+            {"label": "Last 30 Days", "value": DATE_RANGE_VALUES[1]},
+            {"label": "All Data", "value": DATE_RANGE_VALUES[2]}
         ]
         
         # Create the layout - simplified version
-        self.app.layout = dbc.Container([
+        layout = dbc.Container([
             # Header
             dbc.Row([
                 dbc.Col(html.H2("Image Distribution Analysis", className="text-center my-3"), width=12)
@@ -99,7 +248,10 @@ class Dashboard:
                         options=date_ranges,
                         value="last_7_days" if self.available_dates else None,
                         className="mb-3"
-                    )
+                    ),
+                    dbc.Progress(id="main-view-progress", value=0, className="mb-3", style={"display": "none"}),
+                    dbc.Switch(id="live-refresh-switch", label=" Live updates", value=False, className="mb-3"),
+                    dcc.Interval(id="refresh-interval", interval=self.refresh_interval * 1000, disabled=True)
                 ], width={"size": 4, "offset": 4})
             ]),
             
@@ -183,7 +335,7 @@ class Dashboard:
                                             ],
                                             value="hour"
                                         )
-                                    ], width=4),
+                                    ], width=3),
                                     
                                     dbc.Col([
                                         html.Label("Metric:"),
@@ -196,7 +348,21 @@ class Dashboard:
                                             ],
                                             value="mean"
                                         )
-                                    ], width=4),
+                                    ], width=3),
+                                    
+                                    dbc.Col([
+                                        html.Label("Trend Window:"),
+                                        dcc.Dropdown(
+                                            id="rolling-window-dropdown",
+                                            options=[
+                                                {"label": "None", "value": "none"},
+                                                {"label": "1 Hour", "value": "1h"},
+                                                {"label": "24 Hours", "value": "24h"},
+                                                {"label": "7 Days", "value": "7d"}
+                                            ],
+                                            value="none"
+                                        )
+                                    ], width=3),
                                     
                                     dbc.Col([
                                         html.Label("Detect Anomalies:"),
@@ -205,11 +371,24 @@ class Dashboard:
                                             label=' Show anomalies',
                                             value=False,
                                             className="mt-2"
+                                        ),
+                                        dcc.Dropdown(
+                                            id="anomaly-method-dropdown",
+                                            options=[
+                                                {"label": "Z-Score", "value": "zscore"},
+                                                {"label": "IQR", "value": "iqr"},
+                                                {"label": "Percentile", "value": "percentile"},
+                                                {"label": "Absolute Threshold", "value": "absolute"},
+                                                {"label": "Median Absolute Deviation", "value": "mad"}
+                                            ],
+                                            value="zscore",
+                                            clearable=False
                                         )
-                                    ], width=4)
+                                    ], width=3)
                                 ], className="mb-3"),
                                 
                                 # Timeline Graph
+                                dbc.Progress(id="timeline-progress", value=0, className="mb-2", style={"display": "none"}),
                                 dcc.Loading(
                                     id="loading-timeline",
                                     type="circle",
@@ -219,13 +398,17 @@ class Dashboard:
                                 # Export Buttons
                                 dbc.Row([
                                     dbc.Col([
-                                        dbc.Button("Export as PNG", id="btn-export-png", color="primary", className="me-2"),
-                                        dbc.Button("Export as CSV", id="btn-export-csv", color="primary")
+                                        dbc.Checkbox(id="export-gzip", label="Compress CSV (gzip)", value=False, className="me-3 mt-2"),
+                                        dbc.Button("Export as PNG", id="btn-export-png", color="primary", className="me-2", external_link=True),
+                                        dbc.Button("Export as CSV", id="btn-export-csv", color="primary", external_link=True)
                                     ], width=12, className="d-flex justify-content-end mt-3")
                                 ]),
                                 
-                                # Hidden div for storing anomaly data
-                                html.Div(id="anomaly-data-storage", style={"display": "none"})
+                                # Hidden div for the token of the selected dataset
+                                html.Div(id="anomaly-data-storage", style={"display": "none"}),
+                                
+                                # Visible window of the timeline after zooming
+                                dcc.Store(id="timeline-viewport")
                             ])
                         ]),
                         id="collapse-advanced",
@@ -240,6 +423,10 @@ class Dashboard:
             ])
             
         ], fluid=True)
+        
+        # Each page load gets its own client id, which ties together the
+        # callback requests of one browser tab
+        self.app.layout = lambda: html.Div([dcc.Store(id="client-id", data=uuid.uuid4().hex), layout])
     
     def _register_callbacks(self):
         """Register Dash callbacks."""
@@ -259,17 +446,29 @@ class Dashboard:
                 return not is_open, "Advanced Analysis ▼" if not is_open else "Advanced Analysis ▲"
             return is_open, "Advanced Analysis ▼"
         
-        # Update statistics and heatmap
+        # Poll for new rows only while live updates are on
         @self.app.callback(
+            Output("refresh-interval", "disabled"),
+            [Input("live-refresh-switch", "value")]
+        )
+        def toggle_live_refresh(live):
+            return not live
+        
+        # Update statistics and heatmap
+        @self._callback(
             [Output("stat-total-records", "children"),
              Output("stat-avg-delay", "children"),
              Output("stat-min-delay", "children"),
              Output("stat-max-delay", "children"),
              Output("heatmap-graph", "figure"),
              Output("anomaly-data-storage", "children")],
-            [Input("date-range-dropdown", "value")]
+            [Input("date-range-dropdown", "value"),
+             Input("refresh-interval", "n_intervals")],
+            state=[State("anomaly-data-storage", "children")],
+            progress="main-view-progress",
+            supersede=["date-range-dropdown"]
         )
-        def update_main_view(date_range):
+        def update_main_view(set_progress, date_range, n_intervals, current_token):
             if not date_range:
                 return "N/A", "N/A", "N/A", "N/A", go.Figure(), ""
                 
@@ -280,152 +479,184 @@ class Dashboard:
             if not self.timeline_analyzer:
                 return "N/A", "N/A", "N/A", "N/A", go.Figure(), ""
                 
-            self.timeline_analyzer.load_data(date_range=date_range_tuple)
-            
-            # Create a copy to calculate statistics
-            data = self.timeline_analyzer.data.copy()
-            
-            # Get basic statistics
-            total_records = len(data)
-            avg_delay = data['processing_delay_minutes'].mean()
-            min_delay = data['processing_delay_minutes'].min()
-            max_delay = data['processing_delay_minutes'].max()
-            
-            # Format statistics for display
-            total_formatted = f"{total_records:,}"
-            avg_formatted = f"{avg_delay:.1f} min"
-            min_formatted = f"{min_delay:.1f} min"
-            max_formatted = f"{max_delay:.1f} min"
-            
-            # Get weekday-hour heatmap
-            pivot_table = self.timeline_analyzer.analyze_weekday_hour_pattern()
-            
-            if pivot_table is None:
-                heatmap_fig = go.Figure()
-            else:
-                # Sort weekdays in correct order
-                weekday_order = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag']
-                pivot_table = pivot_table.reindex(weekday_order)
-                
-                # Create heatmap figure
-                heatmap_fig = px.imshow(
-                    pivot_table,
-                    labels=dict(x="Hour of Day", y="Weekday", color="Average Delay (minutes)"),
-                    x=pivot_table.columns,
-                    y=pivot_table.index,
-                    color_continuous_scale="YlOrRd",
-                    title=None
-                )
+            # A live update merges only the rows imported since the dataset was loaded
+            triggered = [trigger['prop_id'] for trigger in callback_context.triggered]
+            if "refresh-interval.n_intervals" in triggered and current_token:
+                # Another tab may have replaced the shared dataset of this range;
+                # then continue from the current one
+                if self.dataset_store.get(current_token) is not None:
+                    refreshed = self._refresh_dataset(current_token, date_range, date_range_tuple)
+                    if refreshed is None:
+                        return (no_update,) * 6
+                    data_token, summary = refreshed
+                    return self._main_view_outputs(summary) + (data_token,)
                 
-                # Add text annotations
-                annotations = []
-                for i, row in enumerate(pivot_table.index):
-                    for j, col in enumerate(pivot_table.columns):
-                        annotations.append(
-                            dict(
-                                x=col,
-                                y=row,
-                                text=str(int(pivot_table.loc[row, col])),
-                                showarrow=False,
-                                font=dict(color="black" if pivot_table.loc[row, col] < 30 else "white")
-                            )
-                        )
-                
-                heatmap_fig.update_layout(annotations=annotations)
-                heatmap_fig.update_layout(
-                    height=500,
-                    margin=dict(l=50, r=50, t=30, b=50)
-                )
-            
-            # Store data for anomaly detection (for use in advanced section)
-            anomaly_data = data.to_json(date_format='iso', orient='split') if not data.empty else ""
+            loaded = self._load_main_view(date_range, date_range_tuple, set_progress)
+            if loaded is None:
+                return "N/A", "N/A", "N/A", "N/A", go.Figure(), ""
+            data_token, summary = loaded
             
-            return total_formatted, avg_formatted, min_formatted, max_formatted, heatmap_fig, anomaly_data
+            set_progress((80, "Building heatmap"))
+            return self._main_view_outputs(summary) + (data_token,)
+        
+        # Pass zoom events of the timeline with the plot width to the server
+        self.app.clientside_callback(
+            TIMELINE_VIEWPORT_JS,
+            Output("timeline-viewport", "data"),
+            [Input("timeline-graph", "relayoutData")]
+        )
         
         # Update timeline chart in advanced section
-        @self.app.callback(
+        @self._callback(
             Output("timeline-graph", "figure"),
             [Input("granularity-dropdown", "value"),
              Input("metric-dropdown", "value"),
              Input("anomaly-switch", "value"),
-             Input("anomaly-data-storage", "children")]
+             Input("rolling-window-dropdown", "value"),
+             Input("anomaly-method-dropdown", "value"),
+             Input("anomaly-data-storage", "children"),
+             Input("timeline-viewport", "data")],
+            state=[State("date-range-dropdown", "value")],
+            progress="timeline-progress",
+            cancel=[Input("date-range-dropdown", "value")],
+            supersede=["granularity-dropdown", "anomaly-data-storage"]
         )
-        def update_timeline(granularity, metric, show_anomalies, stored_data):
-            if not granularity or not metric or not stored_data:
+        def update_timeline(set_progress, granularity, metric, show_anomalies, rolling_window, anomaly_method, data_token, viewport,
+                            date_range):
+            if not granularity or not metric or not data_token:
+                return go.Figure()
+            
+            # A zoom re-queries the visible window; any other change shows the full range
+            triggered = [trigger['prop_id'] for trigger in callback_context.triggered]
+            window = None
+            if "timeline-viewport.data" in triggered and viewport and viewport.get('start'):
+                window = (pd.Timestamp(viewport['start']), pd.Timestamp(viewport['end']))
+                granularity = granularity_for_window(
+                    window[0], window[1],
+                    viewport.get('width') or DEFAULT_PLOT_WIDTH,
+                    granularities=ZOOM_GRANULARITIES
+                )
+                
+            data_token = self._current_token(data_token, date_range)
+            data = self.dataset_store.get(data_token)
+            if data is None:
+                logger.warning(f"No stored dataset for {date_range}")
                 return go.Figure()
                 
             if self.timeline_analyzer:
+                # Analyze the stored snapshot with a per-request analyzer
+                timeline_analyzer = self._new_timeline_analyzer()
+                timeline_analyzer.load_data(data=data, copy=False)
+                
                 # Set time granularity
-                self.timeline_analyzer.set_time_granularity(granularity)
+                timeline_analyzer.set_time_granularity(granularity)
                 
-                # Analyze time patterns
-                time_patterns = self.timeline_analyzer.analyze_time_pattern()
+                # Analyze time patterns (of the visible window only when zoomed)
+                set_progress((20, f"Aggregating by {granularity}"))
+                if window:
+                    time_patterns = timeline_analyzer.analyze_time_pattern(start=window[0], end=window[1])
+                else:
+                    time_patterns = self._get_time_patterns(data_token, granularity, timeline_analyzer)
                 
                 if time_patterns is not None:
-                    # Create timeline figure
+                    # Create timeline figure from at most max_timeline_points points, drawn with WebGL
                     column_name = f"processing_delay_minutes_{metric}"
-                    fig = px.line(
-                        time_patterns, 
-                        x="time_group", 
-                        y=column_name,
-                        title=f"{metric.capitalize()} Processing Delay by {granularity.capitalize()}",
-                        labels={
-                            "time_group": granularity.capitalize(),
-                            column_name: f"{metric.capitalize()} Delay (minutes)"
-                        }
+                    series = downsample_frame(time_patterns, 'time_group', column_name, max_points=self.max_timeline_points)
+                    fig = go.Figure(
+                        go.Scattergl(
+                            x=series['time_group'],
+                            y=series[column_name],
+                            mode='lines',
+                            name=f"{metric.capitalize()} delay"
+                        )
                     )
+                    fig.update_layout(title=f"{metric.capitalize()} Processing Delay by {granularity.capitalize()}")
                     
-                    # Add anomalies if requested
-                    if show_anomalies and self.anomaly_detector and stored_data:
-                        # Load the data used for the main view
-                        data = pd.read_json(stored_data, orient='split')
-                        self.anomaly_detector.load_data(data=data)
+                    # Add rolling trend lines if requested
+                    if rolling_window and rolling_window != "none":
+                        set_progress((50, "Computing trends"))
+                        rolling = timeline_analyzer.rolling_metrics(
+                            window=rolling_window,
+                            time_groups=time_patterns['time_group']
+                        )
                         
-                        # Set Z-score method with standard threshold
-                        self.anomaly_detector.set_threshold_method('zscore', value=3.0)
+                        if rolling is not None:
+                            quantile_column = rolling.columns[-1]
+                            rolling_mean = downsample_frame(rolling, 'time_group', 'rolling_mean', max_points=self.max_timeline_points)
+                            rolling_quantile = downsample_frame(rolling, 'time_group', quantile_column, max_points=self.max_timeline_points)
+                            fig.add_trace(
+                                go.Scattergl(
+                                    x=rolling_mean['time_group'],
+                                    y=rolling_mean['rolling_mean'],
+                                    mode='lines',
+                                    line=dict(color='darkorange'),
+                                    name=f"{rolling_window} moving average"
+                                )
+                            )
+                            fig.add_trace(
+                                go.Scattergl(
+                                    x=rolling_quantile['time_group'],
+                                    y=rolling_quantile[quantile_column],
+                                    mode='lines',
+                                    line=dict(color='red', dash='dash'),
+                                    name=f"{rolling_window} {quantile_column.replace('rolling_', '')}"
+                                )
+                            )
+                    
+                    # Add anomalies if requested
+                    if show_anomalies and self.anomaly_detector:
+                        set_progress((70, "Scoring anomalies"))
+                        anomaly_detector = self._new_anomaly_detector()
+                        anomaly_detector.load_data(data=data, copy=False)
                         
-                        # Detect anomalies
-                        anomalies = self.anomaly_detector.detect_anomalies()
+                        # Switching methods only selects from the score matrix of the dataset
+                        anomaly_detector.score_matrix = self._get_score_matrix(data_token, anomaly_detector)
+                        anomalies = anomaly_detector.get_method_anomalies(anomaly_method or 'zscore')
                         
+                        incidents = None
                         if anomalies is not None and not anomalies.empty:
-                            # Convert to time buckets matching the timeline graph
-                            if granularity == 'hour':
-                                anomalies['time_bucket'] = anomalies['bildankunft_timestamp'].dt.floor('H')
-                            elif granularity == 'day':
-                                anomalies['time_bucket'] = anomalies['bildankunft_timestamp'].dt.floor('D')
-                            elif granularity == 'week':
-                                anomalies['time_bucket'] = anomalies['bildankunft_timestamp'].dt.to_period('W').dt.start_time
+                            incidents = anomaly_detector.get_incidents(max_gap=self.incident_max_gap)
+                        
+                        if incidents is not None and not incidents.empty:
+                            # One line segment per incident in a single trace, at 20% of max height
+                            level = time_patterns[column_name].max() * 0.2
+                            segment_x = np.empty(len(incidents) * 3, dtype=object)
+                            segment_x[0::3] = incidents['start'].to_numpy()
+                            segment_x[1::3] = incidents['end'].to_numpy()
+                            segment_x[2::3] = None
+                            segment_y = np.tile([level, level, None], len(incidents))
                             
-                            # Group anomalies by time bucket
-                            anomaly_counts = anomalies.groupby('time_bucket').size().reset_index(name='count')
+                            fig.add_trace(
+                                go.Scattergl(
+                                    x=segment_x,
+                                    y=segment_y,
+                                    mode='lines',
+                                    line=dict(color='red', width=6),
+                                    name='Incidents',
+                                    hoverinfo='skip'
+                                )
+                            )
                             
-                            # Add scatter points for anomaly counts
-                            if not anomaly_counts.empty:
-                                # For each time point in the main graph, find matching anomaly counts
-                                merged = pd.merge(
-                                    time_patterns[['time_group']],
-                                    anomaly_counts,
-                                    left_on='time_group',
-                                    right_on='time_bucket',
-                                    how='left'
-                                ).fillna(0)
-                                
-                                # Add scatter trace for anomalies
-                                fig.add_trace(
-                                    go.Scatter(
-                                        x=merged['time_group'],
-                                        y=[time_patterns[column_name].max() * 0.2] * len(merged),  # Plot at 20% of max height
-                                        mode='markers',
-                                        marker=dict(
-                                            size=merged['count'] * 2,  # Size based on anomaly count
-                                            color='red',
-                                            symbol='x'
-                                        ),
-                                        name='Anomalies',
-                                        hovertemplate='%{x}<br>Anomalies: %{text}<extra></extra>',
-                                        text=merged['count'].astype(int)
+                            # Add a marker at the peak of each incident
+                            fig.add_trace(
+                                go.Scattergl(
+                                    x=incidents['peak_time'],
+                                    y=[level] * len(incidents),
+                                    mode='markers',
+                                    marker=dict(
+                                        size=np.clip(np.sqrt(incidents['count']) * 4, 6, 30),  # Size based on anomaly count
+                                        color='red',
+                                        symbol='x'
+                                    ),
+                                    name='Incident peaks',
+                                    customdata=incidents[['start', 'end', 'count', 'peak_delay']].round({'peak_delay': 1}).astype(str).to_numpy(),
+                                    hovertemplate=(
+                                        '%{customdata[0]} - %{customdata[1]}<br>'
+                                        'Anomalies: %{customdata[2]}<br>'
+                                        'Peak delay: %{customdata[3]} min<extra></extra>'
                                     )
                                 )
+                            )
                     
                     # Customize the figure
                     fig.update_layout(
@@ -436,31 +667,489 @@ class Dashboard:
                         margin=dict(l=50, r=50, t=50, b=50)
                     )
                     
+                    # Keep the zoomed window in view
+                    if window:
+                        fig.update_xaxes(range=[window[0], window[1]])
+                    
                     return fig
             
             # Return empty figure if analysis fails
             return go.Figure()
         
-        # Export buttons - placeholder callbacks
+        # Export buttons link to the streamed downloads of the current selection
         @self.app.callback(
-            Output("btn-export-png", "n_clicks"),
-            [Input("btn-export-png", "n_clicks")]
+            [Output("btn-export-png", "href"),
+             Output("btn-export-csv", "href")],
+            [Input("date-range-dropdown", "value"),
+             Input("granularity-dropdown", "value"),
+             Input("metric-dropdown", "value"),
+             Input("export-gzip", "value"),
+             Input("anomaly-data-storage", "children")]
         )
-        def export_png(n_clicks):
-            if n_clicks:
-                # Implement PNG export functionality here
-                pass
+        def update_export_links(date_range, granularity, metric, compress, data_token):
+            png_href = None
+            if data_token and granularity and metric:
+                png_href = self.app.get_relative_path("/export/timeline.png") + "?" + urlencode(
+                    {"token": data_token, "range": date_range, "granularity": granularity, "metric": metric}
+                )
+                
+            csv_href = None
+            if date_range:
+                csv_href = self.app.get_relative_path("/export/data.csv") + "?" + urlencode(
+                    {"range": date_range, "gzip": int(bool(compress))}
+                )
+                
+            return png_href, csv_href
+    
+    def _register_export_routes(self):
+        """Register the server routes streaming the exports."""
+        server = self.app.server
+        
+        @server.route(self.app.get_relative_path("/export/data.csv"))
+        def export_data_csv():
+            date_range = request.args.get("range", "all")
+            compress = request.args.get("gzip") == "1"
+            if date_range not in DATE_RANGE_VALUES or not self.db_connection:
+                return Response("Unknown date range", status=404)
+                
+            # Rows are read, encoded and sent one chunk at a time
+            query, params = export_query(self._get_date_range(date_range))
+            chunks = self.db_connection.iter_query(query, params, chunksize=EXPORT_CHUNK_ROWS)
+            filename = f"image_data_{date_range}.csv" + (".gz" if compress else "")
+            
+            logger.info(f"Streaming CSV export {filename}")
+            return Response(
+                csv_stream(chunks, compress=compress),
+                mimetype="application/gzip" if compress else "text/csv",
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+            )
+        
+        @server.route(self.app.get_relative_path("/export/timeline.png"))
+        def export_timeline_png():
+            granularity = request.args.get("granularity")
+            metric = request.args.get("metric")
+            if (not self.timeline_analyzer or metric not in TIMELINE_METRICS
+                    or granularity not in self.timeline_analyzer.available_granularities):
+                return Response("Unknown timeline", status=404)
+                
+            data_token = self._current_token(request.args.get("token"), request.args.get("range"))
+            time_patterns = self._get_time_patterns(data_token, granularity)
+            if time_patterns is None:
+                return Response("Dataset expired; reload the dashboard", status=404)
+                
+            png = render_timeline_png(
+                time_patterns,
+                f"processing_delay_minutes_{metric}",
+                title=f"{metric.capitalize()} Processing Delay by {granularity.capitalize()}",
+                ylabel=f"{metric.capitalize()} Delay (minutes)"
+            )
+            return Response(
+                png,
+                mimetype="image/png",
+                headers={"Content-Disposition": f'attachment; filename="timeline_{granularity}_{metric}.png"'}
+            )
+    
+    def _register_payload_logging(self):
+        """Log the payload size and build time of each callback response."""
+        server = self.app.server
+        update_path = self.app.get_relative_path("/_dash-update-component")
+        
+        @server.before_request
+        def start_timer():
+            if request.path == update_path:
+                g.callback_started = time.perf_counter()
+        
+        # Registered after the compression hook, so it runs before it and sees the raw payload
+        @server.after_request
+        def log_payload(response):
+            started = g.pop("callback_started", None)
+            if started is not None and not response.is_streamed:
+                output = (request.get_json(silent=True) or {}).get("output", "unknown")
+                logger.info(f"Callback {output.strip('.')}: {response.calculate_content_length() or 0:,} bytes "
+                            f"in {time.perf_counter() - started:.3f}s")
+            return response
+    
+    def _callback(self, outputs, inputs, state=None, progress=None, cancel=None, supersede=None):
+        """
+        Register a callback, as a background job when a job manager is set.
+        
+        The decorated function gets a set_progress function as its first
+        argument, taking a (percent, label) tuple. In background mode it
+        updates the given progress bar; otherwise it does nothing. A job is
+        cancelled when the same callback is triggered again before it
+        finishes, or when one of the cancel inputs changes.
+        
+        With supersede, callbacks run in the request are coalesced instead:
+        identical requests in progress are computed once, and a change of one
+        of the supersede inputs cancels the requests of the same browser tab
+        still in progress at their next set_progress call (they return no update).
+        
+        Args:
+            outputs: Output(s) of the callback.
+            inputs (list): Inputs of the callback.
+            state (list): States of the callback.
+            progress (str): Id of the dbc.Progress bar showing the job progress.
+            cancel (list): Inputs that cancel a running job.
+            supersede (list): Ids of the inputs whose changes supersede requests in progress.
+            
+        Returns:
+            function: Decorator registering the callback.
+        """
+        def decorator(function):
+            if self.job_manager is None and supersede:
+                def run_coalesced(*args):
+                    *args, client_id = args
+                    triggered = [trigger['prop_id'] for trigger in callback_context.triggered]
+                    key = (function.__name__, json.dumps([triggered, args], sort_keys=True, default=str))
+                    channel = (client_id, function.__name__) if client_id else None
+                    try:
+                        return self.request_coalescer.run(
+                            key,
+                            channel,
+                            lambda check: function(lambda value: check(), *args),
+                            supersede=any(prop.split('.')[0] in supersede for prop in triggered)
+                        )
+                    except SupersededError:
+                        raise PreventUpdate
+                run_coalesced.__name__ = function.__name__
+                return self.app.callback(outputs, inputs, (state or []) + [State("client-id", "data")])(run_coalesced)
+                
+            if self.job_manager is None:
+                def run_in_request(*args):
+                    return function(lambda value: None, *args)
+                run_in_request.__name__ = function.__name__
+                return self.app.callback(outputs, inputs, state or [])(run_in_request)
+                
+            options = {'background': True, 'manager': self.job_manager}
+            if progress:
+                options['progress'] = [Output(progress, "value"), Output(progress, "label")]
+                options['running'] = [(Output(progress, "style"), {"display": "flex"}, {"display": "none"})]
+            if cancel:
+                options['cancel'] = cancel
+            return self.app.callback(outputs, inputs, state or [], **options)(function)
+        return decorator
+    
+    def _heatmap_figure(self, pivot_table):
+        """
+        Create the weekday-hour heatmap figure.
+        
+        Args:
+            pivot_table (DataFrame): Average delay per weekday (rows) and hour (columns).
+            
+        Returns:
+            Figure: The heatmap.
+        """
+        # Create heatmap figure
+        heatmap_fig = px.imshow(
+            pivot_table,
+            labels=dict(x="Hour of Day", y="Weekday", color="Average Delay (minutes)"),
+            x=pivot_table.columns,
+            y=pivot_table.index,
+            color_continuous_scale="YlOrRd",
+            title=None
+        )
+        
+        # Label the cells with their delay in whole minutes; the labels are one
+        # text array of the trace instead of one layout annotation per cell
+        heatmap_fig.update_traces(
+            text=pivot_table.to_numpy().astype(int).astype(str),
+            texttemplate="%{text}"
+        )
+        
+        heatmap_fig.update_layout(
+            height=500,
+            margin=dict(l=50, r=50, t=30, b=50)
+        )
+        return heatmap_fig
+    
+    def _main_view_outputs(self, summary):
+        """
+        Build the statistics cards and the heatmap from a cell summary.
+        
+        Args:
+            summary (DataFrame): Cell summary (see cell_summary()).
+            
+        Returns:
+            tuple: Formatted total, average, min and max delay, and the heatmap figure.
+        """
+        statistics = summary_statistics(summary)
+        
+        # Format statistics for display
+        total_formatted = f"{statistics['rows']:,}"
+        avg_formatted = f"{statistics['mean']:.1f} min"
+        min_formatted = f"{statistics['min']:.1f} min"
+        max_formatted = f"{statistics['max']:.1f} min"
+        
+        # Weekdays in correct order (rows of the grid)
+        pivot_table = pd.DataFrame(
+            summary_grid(summary),
+            index=type(self.timeline_analyzer).WEEKDAY_LABELS,
+            columns=range(24)
+        )
+        
+        return total_formatted, avg_formatted, min_formatted, max_formatted, self._heatmap_figure(pivot_table)
+    
+    def _load_main_view(self, date_range, date_range_tuple, set_progress=None):
+        """
+        Get the dataset and cell summary of a date range.
+        
+        A dataset already stored for the range (by the warm-up or an earlier
+        selection) is reused and only extended with rows imported since;
+        otherwise the range is loaded from the database.
+        
+        Args:
+            date_range (str): Date range dropdown value.
+            date_range_tuple (tuple): Start and end date of the range.
+            set_progress: Function taking a (percent, label) tuple.
+            
+        Returns:
+            tuple: (dataset token, cell summary), or None if loading failed.
+                   The token is empty if the range has no data.
+        """
+        set_progress = set_progress or (lambda value: None)
+        
+        data_token = self.dataset_store.token_for(date_range)
+        if data_token:
+            summary = self.aggregate_store.get(self.aggregate_store.token_for((data_token, 'cells')))
+            if summary is not None and self.dataset_store.get(data_token) is not None:
+                refreshed = self._refresh_dataset(data_token, date_range, date_range_tuple)
+                if refreshed is not None:
+                    return refreshed
+                logger.info(f"Serving {date_range} from cached dataset {data_token[:8]}")
+                return data_token, summary
+                
+        set_progress((10, "Loading data"))
+        timeline_analyzer = self._new_timeline_analyzer(db_connection=self._new_db_connection())
+        if not timeline_analyzer.load_data(date_range=date_range_tuple):
             return None
         
-        @self.app.callback(
-            Output("btn-export-csv", "n_clicks"),
-            [Input("btn-export-csv", "n_clicks")]
+        # The time-sorted data becomes an immutable snapshot for later callbacks
+        data = timeline_analyzer.data
+        
+        # Summarise the data per weekday and hour; statistics and heatmap
+        # come from the summary, which live updates extend
+        set_progress((60, "Computing statistics"))
+        summary = cell_summary(data['bildankunft_timestamp'], data['processing_delay_minutes'])
+        
+        # Keep the data on the server for the advanced section and pass only its token
+        data_token = self.dataset_store.put(data, key=date_range) if not data.empty else ""
+        if data_token:
+            self.aggregate_store.put(summary, key=(data_token, 'cells'))
+        return data_token, summary
+    
+    def warm_up(self, date_ranges=None, granularities=None, background=True):
+        """
+        Precompute the views of the date range options, so selecting them is served from cache.
+        
+        For each date range, the dataset and its cell summary are stored, the
+        statistics and heatmap are built once, and the timeline aggregates of
+        each granularity are computed. Progress and readiness are logged.
+        
+        Args:
+            date_ranges (list): Date range dropdown values (default: all options).
+            granularities (list): Timeline granularities (default: all dropdown options).
+            background (bool): Whether to run in a daemon thread and return at once.
+            
+        Returns:
+            threading.Thread: The warm-up thread if run in the background, else None.
+        """
+        if background:
+            thread = threading.Thread(
+                target=self.warm_up,
+                args=(date_ranges, granularities, False),
+                name="dashboard-warm-up",
+                daemon=True
+            )
+            thread.start()
+            return thread
+            
+        if not self.db_connection or not self.timeline_analyzer:
+            logger.warning("Dashboard cache warm-up skipped: no database or timeline analyzer")
+            return None
+            
+        date_ranges = date_ranges or DATE_RANGE_VALUES
+        granularities = granularities or TIMELINE_GRANULARITIES
+        logger.info(f"Dashboard cache warm-up started for {len(date_ranges)} date ranges")
+        started = time.perf_counter()
+        
+        for date_range in date_ranges:
+            range_started = time.perf_counter()
+            try:
+                loaded = self._load_main_view(date_range, self._get_date_range(date_range))
+                if loaded is None:
+                    logger.warning(f"Dashboard cache warm-up could not load {date_range}")
+                    continue
+                data_token, summary = loaded
+                
+                # Building the figures once also loads the plotting code paths
+                self._main_view_outputs(summary)
+                if data_token:
+                    for granularity in granularities:
+                        self._get_time_patterns(data_token, granularity)
+                        
+                logger.info(f"Dashboard cache ready for {date_range} "
+                            f"({int(summary['rows'].sum())} rows, {time.perf_counter() - range_started:.1f}s)")
+                
+            except Exception as e:
+                logger.error(f"Dashboard cache warm-up failed for {date_range}: {str(e)}")
+                
+        logger.info(f"Dashboard cache warm-up finished in {time.perf_counter() - started:.1f}s")
+        return None
+    
+    def _refresh_dataset(self, data_token, date_range, date_range_tuple):
+        """
+        Merge the rows imported since a dataset was loaded into it and its aggregates.
+        
+        Only rows past the dataset's watermark (its highest id) are queried.
+        The cell summary is extended with them, and cached timeline
+        aggregates are recomputed from the first time group that received
+        new rows; everything before is kept.
+        
+        Args:
+            data_token (str): Token of the current dataset.
+            date_range (str): Date range dropdown value the dataset was loaded for.
+            date_range_tuple (tuple): Start and end date of that range.
+            
+        Returns:
+            tuple: (token of the extended dataset, its cell summary), or None
+                   if there are no new rows or the dataset is not stored.
+        """
+        data = self.dataset_store.get(data_token)
+        if data is None or data.empty or 'id' not in data.columns:
+            return None
+            
+        # New rows may fall on days after the end of the range
+        watermark = int(data['id'].max())
+        delta_range = (date_range_tuple[0], None) if date_range_tuple else None
+        
+        delta_analyzer = self._new_timeline_analyzer(db_connection=self._new_db_connection())
+        if not delta_analyzer.load_data(date_range=delta_range, after_id=watermark) or delta_analyzer.data.empty:
+            return None
+        delta = delta_analyzer.data
+        
+        # Extend the snapshot (sorted again only if the new rows arrive out of order)
+        timeline_analyzer = self._new_timeline_analyzer()
+        timeline_analyzer.load_data(data=pd.concat([data, delta], ignore_index=True), copy=False)
+        merged = timeline_analyzer.data
+        new_token = self.dataset_store.put(merged, key=date_range)
+        
+        # Merge the delta into the cell summary
+        summary = self.aggregate_store.get(self.aggregate_store.token_for((data_token, 'cells')))
+        if summary is None:
+            summary = cell_summary(data['bildankunft_timestamp'], data['processing_delay_minutes'])
+        summary = merge_cell_summaries(
+            summary, cell_summary(delta['bildankunft_timestamp'], delta['processing_delay_minutes'])
         )
-        def export_csv(n_clicks):
-            if n_clicks:
-                # Implement CSV export functionality here
-                pass
+        self.aggregate_store.put(summary, key=(new_token, 'cells'))
+        
+        # Recompute cached timeline aggregates from the first changed time group
+        first_new = delta['bildankunft_timestamp'].min()
+        for granularity in timeline_analyzer.available_granularities:
+            time_patterns = self.aggregate_store.get(self.aggregate_store.token_for((data_token, granularity)))
+            if time_patterns is None:
+                continue
+            timeline_analyzer.set_time_granularity(granularity)
+            if pd.isna(first_new):
+                recomputed = timeline_analyzer.analyze_time_pattern()
+            else:
+                recomputed = timeline_analyzer.analyze_time_pattern(start=first_new)
+            self.aggregate_store.put(merge_time_patterns(time_patterns, recomputed), key=(new_token, granularity))
+        
+        logger.info(f"Merged {len(delta)} new rows past id {watermark} into dataset {new_token[:8]}")
+        return new_token, summary
+    
+    def _current_token(self, data_token, date_range):
+        """
+        Get the token of the dataset a tab should use.
+        
+        Tabs showing the same date range share its dataset; when one of them
+        extends it, the others' token is replaced by the newest one stored
+        for the range.
+        
+        Args:
+            data_token (str): Token the tab holds.
+            date_range (str): Date range dropdown value of the tab.
+            
+        Returns:
+            str: A token of a stored dataset, or None if there is none.
+        """
+        if data_token and self.dataset_store.get(data_token) is not None:
+            return data_token
+        if date_range not in DATE_RANGE_VALUES:
+            return None
+        return self.dataset_store.token_for(date_range)
+    
+    def _new_db_connection(self):
+        """
+        Create a database connection for one request.
+        
+        Returns:
+            Database: A new connection to the dashboard's database, or None without one.
+        """
+        if self.db_connection is None:
             return None
+        return type(self.db_connection)(self.db_connection.db_path)
+    
+    def _new_timeline_analyzer(self, db_connection=None):
+        """Create a TimelineAnalyzer of the dashboard's analyzer class for one request."""
+        return type(self.timeline_analyzer)(db_connection=db_connection)
+    
+    def _new_anomaly_detector(self):
+        """Create an AnomalyDetector for one request, configured like the dashboard's one."""
+        anomaly_detector = type(self.anomaly_detector)()
+        anomaly_detector.seasonal_min_samples = self.anomaly_detector.seasonal_min_samples
+        return anomaly_detector
+    
+    def _get_time_patterns(self, data_token, granularity, timeline_analyzer=None):
+        """
+        Get the timeline aggregates of a stored dataset, computing them on first use.
+        
+        Args:
+            data_token (str): Token of the dataset in the dataset store.
+            granularity (str): Time granularity of the aggregates.
+            timeline_analyzer: TimelineAnalyzer with the dataset loaded (created if not given).
+            
+        Returns:
+            DataFrame: Aggregates per time group (see analyze_time_pattern()),
+                       or None if the dataset is not stored.
+        """
+        key = (data_token, granularity)
+        time_patterns = self.aggregate_store.get(self.aggregate_store.token_for(key))
+        if time_patterns is not None:
+            return time_patterns
+            
+        if timeline_analyzer is None:
+            data = self.dataset_store.get(data_token)
+            if data is None:
+                return None
+            timeline_analyzer = self._new_timeline_analyzer()
+            timeline_analyzer.load_data(data=data, copy=False)
+            timeline_analyzer.set_time_granularity(granularity)
+            
+        time_patterns = timeline_analyzer.analyze_time_pattern()
+        if time_patterns is not None:
+            self.aggregate_store.put(time_patterns, key=key)
+        return time_patterns
+    
+    def _get_score_matrix(self, data_token, anomaly_detector):
+        """
+        Get the score matrix of a stored dataset, computing it on first use.
+        
+        Args:
+            data_token (str): Token of the dataset in the dataset store.
+            anomaly_detector: AnomalyDetector with the dataset loaded.
+            
+        Returns:
+            DataFrame: Scores and flags of every method (see compute_score_matrix()).
+        """
+        # Concurrent requests for the same dataset score it only once
+        with self._scoring_lock:
+            matrix = self.score_store.get(self.score_store.token_for(data_token))
+            if matrix is None:
+                matrix = anomaly_detector.compute_score_matrix()
+                if matrix is not None:
+                    self.score_store.put(matrix, key=data_token)
+        return matrix
     
     def _get_date_range(self, date_range_value):
         """Convert date range dropdown value to date tuple."""
@@ -484,16 +1173,28 @@ class Dashboard:
             
         return None
     
-    def run_server(self, debug=False, port=8050):
+    def run_server(self, debug=False, port=8050, threaded=True, processes=1):
         """
         Run the Dash server.
         
         Args:
             debug (bool): Whether to run in debug mode.
             port (int): Port to run the server on.
+            threaded (bool): Whether to handle requests in parallel threads.
+            processes (int): Maximum number of worker processes; more than one
+                             requires a dataset_dir so workers share the datasets.
+                             Each request then runs in a process of its own, so
+                             identical requests are not coalesced and superseded
+                             requests are not cancelled.
         """
         if self.app is None:
             self.initialize_app()
             
+        if processes > 1:
+            if not isinstance(self.dataset_store, SharedDatasetStore):
+                logger.warning("Worker processes do not share datasets without a dataset_dir")
+            logger.warning("Requests are not coalesced or cancelled across worker processes")
+            threaded = False
+            
         logger.info(f"Starting dashboard server on port {port}")
-        self.app.run_server(debug=debug, port=port) 
\ No newline at end of file
+        self.app.run(debug=debug, port=port, threaded=threaded, processes=processes) 
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Dataset Store
+
+This module provides a server-side store for the datasets selected in the
+dashboard, so callbacks exchange a short token instead of serialising the
+data through the browser.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class DatasetStore:
+    """
+    Thread-safe least-recently-used store of DataFrames keyed by token.
+    """
+
+    def __init__(self, max_entries=8):
+        """
+        Initialize the DatasetStore.
+
+        Args:
+            max_entries (int): Number of datasets kept before the least
+                               recently used one is dropped.
+        """
+        self.max_entries = max_entries
+        self._datasets = OrderedDict()
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def put(self, data, key=None):
+        """
+        Store a dataset.
+
+        Args:
+            data (DataFrame): Dataset to store.
+            key: Optional hashable description of the dataset (e.g. the
+                 selected date range); storing under an existing key
+                 replaces that dataset.
+
+        Returns:
+            str: Token to retrieve the dataset with.
+        """
+        token = uuid.uuid4().hex
+
+        with self._lock:
+            if key is not None and key in self._tokens:
+                self._datasets.pop(self._tokens[key], None)
+
+            self._datasets[token] = (key, data)
+            if key is not None:
+                self._tokens[key] = token
+
+            while len(self._datasets) > self.max_entries:
+                _, (evicted_key, _) = self._datasets.popitem(last=False)
+                if evicted_key is not None and self._tokens.get(evicted_key) not in self._datasets:
+                    self._tokens.pop(evicted_key, None)
+
+        logger.info(f"Stored dataset {token[:8]} with {len(data)} rows")
+        return token
+
+    def get(self, token):
+        """
+        Get a stored dataset.
+
+        Args:
+            token (str): Token returned by put().
+
+        Returns:
+            DataFrame: The dataset, or None if the token is unknown or expired.
+        """
+        with self._lock:
+            entry = self._datasets.get(token)
+            if entry is None:
+                return None
+            self._datasets.move_to_end(token)
+            return entry[1]
+
+    def token_for(self, key):
+        """
+        Get the token of the dataset stored under a key.
+
+        Args:
+            key: Key passed to put().
+
+        Returns:
+            str: The token, or None if nothing is stored under the key.
+        """
+        with self._lock:
+            return self._tokens.get(key)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._datasets)
@@ -0,0 +1,135 @@
+"""
+Downsampling
+
+This module provides largest-triangle-three-buckets (LTTB) downsampling
+of time series, so timelines can be drawn with a fixed point budget while
+keeping their visual shape, including peaks and spikes.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default number of points sent to a plot
+DEFAULT_POINT_BUDGET = 2000
+
+# Length of one time group per granularity in seconds (months and years on average)
+GRANULARITY_SECONDS = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+    'week': 604800,
+    'month': 2629746,
+    'year': 31556952
+}
+
+def lttb_indices(x, y, max_points=DEFAULT_POINT_BUDGET, preserve_extrema=True):
+    """
+    Select the points of a series to keep with largest-triangle-three-buckets.
+
+    The first and last points are always kept. The points in between are
+    split into max_points - 2 buckets and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket is kept, which favours peaks and spikes.
+
+    Args:
+        x: X values (numbers or datetimes), sorted ascending.
+        y: Y values.
+        max_points (int): Point budget.
+        preserve_extrema (bool): Always keep the global minimum and maximum,
+                                 which can exceed the budget by two points.
+
+    Returns:
+        ndarray: Sorted positions of the points to keep.
+    """
+    n = len(y)
+    if max_points is None or n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x = pd.DatetimeIndex(x).asi8
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # NaN gaps would poison the triangle areas; treat them as the series mean
+    filled = np.where(np.isnan(y), np.nanmean(y) if not np.isnan(y).all() else 0.0, y)
+
+    # Bucket edges over the points between the first and the last one
+    edges = np.linspace(1, n - 1, max_points - 1).astype('int64')
+
+    selected = np.empty(max_points, dtype='int64')
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        next_x = x[next_start:next_end].mean()
+        next_y = filled[next_start:next_end].mean()
+
+        # Twice the triangle area for every candidate in the bucket
+        areas = np.abs(
+            (x[previous] - next_x) * (filled[start:end] - filled[previous])
+            - (x[previous] - x[start:end]) * (next_y - filled[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    if preserve_extrema and not np.isnan(y).all():
+        selected = np.union1d(selected, [np.nanargmax(y), np.nanargmin(y)])
+
+    return selected
+
+def downsample_frame(df, x_column, y_column, max_points=DEFAULT_POINT_BUDGET):
+    """
+    Downsample the rows of a DataFrame along one of its series.
+
+    Args:
+        df (DataFrame): Data sorted by x_column.
+        x_column (str): Column with the x values.
+        y_column (str): Column with the y values that drives the selection.
+        max_points (int): Point budget.
+
+    Returns:
+        DataFrame: The selected rows (the frame itself if within budget).
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+
+    positions = lttb_indices(df[x_column], df[y_column], max_points=max_points)
+    logger.info(f"Downsampled {len(df)} points to {len(positions)} for plotting")
+    return df.iloc[positions]
+
+def granularity_for_window(start, end, pixel_width, points_per_pixel=1.0, granularities=None):
+    """
+    Choose the finest time granularity at which a window fits its pixel width.
+
+    Args:
+        start: Start of the visible window.
+        end: End of the visible window.
+        pixel_width (int): Width of the plot in pixels.
+        points_per_pixel (float): Time groups allowed per pixel.
+        granularities (list): Candidate granularities (default: all of GRANULARITY_SECONDS).
+
+    Returns:
+        str: The finest granularity with at most pixel_width * points_per_pixel
+             time groups in the window, or the coarsest candidate if none fits.
+    """
+    candidates = sorted(granularities or GRANULARITY_SECONDS, key=GRANULARITY_SECONDS.get)
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    budget = max(pixel_width, 1) * points_per_pixel
+
+    for granularity in candidates:
+        if span / GRANULARITY_SECONDS[granularity] <= budget:
+            return granularity
+
+    return candidates[-1]
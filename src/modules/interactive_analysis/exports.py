@@ -0,0 +1,104 @@
+"""
+Exports
+
+This module provides the dashboard exports: CSV streamed from the
+database in chunks (optionally gzip-compressed) and PNG timelines
+rendered on the server from aggregated data.
+"""
+
+import io
+import zlib
+import logging
+from matplotlib.figure import Figure
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Rows of the selected range in import order (no sort over the whole table)
+EXPORT_QUERY = """
+    SELECT
+        id, bildankunft_timestamp, activation_timestamp,
+        processing_delay_minutes, weekday, hour, date
+    FROM image_data
+"""
+
+# Rows read from the database per chunk
+EXPORT_CHUNK_ROWS = 50000
+
+def export_query(date_range=None):
+    """
+    Build the export query for a date range.
+
+    Args:
+        date_range (tuple): Start and end date, or None for all data.
+
+    Returns:
+        tuple: (query, params).
+    """
+    query = EXPORT_QUERY
+    params = None
+    if date_range:
+        query += " WHERE date BETWEEN ? AND ?"
+        params = tuple(date_range)
+    return query + " ORDER BY id", params
+
+def csv_stream(chunks, compress=False):
+    """
+    Encode DataFrame chunks as one CSV byte stream.
+
+    Only the current chunk is held in memory; with compress, the stream is
+    gzip-compressed on the fly.
+
+    Args:
+        chunks: Iterable of DataFrames with the same columns.
+        compress (bool): Whether to gzip the stream.
+
+    Yields:
+        bytes: The next part of the CSV file.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    header = True
+
+    for chunk in chunks:
+        part = chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+        if compressor:
+            part = compressor.compress(part)
+        if part:
+            yield part
+
+    if compressor:
+        yield compressor.flush()
+
+def render_timeline_png(time_patterns, column, title=None, ylabel=None, figsize=(12, 4), dpi=150):
+    """
+    Render an aggregated timeline as PNG.
+
+    Uses a standalone matplotlib Figure (no pyplot state), so it is safe to
+    call from concurrent requests.
+
+    Args:
+        time_patterns (DataFrame): Aggregates with a time_group column.
+        column (str): Column to plot.
+        title (str): Plot title.
+        ylabel (str): Y-axis label.
+        figsize (tuple): Figure size in inches.
+        dpi (int): Resolution.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.plot(time_patterns['time_group'], time_patterns[column], linewidth=1)
+    ax.set_title(title or column)
+    ax.set_ylabel(ylabel or column)
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    logger.info(f"Rendered timeline PNG from {len(time_patterns)} points ({buffer.tell()} bytes)")
+    return buffer.getvalue()
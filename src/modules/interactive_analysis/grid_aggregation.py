@@ -0,0 +1,86 @@
+"""
+Grid Aggregation
+
+This module provides locale-independent aggregation of processing delays
+into two-dimensional grids (weekday x hour, day x hour, month x hour)
+using integer cell codes and weighted bincounts instead of pivot tables.
+"""
+
+import numpy as np
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Aggregation layers supported by aggregate_grid()
+GRID_LAYERS = ('mean', 'count', 'max', 'sum')
+
+def time_codes(timestamps, unit):
+    """
+    Get integer time codes for a series of timestamps.
+
+    Args:
+        timestamps (Series): Datetime series.
+        unit (str): 'hour' (0-23), 'weekday' (0=Monday-6), 'day' (1-31) or 'month' (1-12).
+
+    Returns:
+        ndarray: int64 codes, -1 where the timestamp is missing.
+    """
+    accessor = {
+        'hour': 'hour',
+        'weekday': 'dayofweek',
+        'day': 'day',
+        'month': 'month'
+    }[unit]
+    codes = getattr(timestamps.dt, accessor).to_numpy(dtype='float64')
+    return np.where(np.isnan(codes), -1, codes).astype('int64')
+
+def aggregate_grid(row_codes, column_codes, values, shape, layer='mean', fill_value=np.nan):
+    """
+    Aggregate values into a grid of cells addressed by integer codes.
+
+    Args:
+        row_codes (ndarray): Row index of each value (negative to skip).
+        column_codes (ndarray): Column index of each value (negative to skip).
+        values (ndarray): Values to aggregate (NaN values are skipped).
+        shape (tuple): Number of rows and columns of the grid.
+        layer (str): Aggregation ('mean', 'count', 'max' or 'sum').
+        fill_value (float): Value for cells without data (count cells are 0).
+
+    Returns:
+        ndarray: Grid of aggregated values with the given shape.
+    """
+    if layer not in GRID_LAYERS:
+        raise ValueError(f"Invalid layer '{layer}'. Valid options: {list(GRID_LAYERS)}")
+
+    n_rows, n_cols = shape
+    row_codes = np.asarray(row_codes, dtype='int64')
+    column_codes = np.asarray(column_codes, dtype='int64')
+    values = np.asarray(values, dtype='float64')
+
+    valid = (
+        ~np.isnan(values)
+        & (row_codes >= 0) & (row_codes < n_rows)
+        & (column_codes >= 0) & (column_codes < n_cols)
+    )
+    cells = row_codes[valid] * n_cols + column_codes[valid]
+    values = values[valid]
+    n_cells = n_rows * n_cols
+
+    count = np.bincount(cells, minlength=n_cells)
+
+    if layer == 'count':
+        grid = count.astype('float64')
+    elif layer == 'max':
+        grid = np.full(n_cells, -np.inf)
+        np.maximum.at(grid, cells, values)
+    else:
+        grid = np.bincount(cells, weights=values, minlength=n_cells)
+        if layer == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                grid = grid / count
+
+    if layer != 'count':
+        grid[count == 0] = fill_value
+
+    return grid.reshape(n_rows, n_cols)
@@ -0,0 +1,88 @@
+"""
+Incidents
+
+This module provides grouping of anomalous rows into incidents, i.e.
+bursts of slow images that arrive close together, with their start,
+end, peak and size.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+INCIDENT_COLUMNS = [
+    'incident_id', 'start', 'end', 'duration_minutes', 'count',
+    'peak_time', 'peak_delay', 'mean_delay'
+]
+
+def group_incidents(anomalies, max_gap='30min', min_count=1,
+                    time_column='bildankunft_timestamp', value_column='processing_delay_minutes'):
+    """
+    Group anomalies into incidents with a max-gap rule.
+
+    Consecutive anomalies (in time order) belong to the same incident when
+    they are at most max_gap apart. The runs are found with one diff and
+    cumulative sum, and all incident statistics with reduceat over the runs.
+
+    Args:
+        anomalies (DataFrame): Anomalous rows.
+        max_gap (str): Largest gap within an incident as a pandas offset string.
+        min_count (int): Minimum number of anomalies for an incident to be kept.
+        time_column (str): Name of the arrival time column.
+        value_column (str): Name of the processing delay column.
+
+    Returns:
+        DataFrame: One row per incident (see INCIDENT_COLUMNS).
+    """
+    timestamps = pd.to_datetime(anomalies[time_column])
+    valid = timestamps.notna().to_numpy()
+    keys = timestamps.to_numpy(dtype='datetime64[ns]')[valid].astype('int64')
+    values = anomalies[value_column].to_numpy(dtype='float64')[valid]
+
+    if len(keys) == 0:
+        return pd.DataFrame(columns=INCIDENT_COLUMNS)
+
+    # Detector output is usually time-sorted already; sort only if needed
+    if np.any(np.diff(keys) < 0):
+        order = np.argsort(keys, kind='mergesort')
+        keys = keys[order]
+        values = values[order]
+
+    # A new incident starts wherever the gap to the previous anomaly is too large
+    new_incident = np.diff(keys, prepend=keys[0]) > pd.Timedelta(max_gap).value
+    new_incident[0] = True
+    starts = np.flatnonzero(new_incident)
+    ends = np.append(starts[1:], len(keys)) - 1
+    incident_ids = np.cumsum(new_incident) - 1
+
+    counts = ends - starts + 1
+    filled = np.where(np.isnan(values), -np.inf, values)
+    peak_delay = np.maximum.reduceat(filled, starts)
+    with np.errstate(invalid='ignore'):
+        mean_delay = np.add.reduceat(np.nan_to_num(values), starts) / np.add.reduceat(~np.isnan(values), starts)
+
+    # First row of each incident that reaches the incident's peak
+    positions = np.arange(len(keys))
+    at_peak = filled == peak_delay[incident_ids]
+    peak_positions = np.minimum.reduceat(np.where(at_peak, positions, len(keys)), starts)
+
+    incidents = pd.DataFrame({
+        'incident_id': np.arange(len(starts)),
+        'start': pd.to_datetime(keys[starts]),
+        'end': pd.to_datetime(keys[ends]),
+        'duration_minutes': (keys[ends] - keys[starts]) / 6e10,
+        'count': counts,
+        'peak_time': pd.to_datetime(keys[peak_positions]),
+        'peak_delay': np.where(np.isinf(peak_delay), np.nan, peak_delay),
+        'mean_delay': mean_delay
+    })
+
+    if min_count > 1:
+        incidents = incidents[incidents['count'] >= min_count].reset_index(drop=True)
+        incidents['incident_id'] = np.arange(len(incidents))
+
+    logger.info(f"Grouped {len(keys)} anomalies into {len(incidents)} incidents (max gap {max_gap})")
+    return incidents
@@ -0,0 +1,133 @@
+"""
+Incremental Aggregates
+
+This module provides aggregates of processing delays that can be merged
+with the aggregates of newly imported rows, so dashboard views can be kept
+current without reloading the data they were built from.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+from .grid_aggregation import time_codes
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+N_WEEKDAYS = 7
+N_HOURS = 24
+
+# Weekday x hour cells plus one cell for rows without an arrival time
+N_CELLS = N_WEEKDAYS * N_HOURS + 1
+
+def cell_summary(timestamps, values):
+    """
+    Summarise processing delays per (weekday, hour) cell.
+
+    Rows without an arrival time go to a last extra cell, so the totals
+    over all cells match the whole data.
+
+    Args:
+        timestamps (Series): Arrival times.
+        values: Processing delays.
+
+    Returns:
+        DataFrame: rows, count (of non-missing delays), sum, min and max per
+                   cell, cell = weekday (0=Monday) * 24 + hour.
+    """
+    weekdays = time_codes(pd.Series(timestamps), 'weekday')
+    hours = time_codes(pd.Series(timestamps), 'hour')
+    cells = np.where(weekdays >= 0, weekdays * N_HOURS + hours, N_CELLS - 1)
+    values = np.asarray(values, dtype='float64')
+
+    valid = ~np.isnan(values)
+    valid_cells = cells[valid]
+    valid_values = values[valid]
+
+    minimum = np.full(N_CELLS, np.inf)
+    maximum = np.full(N_CELLS, -np.inf)
+    np.minimum.at(minimum, valid_cells, valid_values)
+    np.maximum.at(maximum, valid_cells, valid_values)
+
+    return pd.DataFrame({
+        'rows': np.bincount(cells, minlength=N_CELLS),
+        'count': np.bincount(valid_cells, minlength=N_CELLS),
+        'sum': np.bincount(valid_cells, weights=valid_values, minlength=N_CELLS),
+        'min': minimum,
+        'max': maximum
+    })
+
+def merge_cell_summaries(summary, delta):
+    """
+    Merge the cell summary of new rows into an existing one.
+
+    Args:
+        summary (DataFrame): Existing cell summary.
+        delta (DataFrame): Cell summary of the new rows.
+
+    Returns:
+        DataFrame: The merged cell summary.
+    """
+    return pd.DataFrame({
+        'rows': summary['rows'].to_numpy() + delta['rows'].to_numpy(),
+        'count': summary['count'].to_numpy() + delta['count'].to_numpy(),
+        'sum': summary['sum'].to_numpy() + delta['sum'].to_numpy(),
+        'min': np.minimum(summary['min'].to_numpy(), delta['min'].to_numpy()),
+        'max': np.maximum(summary['max'].to_numpy(), delta['max'].to_numpy())
+    })
+
+def summary_statistics(summary):
+    """
+    Get the overall statistics of a cell summary.
+
+    Args:
+        summary (DataFrame): Cell summary.
+
+    Returns:
+        dict: rows, mean, min and max of the processing delays (NaN without values).
+    """
+    count = summary['count'].sum()
+    return {
+        'rows': int(summary['rows'].sum()),
+        'mean': summary['sum'].sum() / count if count else np.nan,
+        'min': summary['min'].min() if count else np.nan,
+        'max': summary['max'].max() if count else np.nan
+    }
+
+def summary_grid(summary, fill_value=0):
+    """
+    Get the mean processing delay per weekday and hour from a cell summary.
+
+    Args:
+        summary (DataFrame): Cell summary.
+        fill_value (float): Value of cells without data.
+
+    Returns:
+        ndarray: 7 x 24 grid of mean delays.
+    """
+    count = summary['count'].to_numpy()[:N_CELLS - 1]
+    total = summary['sum'].to_numpy()[:N_CELLS - 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        grid = np.where(count > 0, total / count, fill_value)
+    return grid.reshape(N_WEEKDAYS, N_HOURS)
+
+def merge_time_patterns(time_patterns, recomputed):
+    """
+    Replace the trailing time groups of aggregates with recomputed ones.
+
+    Args:
+        time_patterns (DataFrame): Existing aggregates per time group.
+        recomputed (DataFrame): Aggregates of all groups from the first one
+                                that received new rows.
+
+    Returns:
+        DataFrame: Aggregates per time group.
+    """
+    if recomputed is None or recomputed.empty:
+        return time_patterns
+
+    kept = time_patterns[time_patterns['time_group'] < recomputed['time_group'].iloc[0]]
+    merged = pd.concat([kept, recomputed], ignore_index=True)
+    logger.info(f"Merged {len(recomputed)} recomputed time groups into {len(kept)} cached ones")
+    return merged
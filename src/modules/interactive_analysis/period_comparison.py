@@ -0,0 +1,180 @@
+"""
+Period Comparison
+
+This module provides batched period-over-period comparisons of processing
+delays (every week vs the previous week, every month vs the same month
+last year, ...) computed in one vectorized pass over bucketed aggregates.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+from .time_index import TimeIndex
+from .range_statistics import shifted_mean_std
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class PeriodComparator:
+    """
+    Class for building period-over-period comparison tables.
+    """
+
+    # Pandas period frequency for each bucket granularity
+    BUCKET_FREQUENCIES = {
+        'day': 'D',
+        'week': 'W',
+        'month': 'M',
+        'quarter': 'Q',
+        'year': 'Y'
+    }
+
+    # Number of buckets back to the same period last year (days keep the weekday)
+    YEAR_LAGS = {
+        'day': 364,
+        'week': 52,
+        'month': 12,
+        'quarter': 4,
+        'year': 1
+    }
+
+    METRICS = ('count', 'sum', 'mean', 'std', 'min', 'max')
+
+    def __init__(self, time_index, value_column='processing_delay_minutes'):
+        """
+        Initialize the PeriodComparator.
+
+        Args:
+            time_index (TimeIndex): Time index over the data to compare.
+            value_column (str): Name of the value column to aggregate.
+        """
+        if not isinstance(time_index, TimeIndex):
+            time_index = TimeIndex(time_index)
+
+        if value_column not in time_index.data.columns:
+            raise KeyError(f"Required column '{value_column}' not found")
+
+        self.time_index = time_index
+        self.value_column = value_column
+        self._aggregates = {}
+
+    def bucket_aggregates(self, granularity):
+        """
+        Aggregate the values into contiguous time buckets.
+
+        Every bucket between the first and last one is present, empty buckets
+        have a count of zero, so bucket i and bucket i - lag are always `lag`
+        periods apart.
+
+        Args:
+            granularity (str): Bucket size ('day', 'week', 'month', 'quarter', 'year').
+
+        Returns:
+            DataFrame: count, sum, mean, std, min and max per bucket,
+                       indexed by the bucket start time.
+        """
+        if granularity not in self.BUCKET_FREQUENCIES:
+            raise ValueError(f"Invalid granularity '{granularity}'. Valid options: {list(self.BUCKET_FREQUENCIES)}")
+
+        if granularity in self._aggregates:
+            return self._aggregates[granularity]
+
+        data = self.time_index.slice()
+        if data.empty:
+            aggregates = pd.DataFrame(columns=list(self.METRICS), dtype='float64')
+            self._aggregates[granularity] = aggregates
+            return aggregates
+
+        periods = pd.PeriodIndex(data[self.time_index.time_column], freq=self.BUCKET_FREQUENCIES[granularity])
+        ordinals = periods.asi8
+        codes = ordinals - ordinals[0]
+        n_buckets = int(codes[-1]) + 1
+
+        values = data[self.value_column].to_numpy(dtype='float64')
+        valid = ~np.isnan(values)
+        shift = float(values[valid].mean()) if valid.any() else 0.0
+        shifted = np.where(valid, values - shift, 0.0)
+
+        # One pass of weighted bincounts for the additive statistics
+        count = np.bincount(codes, weights=valid, minlength=n_buckets)
+        shifted_sum = np.bincount(codes, weights=shifted, minlength=n_buckets)
+        shifted_sum_sq = np.bincount(codes, weights=shifted * shifted, minlength=n_buckets)
+
+        shifted_mean, std = shifted_mean_std(count, shifted_sum, shifted_sum_sq)
+
+        # The data is time-sorted, so each bucket is a contiguous run of rows
+        starts = np.flatnonzero(np.diff(codes, prepend=-1))
+        bucket_min = np.full(n_buckets, np.nan)
+        bucket_max = np.full(n_buckets, np.nan)
+        bucket_min[codes[starts]] = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+        bucket_max[codes[starts]] = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+        bucket_min[np.isinf(bucket_min)] = np.nan
+        bucket_max[np.isinf(bucket_max)] = np.nan
+
+        index = pd.period_range(start=periods[0], periods=n_buckets, freq=periods.freq).start_time
+        aggregates = pd.DataFrame({
+            'count': count.astype('int64'),
+            'sum': shifted_sum + count * shift,
+            'mean': shifted_mean + shift,
+            'std': std,
+            'min': bucket_min,
+            'max': bucket_max
+        }, index=index)
+        aggregates.index.name = 'period'
+
+        self._aggregates[granularity] = aggregates
+        logger.info(f"Aggregated {len(data)} rows into {n_buckets} {granularity} buckets")
+        return aggregates
+
+    def compare(self, granularity='week', against='previous', metrics=('count', 'mean')):
+        """
+        Compare every period with its baseline period.
+
+        Args:
+            granularity (str): Bucket size ('day', 'week', 'month', 'quarter', 'year').
+            against (str): Baseline to compare with ('previous' or 'last_year').
+            metrics (tuple): Metrics to compare (see METRICS).
+
+        Returns:
+            DataFrame: One row per non-empty period with, for each metric, the
+                       value, baseline value, difference and percent change.
+                       The percent change is NaN where the baseline is missing or 0.
+        """
+        if against == 'previous':
+            lag = 1
+        elif against == 'last_year':
+            lag = self.YEAR_LAGS.get(granularity)
+        else:
+            raise ValueError(f"Invalid comparison '{against}'. Valid options: ['previous', 'last_year']")
+
+        invalid_metrics = [metric for metric in metrics if metric not in self.METRICS]
+        if invalid_metrics:
+            raise ValueError(f"Invalid metrics {invalid_metrics}. Valid options: {list(self.METRICS)}")
+
+        aggregates = self.bucket_aggregates(granularity)
+        metrics = list(metrics)
+
+        # Shift the whole metric matrix by the lag in one step
+        current = aggregates[metrics].to_numpy(dtype='float64')
+        baseline = np.full_like(current, np.nan)
+        if lag < len(current):
+            baseline[lag:] = current[:-lag]
+
+        difference = current - baseline
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percent_change = np.where(baseline != 0, difference / baseline * 100, np.nan)
+
+        baseline_periods = pd.Series(aggregates.index, index=aggregates.index).shift(lag)
+
+        table = pd.DataFrame({'period': aggregates.index, 'baseline_period': baseline_periods.to_numpy()})
+        for i, metric in enumerate(metrics):
+            table[metric] = current[:, i]
+            table[f"{metric}_baseline"] = baseline[:, i]
+            table[f"{metric}_diff"] = difference[:, i]
+            table[f"{metric}_pct_change"] = percent_change[:, i]
+
+        table = table[aggregates['count'].to_numpy() > 0].reset_index(drop=True)
+
+        logger.info(f"Compared {len(table)} {granularity} periods against {against} period")
+        return table
@@ -0,0 +1,170 @@
+"""
+Range Statistics
+
+This module provides constant-time count, sum, mean and standard deviation
+queries over arbitrary time ranges of the processing delay data, using
+prefix sums over the time-sorted delays, and minimum and maximum queries
+from block extremes in O(sqrt(n)) time and extra memory.
+"""
+
+import numpy as np
+import logging
+
+from .time_index import TimeIndex
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def shifted_mean_std(count, shifted_sum, shifted_sum_sq):
+    """
+    Get the mean and sample standard deviation from sums of shifted values.
+
+    Values are summed after subtracting a constant shift (e.g. their overall
+    mean) to limit cancellation; the returned mean is still shifted. Fewer
+    than two values give a NaN standard deviation, and rounding cannot make
+    the variance negative.
+
+    Args:
+        count: Number of values per group.
+        shifted_sum: Sum of the shifted values per group.
+        shifted_sum_sq: Sum of the squared shifted values per group.
+
+    Returns:
+        tuple: (shifted mean, standard deviation) per group.
+    """
+    count = np.asarray(count, dtype='float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shifted_mean = shifted_sum / count
+        variance = (shifted_sum_sq - shifted_sum * shifted_mean) / (count - 1)
+    std = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+    return shifted_mean, std
+
+class RangeStatistics:
+    """
+    Prefix-sum and block index for fast period statistics.
+    """
+
+    # Metrics answered by query(); order statistics such as the median are not
+    METRICS = ('count', 'sum', 'mean', 'std', 'min', 'max')
+
+    def __init__(self, time_index, value_column='processing_delay_minutes'):
+        """
+        Initialize the RangeStatistics.
+
+        Args:
+            time_index (TimeIndex): Time index over the data to query.
+            value_column (str): Name of the value column to aggregate.
+        """
+        if not isinstance(time_index, TimeIndex):
+            time_index = TimeIndex(time_index)
+
+        if value_column not in time_index.data.columns:
+            raise KeyError(f"Required column '{value_column}' not found")
+
+        self.time_index = time_index
+        self.value_column = value_column
+
+        values = time_index.data[value_column].to_numpy(dtype='float64')
+        valid = ~np.isnan(values)
+
+        # Shift by the mean before squaring to limit cancellation in the variance
+        self._shift = float(values[valid].mean()) if valid.any() else 0.0
+        shifted = np.where(valid, values - self._shift, 0.0)
+
+        self._count = np.concatenate(([0], np.cumsum(valid, dtype='int64')))
+        self._sum = np.concatenate(([0.0], np.cumsum(shifted)))
+        self._sum_sq = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+
+        self._values = values
+        self._block_size = max(1, int(np.sqrt(len(values))))
+        self._block_min = None
+        self._block_max = None
+
+    def _ensure_blocks(self):
+        """Build the minimum and maximum of each block of about sqrt(n) rows on first use."""
+        if self._block_min is None:
+            starts = np.arange(0, len(self._values), self._block_size)
+            if len(starts):
+                self._block_min = np.fmin.reduceat(self._values, starts)
+                self._block_max = np.fmax.reduceat(self._values, starts)
+            else:
+                self._block_min = self._block_max = np.empty(0)
+
+    def _block_query(self, block_values, reducer, initial, lo, hi):
+        """
+        Answer reducer(values[lo:hi]) from whole blocks plus the rows at both ends.
+
+        Args:
+            block_values (ndarray): Reduction of each block.
+            reducer (ufunc): np.fmin or np.fmax (NaN values are skipped).
+            initial (float): Identity of reducer.
+            lo (int): First row position (inclusive).
+            hi (int): Last row position (exclusive).
+
+        Returns:
+            float: The reduced value.
+        """
+        block = self._block_size
+        first_block = -(-lo // block)
+        last_block = hi // block
+        if first_block >= last_block:
+            return float(reducer.reduce(self._values[lo:hi], initial=initial))
+
+        return float(reducer.reduce([
+            reducer.reduce(self._values[lo:first_block * block], initial=initial),
+            reducer.reduce(block_values[first_block:last_block], initial=initial),
+            reducer.reduce(self._values[last_block * block:hi], initial=initial)
+        ]))
+
+    def query_positions(self, lo, hi, extremes=True):
+        """
+        Compute statistics over the sorted rows lo:hi.
+
+        Args:
+            lo (int): First row position (inclusive).
+            hi (int): Last row position (exclusive).
+            extremes (bool): Whether to include min and max, which build the
+                             block index on first use.
+
+        Returns:
+            dict: count, sum, mean and std (plus min and max) of the value column.
+        """
+        count = int(self._count[hi] - self._count[lo])
+        if count == 0:
+            statistics = {'count': 0, 'sum': 0.0, 'mean': np.nan, 'std': np.nan}
+            if extremes:
+                statistics.update({'min': np.nan, 'max': np.nan})
+            return statistics
+
+        shifted_sum = self._sum[hi] - self._sum[lo]
+        shifted_sum_sq = self._sum_sq[hi] - self._sum_sq[lo]
+
+        shifted_mean, std = shifted_mean_std(count, shifted_sum, shifted_sum_sq)
+
+        statistics = {
+            'count': count,
+            'sum': float(shifted_sum + count * self._shift),
+            'mean': float(shifted_mean + self._shift),
+            'std': float(std)
+        }
+        if extremes:
+            self._ensure_blocks()
+            statistics['min'] = self._block_query(self._block_min, np.fmin, np.inf, lo, hi)
+            statistics['max'] = self._block_query(self._block_max, np.fmax, -np.inf, lo, hi)
+        return statistics
+
+    def query(self, start=None, end=None, include_end=True, extremes=True):
+        """
+        Compute statistics over a time range.
+
+        Args:
+            start: Start of the range (inclusive), or None for the first row.
+            end: End of the range, or None for the last row.
+            include_end (bool): Whether rows at exactly `end` are included.
+            extremes (bool): Whether to include min and max.
+
+        Returns:
+            dict: count, sum, mean and std (plus min and max) of the value column.
+        """
+        lo, hi = self.time_index.bounds(start, end, include_end=include_end)
+        return self.query_positions(lo, hi, extremes=extremes)
@@ -0,0 +1,147 @@
+"""
+Request Coalescing
+
+This module provides the coalescing of identical dashboard requests that
+are in progress at the same time, and the cancellation of requests that a
+newer request from the same client has superseded.
+"""
+
+import logging
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class SupersededError(Exception):
+    """
+    Raised for a request that a newer request on its channel has superseded.
+    """
+
+class _Flight:
+    """
+    A computation in progress and the requests waiting for its result.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.members = []
+        self.result = None
+        self.error = None
+
+class RequestCoalescer:
+    """
+    Thread-safe coalescing and cancellation of concurrent requests.
+
+    Requests with the same key share one computation. Each request belongs
+    to a channel (e.g. one callback in one browser tab); a superseding
+    request on a channel makes the earlier requests on it stale. A
+    computation stops at its next check once all of its requests are stale.
+    """
+
+    def __init__(self, debounce=0.0):
+        """
+        Initialize the RequestCoalescer.
+
+        Args:
+            debounce (float): Seconds a superseding request waits for a newer
+                              one before its computation starts.
+        """
+        self.debounce = debounce
+        self._flights = {}
+        self._generations = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def _is_stale(self, member):
+        """Check whether a newer superseding request arrived on a member's channel."""
+        channel, generation = member
+        return self._generations.get(channel, 0) > generation
+
+    def _check(self, key, flight):
+        """
+        Stop a computation whose requests are all stale.
+
+        Raises:
+            SupersededError: If every request of the computation is stale.
+        """
+        with self._lock:
+            if not all(self._is_stale(member) for member in flight.members):
+                return
+            # Identical requests arriving from now on start a new computation
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+        logger.info(f"Cancelled superseded computation of {len(flight.members)} request(s)")
+        raise SupersededError()
+
+    def run(self, key, channel, function, supersede=True):
+        """
+        Run a computation, or wait for the identical one in progress.
+
+        Args:
+            key: Hashable description of the request; requests with equal
+                 keys get the same result.
+            channel: Hashable id of the requests that supersede each other,
+                     or None if the request cannot be superseded.
+            function: Computation, called with a check function that raises
+                      SupersededError once the result is no longer wanted.
+            supersede (bool): Whether the request supersedes the earlier
+                              requests on its channel.
+
+        Returns:
+            The result of the computation.
+
+        Raises:
+            SupersededError: If the request was superseded before its result was ready.
+        """
+        with self._lock:
+            generation = self._generations.get(channel, 0)
+            if supersede and channel is not None:
+                generation += 1
+                self._generations[channel] = generation
+            self._active[channel] = self._active.get(channel, 0) + 1
+            member = (channel, generation)
+
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = _Flight()
+                self._flights[key] = flight
+            flight.members.append(member)
+
+        try:
+            if owner:
+                try:
+                    # Give a quick succession of changes the chance to supersede this one
+                    if supersede and self.debounce:
+                        time.sleep(self.debounce)
+                    check = lambda: self._check(key, flight)
+                    check()
+                    flight.result = function(check)
+                except Exception as e:
+                    flight.error = e
+                finally:
+                    with self._lock:
+                        if self._flights.get(key) is flight:
+                            del self._flights[key]
+                    flight.done.set()
+            else:
+                logger.info("Coalesced request with the identical one in progress")
+                flight.done.wait()
+
+            with self._lock:
+                stale = self._is_stale(member)
+            if stale:
+                raise SupersededError()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        finally:
+            # Channels without requests in progress need no generation
+            with self._lock:
+                self._active[channel] -= 1
+                if not self._active[channel]:
+                    del self._active[channel]
+                    self._generations.pop(channel, None)
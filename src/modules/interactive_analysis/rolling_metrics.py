@@ -0,0 +1,194 @@
+"""
+Rolling Metrics
+
+This module provides rolling-window trend metrics (moving average,
+standard deviation and a high quantile such as the p95) of processing
+delays over time windows like 1h, 24h or 7d.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+from .range_statistics import shifted_mean_std
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class RollingWindow:
+    """
+    Streaming rolling-window metrics over a time-sorted value series.
+
+    Counts, means and standard deviations come from prefix sums and two
+    binary searches per evaluation time. The quantile comes from a value
+    histogram of at most max_bins bins that every row enters and leaves
+    exactly once; the quantile bin is found by walking from its previous
+    position, so the work is linear in the number of rows plus the distance
+    the quantile moves. Only the rows still inside the window are kept
+    between updates, so the series can be extended incrementally with new
+    batches.
+    """
+
+    def __init__(self, window='24h', quantile=0.95, bin_width=1.0, max_bins=4096):
+        """
+        Initialize the RollingWindow.
+
+        Args:
+            window (str): Window length as a pandas offset string (e.g. '1h', '24h', '7d').
+            quantile (float): Quantile to track, between 0 and 1.
+            bin_width (float): Histogram bin width in value units; the
+                               quantile is accurate to half a bin.
+            max_bins (int): Maximum number of histogram bins. If the values
+                            span more bins, the histogram covers the 0.1-99.9
+                            percentile range with wider bins, and quantiles
+                            beyond that range are computed exactly from the
+                            rows of the window.
+        """
+        if not 0 < quantile < 1:
+            raise ValueError(f"Invalid quantile {quantile}. Must be between 0 and 1")
+
+        self.window = window
+        self.quantile = quantile
+        self.bin_width = float(bin_width)
+        self.max_bins = max(int(max_bins), 3)
+        self._window_ns = pd.Timedelta(window).value
+
+        # Rows that may still fall into a future window
+        self._timestamps = np.empty(0, dtype='int64')
+        self._values = np.empty(0, dtype='float64')
+        self._last_evaluated = None
+
+    def update(self, timestamps, values, evaluate_at):
+        """
+        Add a batch of rows and evaluate the window at the given times.
+
+        Rows must be sorted and not older than rows from previous batches,
+        and evaluation times must be sorted and not earlier than the last
+        evaluation time of the previous update.
+
+        Args:
+            timestamps: Arrival times of the new rows.
+            values: Values of the new rows.
+            evaluate_at: Times at which to evaluate the window (t - window, t].
+
+        Returns:
+            DataFrame: count, mean, std and quantile per evaluation time.
+        """
+        new_timestamps = pd.DatetimeIndex(timestamps).asi8
+        new_values = np.asarray(values, dtype='float64')
+        eval_times = pd.DatetimeIndex(evaluate_at).asi8
+
+        if self._last_evaluated is not None and len(eval_times) and eval_times[0] < self._last_evaluated:
+            raise ValueError("Evaluation times must not be earlier than the previous update")
+
+        timestamps = np.concatenate((self._timestamps, new_timestamps))
+        values = np.concatenate((self._values, new_values))
+        valid = ~np.isnan(values)
+
+        # Prefix sums of the mean-shifted values for count, mean and std
+        shift = float(values[valid].mean()) if valid.any() else 0.0
+        shifted = np.where(valid, values - shift, 0.0)
+        prefix_count = np.concatenate(([0], np.cumsum(valid, dtype='int64')))
+        prefix_sum = np.concatenate(([0.0], np.cumsum(shifted)))
+        prefix_sum_sq = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+
+        hi = np.searchsorted(timestamps, eval_times, side='right')
+        lo = np.searchsorted(timestamps, eval_times - self._window_ns, side='right')
+
+        count = prefix_count[hi] - prefix_count[lo]
+        window_sum = prefix_sum[hi] - prefix_sum[lo]
+        window_sum_sq = prefix_sum_sq[hi] - prefix_sum_sq[lo]
+        mean, std = shifted_mean_std(count, window_sum, window_sum_sq)
+        mean = mean + shift
+
+        quantiles = self._window_quantiles(values, valid, lo, hi, count)
+
+        # Keep only the rows that can still fall into a later window
+        if len(eval_times):
+            self._last_evaluated = int(eval_times[-1])
+        if self._last_evaluated is not None:
+            keep_from = np.searchsorted(timestamps, self._last_evaluated - self._window_ns, side='right')
+            self._timestamps = timestamps[keep_from:]
+            self._values = values[keep_from:]
+        else:
+            self._timestamps = timestamps
+            self._values = values
+
+        return pd.DataFrame({
+            'count': count,
+            'mean': mean,
+            'std': std,
+            f"p{round(self.quantile * 100):g}": quantiles
+        }, index=pd.DatetimeIndex(eval_times))
+
+    def _window_quantiles(self, values, valid, lo, hi, count):
+        """
+        Compute the tracked quantile for each window [lo, hi) of rows.
+
+        Args:
+            values (ndarray): Row values.
+            valid (ndarray): Mask of non-NaN values.
+            lo (ndarray): First row of each window.
+            hi (ndarray): End row (exclusive) of each window.
+            count (ndarray): Number of valid values in each window.
+
+        Returns:
+            ndarray: Quantile per window, NaN for empty windows.
+        """
+        quantiles = np.full(len(hi), np.nan)
+        if not valid.any():
+            return quantiles
+
+        # Inner bins between lower and upper, plus an underflow and an overflow bin
+        valid_values = values[valid]
+        width = self.bin_width
+        lower = np.floor(valid_values.min() / width) * width
+        n_inner = int(np.floor((valid_values.max() - lower) / width)) + 1
+        if n_inner > self.max_bins - 2:
+            # Outliers must not inflate the histogram; they go to the outer bins
+            lower, upper = np.percentile(valid_values, [0.1, 99.9])
+            n_inner = self.max_bins - 2
+            width = max(width, (upper - lower) / n_inner)
+        upper = lower + n_inner * width
+
+        with np.errstate(invalid='ignore'):
+            bins = np.clip(np.floor((values - lower) / width), -1, n_inner) + 1
+        bins = np.where(valid, bins, 0).astype('int64').tolist()
+        is_valid = valid.tolist()
+
+        histogram = [0] * (n_inner + 2)
+        position = below = 0
+        added = removed = 0
+        for i in range(len(hi)):
+            # Rows enter at most once and leave at most once across all windows;
+            # below counts the rows of the window in bins before position
+            while added < hi[i]:
+                if is_valid[added]:
+                    histogram[bins[added]] += 1
+                    below += bins[added] < position
+                added += 1
+            while removed < lo[i]:
+                if is_valid[removed]:
+                    histogram[bins[removed]] -= 1
+                    below -= bins[removed] < position
+                removed += 1
+
+            if count[i] > 0:
+                # Walk from the previous quantile bin to the bin holding the rank
+                rank = max(1, int(np.ceil(self.quantile * count[i])))
+                while below + histogram[position] < rank:
+                    below += histogram[position]
+                    position += 1
+                while below >= rank:
+                    position -= 1
+                    below -= histogram[position]
+
+                if 0 < position <= n_inner:
+                    quantiles[i] = lower + (position - 0.5) * width
+                else:
+                    # Outer bins hold few rows; take their exact order statistic
+                    window = values[lo[i]:hi[i]]
+                    outer = window[window < lower] if position == 0 else window[window >= upper]
+                    quantiles[i] = np.partition(outer, rank - below - 1)[rank - below - 1]
+
+        return quantiles
@@ -0,0 +1,246 @@
+"""
+Seasonal Baseline
+
+This module provides weekday x hour baselines of processing delays, so
+each row can be scored against what is normal for its time of the week
+instead of against one global mean for the whole range.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+from .grid_aggregation import time_codes
+from .range_statistics import shifted_mean_std
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class SeasonalBaseline:
+    """
+    Mean and standard deviation of processing delays per (weekday, hour) cell.
+    """
+
+    N_WEEKDAYS = 7
+    N_HOURS = 24
+
+    def __init__(self, min_samples=30):
+        """
+        Initialize the SeasonalBaseline.
+
+        Args:
+            min_samples (int): Minimum number of values in a cell to use its own
+                               baseline; sparser cells fall back to the global one.
+        """
+        self.min_samples = min_samples
+        self.count = None
+        self.mean = None
+        self.std = None
+        self.global_mean = np.nan
+        self.global_std = np.nan
+
+    @property
+    def is_fitted(self):
+        """Whether the baselines have been computed."""
+        return self.mean is not None
+
+    @classmethod
+    def cell_codes(cls, timestamps):
+        """
+        Get the flat (weekday, hour) cell of each timestamp.
+
+        Args:
+            timestamps (Series): Datetime series.
+
+        Returns:
+            ndarray: Cell codes weekday * 24 + hour, -1 where the timestamp is missing.
+        """
+        weekdays = time_codes(timestamps, 'weekday')
+        hours = time_codes(timestamps, 'hour')
+        return np.where(weekdays >= 0, weekdays * cls.N_HOURS + hours, -1)
+
+    def _valid_cells(self, timestamps, values):
+        """Get the cell codes and values of the rows with a timestamp and a value."""
+        cells = self.cell_codes(pd.Series(timestamps))
+        values = np.asarray(values, dtype='float64')
+        valid = (cells >= 0) & ~np.isnan(values)
+        return cells[valid], values[valid]
+
+    def _cell_statistics(self, cells, values, shift):
+        """
+        Compute count, mean and standard deviation per cell with weighted bincounts.
+
+        Cells that are sparse or constant get the global baseline.
+
+        Args:
+            cells (ndarray): Cell code of each value.
+            values (ndarray): Values without NaN.
+            shift (float): Value subtracted before squaring to limit cancellation.
+
+        Returns:
+            tuple: (count, mean, std) arrays over all cells.
+        """
+        n_cells = self.N_WEEKDAYS * self.N_HOURS
+        shifted = values - shift
+
+        count = np.bincount(cells, minlength=n_cells)
+        shifted_sum = np.bincount(cells, weights=shifted, minlength=n_cells)
+        shifted_sum_sq = np.bincount(cells, weights=shifted * shifted, minlength=n_cells)
+
+        shifted_mean, std = shifted_mean_std(count, shifted_sum, shifted_sum_sq)
+        mean = shifted_mean + shift
+
+        # Sparse or constant cells use the global baseline
+        fallback = (count < max(self.min_samples, 2)) | ~(std > 0)
+        mean[fallback] = self.global_mean
+        std[fallback] = self.global_std
+
+        return count, mean, std
+
+    def fit(self, timestamps, values):
+        """
+        Compute the baselines in one pass of weighted bincounts.
+
+        Args:
+            timestamps (Series): Arrival times.
+            values: Processing delays.
+
+        Returns:
+            SeasonalBaseline: self.
+        """
+        cells, values = self._valid_cells(timestamps, values)
+
+        self.global_mean = float(values.mean()) if len(values) else np.nan
+        self.global_std = float(values.std(ddof=1)) if len(values) > 1 else np.nan
+
+        self.count, self.mean, self.std = self._cell_statistics(
+            cells, values, self.global_mean if len(values) else 0.0
+        )
+
+        own = int((self.count >= max(self.min_samples, 2)).sum())
+        logger.info(f"Computed seasonal baselines from {len(values)} values "
+                    f"({own} of {len(self.count)} cells have their own baseline)")
+        return self
+
+    def refit_cells(self, timestamps, values):
+        """
+        Recompute the baselines of the cells the given rows fall into.
+
+        The rows must be all rows of those cells (e.g. the old rows of the
+        cells plus newly imported ones); other cells and the global
+        fallback baseline are kept.
+
+        Args:
+            timestamps (Series): Arrival times.
+            values: Processing delays.
+
+        Returns:
+            ndarray: Codes of the recomputed cells.
+        """
+        if not self.is_fitted:
+            raise ValueError("Baselines not computed; call fit() first")
+
+        cells, values = self._valid_cells(timestamps, values)
+        count, mean, std = self._cell_statistics(
+            cells, values, self.global_mean if not np.isnan(self.global_mean) else 0.0
+        )
+
+        refitted = np.flatnonzero(count > 0)
+        self.count[refitted] = count[refitted]
+        self.mean[refitted] = mean[refitted]
+        self.std[refitted] = std[refitted]
+
+        logger.info(f"Recomputed seasonal baselines of {len(refitted)} cells from {len(values)} values")
+        return refitted
+
+    def get_state(self):
+        """
+        Get the baselines as a JSON-serialisable dictionary.
+
+        Returns:
+            dict: min_samples, global baseline and per-cell count, mean and std.
+        """
+        def to_list(array):
+            return [None if np.isnan(value) else float(value) for value in array]
+
+        return {
+            'min_samples': self.min_samples,
+            'global_mean': None if np.isnan(self.global_mean) else self.global_mean,
+            'global_std': None if np.isnan(self.global_std) else self.global_std,
+            'count': [int(value) for value in self.count],
+            'mean': to_list(self.mean),
+            'std': to_list(self.std)
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restore baselines from a state dictionary.
+
+        Args:
+            state (dict): State as returned by get_state().
+
+        Returns:
+            SeasonalBaseline: The restored baselines.
+        """
+        def to_array(values):
+            return np.array([np.nan if value is None else value for value in values], dtype='float64')
+
+        baseline = cls(min_samples=state['min_samples'])
+        baseline.global_mean = np.nan if state['global_mean'] is None else state['global_mean']
+        baseline.global_std = np.nan if state['global_std'] is None else state['global_std']
+        baseline.count = np.array(state['count'], dtype='int64')
+        baseline.mean = to_array(state['mean'])
+        baseline.std = to_array(state['std'])
+        return baseline
+
+    def expected(self, timestamps):
+        """
+        Look up the baseline mean and standard deviation for each timestamp.
+
+        Args:
+            timestamps (Series): Arrival times.
+
+        Returns:
+            tuple: (mean, std) arrays, NaN where the timestamp is missing.
+        """
+        if not self.is_fitted:
+            raise ValueError("Baselines not computed; call fit() first")
+
+        cells = self.cell_codes(pd.Series(timestamps))
+        missing = cells < 0
+        cells = np.where(missing, 0, cells)
+        mean = np.where(missing, np.nan, self.mean[cells])
+        std = np.where(missing, np.nan, self.std[cells])
+        return mean, std
+
+    def score(self, timestamps, values):
+        """
+        Compute the z-score of each value against its (weekday, hour) baseline.
+
+        Args:
+            timestamps (Series): Arrival times.
+            values: Processing delays.
+
+        Returns:
+            ndarray: Signed z-scores, NaN where no baseline applies.
+        """
+        mean, std = self.expected(timestamps)
+        values = np.asarray(values, dtype='float64')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (values - mean) / std
+
+    def to_frame(self):
+        """
+        Get the baselines as a table.
+
+        Returns:
+            DataFrame: count, mean and std per weekday (0=Monday) and hour.
+        """
+        if not self.is_fitted:
+            return None
+
+        index = pd.MultiIndex.from_product(
+            [range(self.N_WEEKDAYS), range(self.N_HOURS)], names=['weekday', 'hour']
+        )
+        return pd.DataFrame({'count': self.count, 'mean': self.mean, 'std': self.std}, index=index)
@@ -0,0 +1,215 @@
+"""
+Shared Dataset Store
+
+This module provides a dataset store for dashboards served by several
+worker processes. Each dataset is materialised once as an Arrow IPC
+(Feather v2) file that every worker memory-maps, so the data is held once
+in the page cache instead of once per worker.
+
+Requires the optional pyarrow package.
+"""
+
+import os
+import re
+import glob
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Whether pyarrow is installed
+ARROW_AVAILABLE = pa is not None
+
+# Schema metadata entry holding the key a dataset was stored under
+KEY_METADATA = b'dataset_key'
+
+class SharedDatasetStore:
+    """
+    Store of DataFrames in memory-mapped Arrow files, shared across processes.
+
+    Offers the interface of DatasetStore. A token returned by put() in one
+    process can be resolved by get() in any process using the same
+    directory. The least recently used files beyond max_entries are removed.
+    """
+
+    SUFFIX = '.arrow'
+
+    def __init__(self, directory, max_entries=8):
+        """
+        Initialize the SharedDatasetStore.
+
+        Args:
+            directory (str): Directory for the dataset files (shared by all workers).
+            max_entries (int): Number of dataset files kept before the least
+                               recently used one is removed.
+        """
+        if not ARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the shared dataset store")
+
+        self.directory = directory
+        self.max_entries = max_entries
+        self._mapped = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, token):
+        """Get the file path of a token."""
+        return os.path.join(self.directory, f"{token}{self.SUFFIX}")
+
+    def _to_table(self, data, key):
+        """
+        Convert a DataFrame to an Arrow table with one chunk per column.
+
+        Text columns are dictionary-encoded, so workers share their codes
+        instead of building Python strings each (they come back as
+        categoricals). A single chunk per column is what allows get() to
+        map numeric and datetime columns without copying.
+        """
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        for i, field in enumerate(table.schema):
+            if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+
+        metadata = dict(table.schema.metadata or {})
+        if key is not None:
+            metadata[KEY_METADATA] = repr(key).encode('utf-8')
+        return table.combine_chunks().replace_schema_metadata(metadata)
+
+    def _map(self, token):
+        """
+        Memory-map a dataset file.
+
+        Returns:
+            DataFrame: Read-only frame over the mapped file, or None if it does not exist.
+        """
+        try:
+            # The mapping stays open as long as the frame references its buffers
+            table = pa.ipc.open_file(pa.memory_map(self._path(token), 'r')).read_all()
+        except FileNotFoundError:
+            return None
+
+        # Columns without nulls become views of the mapped buffers
+        return table.to_pandas(split_blocks=True)
+
+    def _prune(self):
+        """Remove the least recently used files beyond max_entries."""
+        paths = sorted(
+            glob.glob(os.path.join(self.directory, f"*{self.SUFFIX}")),
+            key=lambda path: os.stat(path).st_mtime if os.path.exists(path) else 0
+        )
+        for path in paths[:max(len(paths) - self.max_entries, 0)]:
+            self._remove(path)
+
+    def _remove(self, path):
+        """Remove a dataset file; processes that mapped it keep their mapping."""
+        try:
+            os.remove(path)
+            logger.info(f"Removed dataset file {os.path.basename(path)}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove dataset file {path}: {str(e)}")
+
+    def put(self, data, key=None):
+        """
+        Store a dataset as a memory-mapped Arrow file.
+
+        Args:
+            data (DataFrame): Dataset to store.
+            key: Optional hashable description of the dataset (e.g. the
+                 selected date range); storing under an existing key
+                 replaces that dataset.
+
+        Returns:
+            str: Token to retrieve the dataset with.
+        """
+        token = uuid.uuid4().hex
+        replaced = self.token_for(key) if key is not None else None
+
+        # Write to a temporary file first so other workers never map a partial file
+        table = self._to_table(data, key)
+        temporary_path = f"{self._path(token)}.tmp"
+        with pa.OSFile(temporary_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+        os.replace(temporary_path, self._path(token))
+
+        with self._lock:
+            if replaced is not None:
+                self._mapped.pop(replaced, None)
+                self._remove(self._path(replaced))
+            self._prune()
+
+        logger.info(f"Stored dataset {token[:8]} with {len(data)} rows "
+                    f"({os.path.getsize(self._path(token)) / 1e6:.1f} MB) in {self.directory}")
+        return token
+
+    def get(self, token):
+        """
+        Get a stored dataset, mapping its file on first use in this process.
+
+        Args:
+            token (str): Token returned by put() in any process.
+
+        Returns:
+            DataFrame: The dataset (read-only), or None if the token is unknown or expired.
+        """
+        # Tokens come from the browser; only accept the ones put() creates
+        if not token or not re.fullmatch(r'[0-9a-f]{32}', token):
+            return None
+
+        with self._lock:
+            data = self._mapped.get(token)
+            if data is None:
+                data = self._map(token)
+                if data is None:
+                    self._mapped.pop(token, None)
+                    return None
+                self._mapped[token] = data
+
+            self._mapped.move_to_end(token)
+            while len(self._mapped) > self.max_entries:
+                self._mapped.popitem(last=False)
+
+        # Mark the file as recently used for the pruning of all workers
+        try:
+            os.utime(self._path(token))
+        except OSError:
+            pass
+        return data
+
+    def token_for(self, key):
+        """
+        Get the token of the newest dataset stored under a key by any process.
+
+        Args:
+            key: Key passed to put().
+
+        Returns:
+            str: The token, or None if nothing is stored under the key.
+        """
+        wanted = repr(key).encode('utf-8')
+        newest = None
+        for path in glob.glob(os.path.join(self.directory, f"*{self.SUFFIX}")):
+            try:
+                with pa.memory_map(path, 'r') as source:
+                    metadata = pa.ipc.open_file(source).schema.metadata or {}
+                modified = os.stat(path).st_mtime
+            except (OSError, pa.ArrowInvalid):
+                continue
+
+            if metadata.get(KEY_METADATA) == wanted and (newest is None or modified > newest[0]):
+                newest = (modified, os.path.basename(path)[:-len(self.SUFFIX)])
+
+        return newest[1] if newest else None
+
+    def __len__(self):
+        return len(glob.glob(os.path.join(self.directory, f"*{self.SUFFIX}")))
@@ -0,0 +1,221 @@
+"""
+Streaming Detector
+
+This module provides an online anomaly detector for processing delays
+that keeps exponentially weighted mean and variance state, so new rows
+can be scored as they arrive without reloading the history.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+import json
+import os
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class StreamingDetector:
+    """
+    Online anomaly detector with exponentially weighted moving statistics.
+
+    Every row is scored against the state before it and then folded into
+    that state, so scoring a batch costs O(batch) regardless of how much
+    history has been seen. With per_hour enabled one state is kept for each
+    hour of the day, so rows are compared with the recent delays at the
+    same time of day.
+    """
+
+    N_HOURS = 24
+
+    def __init__(self, alpha=0.05, threshold=3.0, per_hour=False, warmup=30):
+        """
+        Initialize the StreamingDetector.
+
+        Args:
+            alpha (float): Weight of each new row in the moving statistics (0-1).
+            threshold (float): Score above which a row is flagged.
+            per_hour (bool): Whether to keep separate state for each hour of the day.
+            warmup (int): Rows a state must have seen before it flags anomalies.
+        """
+        if not 0 < alpha < 1:
+            raise ValueError(f"Invalid alpha {alpha}. Must be between 0 and 1")
+
+        self.alpha = alpha
+        self.threshold = threshold
+        self.per_hour = per_hour
+        self.warmup = warmup
+
+        n_states = self.N_HOURS if per_hour else 1
+        self.mean = np.full(n_states, np.nan)
+        self.var = np.zeros(n_states)
+        self.seen = np.zeros(n_states, dtype='int64')
+
+        # Opaque marker of the last ingested row (e.g. a database id)
+        self.watermark = None
+
+    def _scan(self, values, mean, var):
+        """
+        Run the moving-statistics recursion over a series in vectorized form.
+
+        The recursion is mean_k = mean_k-1 + alpha * d_k and
+        var_k = (1 - alpha) * (var_k-1 + alpha * d_k ** 2) with
+        d_k = x_k - mean_k-1; both are first-order exponential filters that
+        pandas evaluates in compiled code.
+
+        Args:
+            values (ndarray): Values in arrival order (no NaN).
+            mean (float): Mean before the first value (NaN for a new state).
+            var (float): Variance before the first value.
+
+        Returns:
+            tuple: (prior_mean, prior_var) per value and the final (mean, var).
+        """
+        if np.isnan(mean):
+            # A new state starts at its first value
+            mean, var = values[0], 0.0
+
+        means = pd.Series(np.concatenate(([mean], values))).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        prior_mean = means[:-1]
+
+        increments = (1 - self.alpha) * (values - prior_mean) ** 2
+        variances = pd.Series(np.concatenate(([var], increments))).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        prior_var = variances[:-1]
+
+        return prior_mean, prior_var, means[-1], variances[-1]
+
+    def update(self, data, time_column='bildankunft_timestamp', value_column='processing_delay_minutes'):
+        """
+        Score a batch of new rows and fold them into the state.
+
+        Args:
+            data (DataFrame): New rows; they are processed in time order.
+            time_column (str): Name of the arrival time column.
+            value_column (str): Name of the processing delay column.
+
+        Returns:
+            DataFrame: The batch in time order with expected_delay,
+                       anomaly_score and is_anomaly columns.
+        """
+        batch = data.copy()
+        batch[time_column] = pd.to_datetime(batch[time_column])
+        batch = batch.sort_values(time_column, kind='mergesort')
+
+        values = batch[value_column].to_numpy(dtype='float64')
+        if self.per_hour:
+            keys = batch[time_column].dt.hour.to_numpy(dtype='float64')
+        else:
+            keys = np.zeros(len(batch))
+        usable = ~np.isnan(values) & ~np.isnan(keys)
+        keys = np.where(usable, keys, -1).astype('int64')
+
+        expected = np.full(len(batch), np.nan)
+        score = np.full(len(batch), np.nan)
+        flagged = np.zeros(len(batch), dtype=bool)
+
+        # At most 24 states, each scanned once over its own rows
+        for key in np.unique(keys[keys >= 0]):
+            rows = np.flatnonzero(keys == key)
+            prior_mean, prior_var, self.mean[key], self.var[key] = self._scan(
+                values[rows], self.mean[key], self.var[key]
+            )
+            prior_seen = self.seen[key] + np.arange(len(rows))
+            self.seen[key] += len(rows)
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                row_score = np.abs(values[rows] - prior_mean) / np.sqrt(prior_var)
+            row_score[prior_seen == 0] = np.nan
+
+            expected[rows] = prior_mean
+            score[rows] = row_score
+            flagged[rows] = (prior_seen >= self.warmup) & (row_score > self.threshold)
+
+        batch['expected_delay'] = expected
+        batch['anomaly_score'] = score
+        batch['is_anomaly'] = flagged
+
+        logger.info(f"Scored {len(batch)} new rows, {int(flagged.sum())} anomalies")
+        return batch
+
+    def get_state(self):
+        """
+        Get the detector state as a JSON-serialisable dictionary.
+
+        Returns:
+            dict: Parameters, moving statistics and watermark.
+        """
+        return {
+            'alpha': self.alpha,
+            'threshold': self.threshold,
+            'per_hour': self.per_hour,
+            'warmup': self.warmup,
+            'mean': [None if np.isnan(value) else float(value) for value in self.mean],
+            'var': [float(value) for value in self.var],
+            'seen': [int(value) for value in self.seen],
+            'watermark': self.watermark
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restore a detector from a state dictionary.
+
+        Args:
+            state (dict): State as returned by get_state().
+
+        Returns:
+            StreamingDetector: The restored detector.
+        """
+        detector = cls(
+            alpha=state['alpha'],
+            threshold=state['threshold'],
+            per_hour=state['per_hour'],
+            warmup=state['warmup']
+        )
+        detector.mean = np.array([np.nan if value is None else value for value in state['mean']], dtype='float64')
+        detector.var = np.array(state['var'], dtype='float64')
+        detector.seen = np.array(state['seen'], dtype='int64')
+        detector.watermark = state.get('watermark')
+        return detector
+
+    def save(self, path):
+        """
+        Save the detector state to a JSON file.
+
+        Args:
+            path (str): Path of the state file.
+
+        Returns:
+            bool: Success status of the operation.
+        """
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(self.get_state(), f, indent=2)
+            logger.info(f"Saved detector state to {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving detector state: {str(e)}")
+            return False
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a detector from a JSON state file.
+
+        Args:
+            path (str): Path of the state file.
+
+        Returns:
+            StreamingDetector: The restored detector, or None on failure.
+        """
+        try:
+            with open(path) as f:
+                detector = cls.from_state(json.load(f))
+            logger.info(f"Loaded detector state from {path}")
+            return detector
+        except Exception as e:
+            logger.error(f"Error loading detector state: {str(e)}")
+            return None
@@ -0,0 +1,111 @@
+"""
+Time Index
+
+This module provides a sorted, binary-searchable index over the arrival
+timestamps of image processing data, so that time period filters can be
+answered with positional slices instead of full boolean scans.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class TimeIndex:
+    """
+    Sorted index over a timestamp column supporting O(log n) range slicing.
+    """
+
+    def __init__(self, data, time_column='bildankunft_timestamp'):
+        """
+        Initialize the TimeIndex.
+
+        The data is sorted by the timestamp column (stable, rows without a
+        timestamp first) unless it is already in order. Slices returned by
+        the index are positional views on this sorted frame.
+
+        Args:
+            data (DataFrame): DataFrame containing the timestamp column.
+            time_column (str): Name of the timestamp column to index.
+        """
+        if time_column not in data.columns:
+            raise KeyError(f"Required column '{time_column}' not found")
+
+        self.time_column = time_column
+
+        # Ensure the timestamp column is datetime
+        if not pd.api.types.is_datetime64_any_dtype(data[time_column]):
+            data = data.copy()
+            data[time_column] = pd.to_datetime(data[time_column])
+
+        # Sort only if needed; NaT sorts first so the int64 keys stay monotonic
+        if not data[time_column].is_monotonic_increasing:
+            data = data.sort_values(time_column, kind='mergesort', na_position='first')
+
+        self.data = data
+        self._keys = data[time_column].to_numpy(dtype='datetime64[ns]').view('int64')
+        self._first_valid = int(data[time_column].isna().sum())
+
+    def __len__(self):
+        """Return the number of indexed rows."""
+        return len(self.data)
+
+    @staticmethod
+    def _to_key(value):
+        """Convert a date-like value to an int64 nanosecond key."""
+        return pd.Timestamp(value).value
+
+    def bounds(self, start=None, end=None, include_end=True):
+        """
+        Get the positional bounds of a time range.
+
+        Args:
+            start: Start of the range (inclusive), or None for the first row.
+            end: End of the range, or None for the last row.
+            include_end (bool): Whether rows at exactly `end` are included.
+
+        Returns:
+            tuple: (lo, hi) positions such that data.iloc[lo:hi] is the range.
+        """
+        lo = self._first_valid
+        hi = len(self._keys)
+
+        if start is not None:
+            lo = max(lo, int(np.searchsorted(self._keys, self._to_key(start), side='left')))
+        if end is not None:
+            side = 'right' if include_end else 'left'
+            hi = int(np.searchsorted(self._keys, self._to_key(end), side=side))
+
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None, include_end=True):
+        """
+        Get the rows within a time range without scanning or copying.
+
+        Args:
+            start: Start of the range (inclusive), or None for the first row.
+            end: End of the range, or None for the last row.
+            include_end (bool): Whether rows at exactly `end` are included.
+
+        Returns:
+            DataFrame: Positional slice of the sorted data.
+        """
+        lo, hi = self.bounds(start, end, include_end=include_end)
+        return self.data.iloc[lo:hi]
+
+    def count(self, start=None, end=None, include_end=True):
+        """
+        Count the rows within a time range.
+
+        Args:
+            start: Start of the range (inclusive), or None for the first row.
+            end: End of the range, or None for the last row.
+            include_end (bool): Whether rows at exactly `end` are included.
+
+        Returns:
+            int: Number of rows in the range.
+        """
+        lo, hi = self.bounds(start, end, include_end=include_end)
+        return hi - lo
@@ -12,6 +12,14 @@ import seaborn as sns
 from datetime import datetime, timedelta
 import logging
 
+from .time_index import TimeIndex
+from .range_statistics import RangeStatistics
+from .period_comparison import PeriodComparator
+from .rolling_metrics import RollingWindow
+from .grid_aggregation import aggregate_grid, time_codes
+from .downsampling import downsample_frame, DEFAULT_POINT_BUDGET
+from .change_points import pelt_change_points, cusum_change_points, regime_table, CHANGE_POINT_METHODS
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -20,6 +28,23 @@ class TimelineAnalyzer:
     Class for analyzing time-based patterns in image processing data.
     """
     
+    # Weekday labels by dayofweek code (0 = Monday)
+    WEEKDAY_LABELS = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag']
+    
+    # Colorbar labels for the heatmap layers
+    LAYER_LABELS = {
+        'mean': 'Average Processing Delay (minutes)',
+        'count': 'Number of Images',
+        'max': 'Maximum Processing Delay (minutes)'
+    }
+    
+    # Titles for the heatmap layers
+    LAYER_TITLES = {
+        'mean': 'Average Processing Delays by Weekday and Hour',
+        'count': 'Image Counts by Weekday and Hour',
+        'max': 'Maximum Processing Delays by Weekday and Hour'
+    }
+    
     def __init__(self, db_connection=None):
         """
         Initialize the TimelineAnalyzer.
@@ -29,23 +54,31 @@ class TimelineAnalyzer:
         """
         self.db_connection = db_connection
         self.data = None
+        self.time_index = None
+        self.range_statistics = None
+        self.period_comparator = None
         self.time_granularity = 'hour'  # Default granularity
         self.available_granularities = ['minute', 'hour', 'day', 'week', 'month', 'year']
     
-    def load_data(self, data=None, date_range=None):
+    def load_data(self, data=None, date_range=None, copy=True, after_id=None):
         """
         Load data for analysis, either from a DataFrame or from the database.
         
         Args:
             data (DataFrame): DataFrame containing image processing data.
             date_range (tuple): Start and end date for filtering.
+            copy (bool): Whether to copy a provided DataFrame; pass False to
+                         share a snapshot that no caller modifies.
+            after_id (int): Only load rows with a higher id (e.g. rows imported
+                            after a watermark).
             
         Returns:
             bool: Success status of the operation.
         """
         if data is not None:
             # Data provided directly
-            self.data = data.copy()
+            self.data = data.copy() if copy else data
+            self._build_time_index()
             logger.info(f"Loaded {len(self.data)} rows from provided DataFrame")
             return True
             
@@ -53,17 +86,28 @@ class TimelineAnalyzer:
             # Fetch data from database
             query = """
                 SELECT 
-                    bildankunft_timestamp, activation_timestamp, 
+                    id, bildankunft_timestamp, activation_timestamp, 
                     processing_delay_minutes, weekday, hour, date
                 FROM image_data
             """
             
-            # Add date filtering if specified
-            params = None
+            # Add date filtering if specified (an open end date has no upper bound)
+            conditions = []
+            params = []
             if date_range:
                 start_date, end_date = date_range
-                query += " WHERE date BETWEEN ? AND ?"
-                params = (start_date, end_date)
+                if end_date is None:
+                    conditions.append("date >= ?")
+                    params.append(start_date)
+                else:
+                    conditions.append("date BETWEEN ? AND ?")
+                    params.extend([start_date, end_date])
+            if after_id is not None:
+                conditions.append("id > ?")
+                params.append(int(after_id))
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            params = tuple(params) or None
             
             # Execute query
             try:
@@ -74,6 +118,7 @@ class TimelineAnalyzer:
                     if col in self.data.columns:
                         self.data[col] = pd.to_datetime(self.data[col])
                 
+                self._build_time_index()
                 logger.info(f"Loaded {len(self.data)} rows from database")
                 return True
                 
@@ -84,6 +129,81 @@ class TimelineAnalyzer:
             logger.error("No data source provided")
             return False
     
+    def _build_time_index(self):
+        """
+        Sort the loaded data by arrival time and build the time index over it.
+        """
+        self.time_index = None
+        self.range_statistics = None
+        self.period_comparator = None
+        if self.data is None or 'bildankunft_timestamp' not in self.data.columns:
+            return
+            
+        self.time_index = TimeIndex(self.data, time_column='bildankunft_timestamp')
+        self.data = self.time_index.data
+    
+    def get_period_data(self, start=None, end=None, include_end=True):
+        """
+        Get the rows of a time period as a slice of the time-sorted data.
+        
+        Args:
+            start: Start of the period (inclusive), or None for the first row.
+            end: End of the period, or None for the last row.
+            include_end (bool): Whether rows at exactly `end` are included.
+            
+        Returns:
+            DataFrame: Rows within the period, or None if no data is loaded.
+        """
+        if self.data is None:
+            logger.error("No data loaded")
+            return None
+            
+        if self.time_index is None or self.time_index.data is not self.data:
+            self._build_time_index()
+            if self.time_index is None:
+                logger.error("Required column 'bildankunft_timestamp' not found")
+                return None
+            
+        return self.time_index.slice(start, end, include_end=include_end)
+    
+    def get_range_statistics(self):
+        """
+        Get the prefix-sum statistics index over the time-sorted processing delays.
+        
+        Returns:
+            RangeStatistics: Index answering count, mean, std, min and max
+                             for any time range, or None if no data is loaded.
+        """
+        if self.get_period_data() is None:
+            return None
+            
+        if self.range_statistics is None or self.range_statistics.time_index is not self.time_index:
+            self.range_statistics = RangeStatistics(self.time_index, value_column='processing_delay_minutes')
+            
+        return self.range_statistics
+    
+    def get_period_statistics(self, start=None, end=None, include_end=True, extremes=True):
+        """
+        Get processing delay statistics for a time period without scanning it.
+        
+        Args:
+            start: Start of the period (inclusive), or None for the first row.
+            end: End of the period, or None for the last row.
+            include_end (bool): Whether rows at exactly `end` are included.
+            extremes (bool): Whether to include min and max.
+            
+        Returns:
+            dict: Row count plus count, sum, mean and std (plus min and max) of the delays.
+        """
+        range_statistics = self.get_range_statistics()
+        if range_statistics is None:
+            return None
+            
+        lo, hi = self.time_index.bounds(start, end, include_end=include_end)
+        period_statistics = range_statistics.query_positions(lo, hi, extremes=extremes)
+        period_statistics['rows'] = hi - lo
+        return period_statistics
+    
     def set_time_granularity(self, granularity):
         """
         Set the time granularity for analysis.
@@ -102,10 +222,37 @@ class TimelineAnalyzer:
         logger.info(f"Time granularity set to {granularity}")
         return True
     
-    def _group_by_time(self):
+    def _floor_to_group(self, timestamps):
+        """
+        Get the time group each timestamp falls into at the current granularity.
+        
+        Args:
+            timestamps (Series): Datetime series.
+            
+        Returns:
+            Series: Start times of the time groups.
+        """
+        if self.time_granularity == 'minute':
+            return timestamps.dt.floor('min')
+        elif self.time_granularity == 'hour':
+            return timestamps.dt.floor('H')
+        elif self.time_granularity == 'day':
+            return timestamps.dt.floor('D')
+        elif self.time_granularity == 'week':
+            return timestamps.dt.to_period('W').dt.start_time
+        elif self.time_granularity == 'month':
+            return timestamps.dt.to_period('M').dt.start_time
+        elif self.time_granularity == 'year':
+            return timestamps.dt.to_period('Y').dt.start_time
+    
+    def _group_by_time(self, start=None, end=None):
         """
         Group data by the current time granularity.
         
+        Args:
+            start: Only group the time groups from the one containing start.
+            end: Only group the time groups up to the one containing end.
+        
         Returns:
             DataFrame: Grouped data.
         """
@@ -113,8 +260,19 @@ class TimelineAnalyzer:
             logger.error("No data loaded")
             return None
             
-        # Create copy to avoid modifying original
-        df = self.data.copy()
+        if start is None and end is None:
+            # Create copy to avoid modifying original
+            df = self.data.copy()
+        else:
+            # Widen the period to whole time groups, so edge groups are complete
+            if start is not None:
+                start = self._floor_to_group(pd.Series([pd.Timestamp(start)])).iloc[0]
+            if end is not None:
+                end = self._time_group_ends(self._floor_to_group(pd.Series([pd.Timestamp(end)]))).iloc[0]
+            period_data = self.get_period_data(start, end)
+            if period_data is None:
+                return None
+            df = period_data.copy()
         
         # Ensure bildankunft_timestamp is datetime
         if 'bildankunft_timestamp' in df.columns:
@@ -125,18 +283,7 @@ class TimelineAnalyzer:
             return None
         
         # Group by time according to granularity
-        if self.time_granularity == 'minute':
-            df['time_group'] = df['bildankunft_timestamp'].dt.floor('min')
-        elif self.time_granularity == 'hour':
-            df['time_group'] = df['bildankunft_timestamp'].dt.floor('H')
-        elif self.time_granularity == 'day':
-            df['time_group'] = df['bildankunft_timestamp'].dt.floor('D')
-        elif self.time_granularity == 'week':
-            df['time_group'] = df['bildankunft_timestamp'].dt.to_period('W').dt.start_time
-        elif self.time_granularity == 'month':
-            df['time_group'] = df['bildankunft_timestamp'].dt.to_period('M').dt.start_time
-        elif self.time_granularity == 'year':
-            df['time_group'] = df['bildankunft_timestamp'].dt.to_period('Y').dt.start_time
+        df['time_group'] = self._floor_to_group(df['bildankunft_timestamp'])
         
         # Group by the time group
         grouped = df.groupby('time_group').agg({
@@ -151,15 +298,19 @@ class TimelineAnalyzer:
         
         return grouped
     
-    def analyze_time_pattern(self):
+    def analyze_time_pattern(self, start=None, end=None):
         """
         Analyze processing time patterns based on the current granularity.
         
+        Args:
+            start: Start of the period to analyze (default: first row).
+            end: End of the period to analyze (default: last row).
+        
         Returns:
             DataFrame: Analysis results.
         """
         # Group data by time
-        grouped_data = self._group_by_time()
+        grouped_data = self._group_by_time(start=start, end=end)
         
         if grouped_data is None:
             return None
@@ -167,10 +318,131 @@ class TimelineAnalyzer:
         logger.info(f"Analyzed time patterns with {len(grouped_data)} {self.time_granularity} groups")
         return grouped_data
     
-    def analyze_weekday_hour_pattern(self):
+    def _time_group_ends(self, time_groups):
+        """
+        Get the last instant of each time group at the current granularity.
+        
+        Args:
+            time_groups (Series): Start times of the time groups.
+            
+        Returns:
+            Series: End times of the time groups.
+        """
+        time_groups = pd.Series(pd.to_datetime(time_groups)).reset_index(drop=True)
+        fixed_lengths = {
+            'minute': pd.Timedelta(minutes=1),
+            'hour': pd.Timedelta(hours=1),
+            'day': pd.Timedelta(days=1)
+        }
+        
+        if self.time_granularity in fixed_lengths:
+            return time_groups + fixed_lengths[self.time_granularity] - pd.Timedelta(1, unit='ns')
+            
+        frequency = {'week': 'W', 'month': 'M', 'year': 'Y'}[self.time_granularity]
+        return time_groups.dt.to_period(frequency).dt.end_time
+    
+    def rolling_metrics(self, window='24h', quantile=0.95, time_groups=None):
+        """
+        Compute rolling-window trend metrics of the processing delays.
+        
+        Each time group is evaluated over the window ending with the group,
+        so the results line up with analyze_time_pattern().
+        
+        Args:
+            window (str): Window length (e.g. '1h', '24h', '7d').
+            quantile (float): Quantile to track alongside the moving average.
+            time_groups (Series): Time groups to evaluate, defaults to the
+                                  groups at the current granularity.
+            
+        Returns:
+            DataFrame: time_group plus rolling count, mean, std and quantile.
+        """
+        data = self.get_period_data()
+        if data is None:
+            return None
+            
+        if time_groups is None:
+            grouped_data = self._group_by_time()
+            if grouped_data is None:
+                return None
+            time_groups = grouped_data['time_group']
+            
+        try:
+            rolling_window = RollingWindow(window=window, quantile=quantile)
+            rolling = rolling_window.update(
+                data['bildankunft_timestamp'],
+                data['processing_delay_minutes'],
+                evaluate_at=self._time_group_ends(time_groups)
+            )
+            
+            rolling.columns = [f"rolling_{col}" for col in rolling.columns]
+            rolling.insert(0, 'time_group', pd.Series(time_groups).to_numpy())
+            rolling = rolling.reset_index(drop=True)
+            
+            logger.info(f"Computed {window} rolling metrics for {len(rolling)} {self.time_granularity} groups")
+            return rolling
+            
+        except Exception as e:
+            logger.error(f"Error computing rolling metrics: {str(e)}")
+            return None
+    
+    def detect_change_points(self, metric='mean', method='pelt', penalty=None, min_size=5,
+                             threshold=None, drift=0.5):
+        """
+        Detect regime changes in the time pattern series at the current granularity.
+        
+        Args:
+            metric (str): Metric of the series ('count', 'mean', 'median', 'min', 'max').
+            method (str): 'pelt' (penalised segmentation) or 'cusum'.
+            penalty (float): PELT cost of one change point (default: 2 * log(n)).
+            min_size (int): Minimum number of time groups per regime.
+            threshold (float): CUSUM alarm level in units of the noise level
+                               (default: log of the series length, at least 5).
+            drift (float): CUSUM slack per time group in units of the noise level.
+            
+        Returns:
+            DataFrame: One row per regime boundary with before/after statistics.
+        """
+        if method not in CHANGE_POINT_METHODS:
+            logger.error(f"Invalid method '{method}'. Valid options: {list(CHANGE_POINT_METHODS)}")
+            return None
+            
+        time_patterns = self.analyze_time_pattern()
+        if time_patterns is None:
+            return None
+            
+        column_name = f"processing_delay_minutes_{metric}"
+        if column_name not in time_patterns.columns:
+            logger.error(f"Invalid metric '{metric}'")
+            return None
+            
+        series = time_patterns[['time_group', column_name]].dropna()
+        values = series[column_name].to_numpy(dtype='float64')
+        
+        try:
+            if method == 'pelt':
+                change_points = pelt_change_points(values, penalty=penalty, min_size=min_size)
+            else:
+                change_points = cusum_change_points(values, threshold=threshold, drift=drift, min_size=min_size)
+                
+        except Exception as e:
+            logger.error(f"Error detecting change points: {str(e)}")
+            return None
+            
+        logger.info(f"Detected {len(change_points)} change points in {len(values)} {self.time_granularity} groups ({method})")
+        return regime_table(series['time_group'], values, change_points)
+    
+    def analyze_weekday_hour_pattern(self, layer='mean'):
         """
         Create a heatmap of processing times by weekday and hour.
         
+        Weekdays and hours are derived from the arrival timestamps as integer
+        codes, so the result does not depend on the locale the weekday names
+        were stored with.
+        
+        Args:
+            layer (str): Aggregation per cell ('mean', 'count' or 'max').
+            
         Returns:
             DataFrame: Pivot table of processing times by weekday and hour.
         """
@@ -178,38 +450,49 @@ class TimelineAnalyzer:
             logger.error("No data loaded")
             return None
             
-        # Create weekday-hour pivot table
+        # Create weekday-hour grid
         try:
-            pivot_table = pd.pivot_table(
-                self.data,
-                values='processing_delay_minutes',
-                index='weekday',
-                columns='hour',
-                aggfunc='mean',
+            data = self.get_period_data()
+            arrivals = data['bildankunft_timestamp']
+            
+            grid = aggregate_grid(
+                time_codes(arrivals, 'weekday'),
+                time_codes(arrivals, 'hour'),
+                data['processing_delay_minutes'].to_numpy(dtype='float64'),
+                shape=(7, 24),
+                layer=layer,
                 fill_value=0
             )
             
-            # Sort weekdays in correct order
-            weekday_order = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag']
-            pivot_table = pivot_table.reindex(weekday_order)
+            pivot_table = pd.DataFrame(grid, index=self.WEEKDAY_LABELS, columns=range(24))
+            pivot_table.index.name = 'weekday'
+            pivot_table.columns.name = 'hour'
             
-            logger.info("Created weekday-hour pattern analysis")
+            logger.info(f"Created weekday-hour pattern analysis ({layer})")
             return pivot_table
             
         except Exception as e:
             logger.error(f"Error creating weekday-hour pattern: {str(e)}")
             return None
     
-    def plot_timeline(self, metric='mean', figsize=(15, 8), title=None, color='blue', save_path=None):
+    def plot_timeline(self, metric='mean', figsize=(15, 8), title=None, color='blue', save_path=None,
+                      rolling_window=None, rolling_quantile=0.95, max_points=DEFAULT_POINT_BUDGET, dpi=300):
         """
         Plot a timeline of processing delays.
         
+        Series longer than max_points are downsampled with LTTB, which keeps
+        their shape including peaks and spikes.
+        
         Args:
             metric (str): Metric to plot ('count', 'mean', 'median', 'min', 'max').
             figsize (tuple): Figure size.
             title (str): Plot title.
             color (str): Line color.
             save_path (str): Path to save the figure.
+            rolling_window (str): Window for rolling trend lines (e.g. '1h', '24h', '7d'), or None.
+            rolling_quantile (float): Quantile of the rolling trend lines.
+            max_points (int): Point budget per line, or None to draw every point.
+            dpi (int): Resolution of the saved figure.
             
         Returns:
             matplotlib.figure.Figure: The created figure.
@@ -228,7 +511,24 @@ class TimelineAnalyzer:
             logger.error(f"Metric '{metric}' not available")
             return None
             
-        ax.plot(grouped_data['time_group'], grouped_data[column_name], '-o', color=color)
+        # Downsample long series to the point budget, dropping markers once they would overlap
+        plot_data = downsample_frame(grouped_data, 'time_group', column_name, max_points=max_points)
+        line_style = '-o' if len(plot_data) == len(grouped_data) else '-'
+        ax.plot(plot_data['time_group'], plot_data[column_name], line_style, color=color)
+        
+        # Add rolling trend lines if requested
+        if rolling_window:
+            rolling = self.rolling_metrics(window=rolling_window, quantile=rolling_quantile,
+                                           time_groups=grouped_data['time_group'])
+            if rolling is not None:
+                quantile_column = rolling.columns[-1]
+                rolling_mean = downsample_frame(rolling, 'time_group', 'rolling_mean', max_points=max_points)
+                rolling_quantile_line = downsample_frame(rolling, 'time_group', quantile_column, max_points=max_points)
+                ax.plot(rolling_mean['time_group'], rolling_mean['rolling_mean'], '-', color='darkorange',
+                        label=f"{rolling_window} moving average")
+                ax.plot(rolling_quantile_line['time_group'], rolling_quantile_line[quantile_column], '--', color='red',
+                        label=f"{rolling_window} {quantile_column.replace('rolling_', '')}")
+                ax.legend()
         
         # Set title and labels
         ax.set_title(title or f"{metric.capitalize()} Processing Delay by {self.time_granularity.capitalize()}")
@@ -246,12 +546,12 @@ class TimelineAnalyzer:
         
         # Save figure if path provided
         if save_path:
-            plt.savefig(save_path, bbox_inches='tight', dpi=300)
+            fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
             logger.info(f"Saved timeline plot to {save_path}")
         
         return fig
     
-    def plot_weekday_hour_heatmap(self, figsize=(15, 8), cmap='YlOrRd', save_path=None):
+    def plot_weekday_hour_heatmap(self, figsize=(15, 8), cmap='YlOrRd', save_path=None, layer='mean', dpi=300):
         """
         Plot a heatmap of processing delays by weekday and hour.
         
@@ -259,12 +559,14 @@ class TimelineAnalyzer:
             figsize (tuple): Figure size.
             cmap (str): Colormap name.
             save_path (str): Path to save the figure.
+            layer (str): Aggregation per cell ('mean', 'count' or 'max').
+            dpi (int): Resolution of the saved figure.
             
         Returns:
             matplotlib.figure.Figure: The created figure.
         """
         # Get weekday-hour pivot table
-        pivot_table = self.analyze_weekday_hour_pattern()
+        pivot_table = self.analyze_weekday_hour_pattern(layer=layer)
         
         if pivot_table is None:
             return None
@@ -277,12 +579,12 @@ class TimelineAnalyzer:
             cmap=cmap,
             annot=True,
             fmt='.0f',
-            cbar_kws={'label': 'Average Processing Delay (minutes)'},
+            cbar_kws={'label': self.LAYER_LABELS.get(layer, layer)},
             ax=ax
         )
         
         # Set title and labels
-        ax.set_title('Average Processing Delays by Weekday and Hour')
+        ax.set_title(self.LAYER_TITLES.get(layer, f"{layer.capitalize()} by Weekday and Hour"))
         ax.set_xlabel('Hour of Day')
         ax.set_ylabel('Weekday')
         
@@ -291,7 +593,7 @@ class TimelineAnalyzer:
         
         # Save figure if path provided
         if save_path:
-            plt.savefig(save_path, bbox_inches='tight', dpi=300)
+            fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
             logger.info(f"Saved heatmap to {save_path}")
         
         return fig
@@ -317,44 +619,38 @@ class TimelineAnalyzer:
             start1, end1 = period1
             start2, end2 = period2
             
-            # Ensure bildankunft_timestamp is datetime
-            if not pd.api.types.is_datetime64_any_dtype(self.data['bildankunft_timestamp']):
-                self.data['bildankunft_timestamp'] = pd.to_datetime(self.data['bildankunft_timestamp'])
-            
-            period1_data = self.data[
-                (self.data['bildankunft_timestamp'] >= start1) & 
-                (self.data['bildankunft_timestamp'] <= end1)
-            ]
-            
-            period2_data = self.data[
-                (self.data['bildankunft_timestamp'] >= start2) & 
-                (self.data['bildankunft_timestamp'] <= end2)
-            ]
+            # Look up each period from the prefix-sum index
+            # Min and max need the block index, so they are only looked up when compared
+            extremes = metric in ('min', 'max')
+            period1_stats = self.get_period_statistics(start1, end1, extremes=extremes)
+            period2_stats = self.get_period_statistics(start2, end2, extremes=extremes)
             
             # Calculate statistics
             if metric == 'count':
-                stat1 = len(period1_data)
-                stat2 = len(period2_data)
-                diff = stat2 - stat1
-                pct_change = (diff / stat1 * 100) if stat1 > 0 else float('inf')
+                stat1 = period1_stats['rows']
+                stat2 = period2_stats['rows']
+            elif metric in RangeStatistics.METRICS:
+                stat1 = period1_stats[metric]
+                stat2 = period2_stats[metric]
             else:
-                stat1 = getattr(period1_data['processing_delay_minutes'], metric)()
-                stat2 = getattr(period2_data['processing_delay_minutes'], metric)()
-                diff = stat2 - stat1
-                pct_change = (diff / stat1 * 100) if stat1 > 0 else float('inf')
+                # Order statistics such as the median still need the period rows
+                stat1 = getattr(self.get_period_data(start1, end1)['processing_delay_minutes'], metric)()
+                stat2 = getattr(self.get_period_data(start2, end2)['processing_delay_minutes'], metric)()
+            diff = stat2 - stat1
+            pct_change = (diff / stat1 * 100) if stat1 > 0 else float('inf')
             
             comparison = {
                 'period1': {
                     'start': start1,
                     'end': end1,
                     'value': stat1,
-                    'count': len(period1_data)
+                    'count': period1_stats['rows']
                 },
                 'period2': {
                     'start': start2,
                     'end': end2,
                     'value': stat2,
-                    'count': len(period2_data)
+                    'count': period2_stats['rows']
                 },
                 'difference': diff,
                 'percent_change': pct_change
@@ -365,4 +661,29 @@ class TimelineAnalyzer:
             
         except Exception as e:
             logger.error(f"Error comparing time periods: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+    
+    def compare_period_matrix(self, granularity='week', against='previous', metrics=('count', 'mean')):
+        """
+        Compare every period with its previous period or the same period last year.
+        
+        Args:
+            granularity (str): Period size ('day', 'week', 'month', 'quarter', 'year').
+            against (str): Baseline to compare with ('previous' or 'last_year').
+            metrics (tuple): Metrics to compare ('count', 'sum', 'mean', 'std', 'min', 'max').
+            
+        Returns:
+            DataFrame: Comparison table with one row per period.
+        """
+        if self.get_period_data() is None:
+            return None
+            
+        if self.period_comparator is None or self.period_comparator.time_index is not self.time_index:
+            self.period_comparator = PeriodComparator(self.time_index, value_column='processing_delay_minutes')
+            
+        try:
+            return self.period_comparator.compare(granularity=granularity, against=against, metrics=metrics)
+            
+        except Exception as e:
+            logger.error(f"Error comparing periods: {str(e)}")
+            return None
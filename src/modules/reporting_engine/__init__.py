@@ -0,0 +1,10 @@
+"""
+Reporting Engine Module
+
+This module renders batches of report figures for the image
+distribution analysis system.
+"""
+
+from .batch_renderer import BatchRenderer
+
+__all__ = ['BatchRenderer'] 
@@ -0,0 +1,195 @@
+"""
+Batch Renderer
+
+This module renders report figure sets (timelines for all granularities and
+metrics, plus per-month heatmaps) in a pool of worker processes that share
+one loaded dataset.
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Per-process analyzer, created once per worker from the shared dataset
+_worker_analyzer = None
+
+def _init_worker(data, log_level):
+    """
+    Initialize a worker process with the Agg backend and the shared dataset.
+
+    Args:
+        data (DataFrame): Dataset shared by all jobs of the batch.
+        log_level (int): Logging level of the parent process.
+    """
+    global _worker_analyzer
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from ..interactive_analysis.timeline_analyzer import TimelineAnalyzer
+
+    # The dataset was sorted once in the parent, so this only wraps it
+    _worker_analyzer = TimelineAnalyzer()
+    _worker_analyzer.load_data(data=data)
+
+def _render_job(job):
+    """
+    Render one figure of a batch in a worker process.
+
+    Args:
+        job (dict): Job description created by BatchRenderer.build_jobs().
+
+    Returns:
+        dict: The job with its 'success' flag and render 'seconds'.
+    """
+    import matplotlib.pyplot as plt
+    from ..interactive_analysis.timeline_analyzer import TimelineAnalyzer
+
+    started = time.perf_counter()
+    fig = None
+
+    try:
+        if job['kind'] == 'timeline':
+            _worker_analyzer.set_time_granularity(job['granularity'])
+            fig = _worker_analyzer.plot_timeline(
+                metric=job['metric'],
+                title=f"{job['metric'].capitalize()} Processing Delay by {job['granularity'].capitalize()}",
+                save_path=job['path'],
+                dpi=job['dpi']
+            )
+
+        elif job['kind'] == 'heatmap':
+            analyzer = _worker_analyzer
+            if job.get('start') is not None:
+                # Heatmap of a single month, sliced from the sorted dataset
+                analyzer = TimelineAnalyzer()
+                analyzer.load_data(data=_worker_analyzer.get_period_data(job['start'], job['end'], include_end=False))
+            fig = analyzer.plot_weekday_hour_heatmap(save_path=job['path'], dpi=job['dpi'])
+
+        success = fig is not None
+
+    except Exception as e:
+        logger.error(f"Error rendering {job['path']}: {str(e)}")
+        success = False
+
+    finally:
+        if fig is not None:
+            plt.close(fig)
+
+    return dict(job, success=success, seconds=time.perf_counter() - started)
+
+class BatchRenderer:
+    """
+    Class for rendering report figure sets in parallel.
+    """
+
+    def __init__(self, data, output_dir='output', workers=None, dpi=300):
+        """
+        Initialize the BatchRenderer.
+
+        Args:
+            data (DataFrame): Loaded image processing data shared by all figures.
+            output_dir (str): Directory to save the figures in.
+            workers (int): Number of worker processes (default: number of CPUs).
+            dpi (int): Resolution of the saved figures.
+        """
+        self.data = data
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.dpi = dpi
+
+    def build_jobs(self, granularities, metrics, heatmap=True, monthly_heatmaps=True):
+        """
+        Build the job list of a report.
+
+        Args:
+            granularities (list): Time granularities of the timeline plots.
+            metrics (list): Metrics of the timeline plots.
+            heatmap (bool): Whether to render the weekday-hour heatmap of all data.
+            monthly_heatmaps (bool): Whether to render one heatmap per month.
+
+        Returns:
+            list: Job descriptions.
+        """
+        jobs = []
+
+        for granularity in granularities:
+            for metric in metrics:
+                jobs.append({
+                    'kind': 'timeline',
+                    'granularity': granularity,
+                    'metric': metric,
+                    'path': os.path.join(self.output_dir, f"timeline_{granularity}_{metric}.png"),
+                    'dpi': self.dpi
+                })
+
+        if heatmap:
+            jobs.append({
+                'kind': 'heatmap',
+                'start': None,
+                'end': None,
+                'path': os.path.join(self.output_dir, "weekday_hour_heatmap.png"),
+                'dpi': self.dpi
+            })
+
+        if monthly_heatmaps and not self.data.empty:
+            arrivals = self.data['bildankunft_timestamp'].dropna()
+            for month in pd.PeriodIndex(arrivals, freq='M').unique().sort_values():
+                jobs.append({
+                    'kind': 'heatmap',
+                    'start': month.start_time,
+                    'end': (month + 1).start_time,
+                    'path': os.path.join(self.output_dir, f"weekday_hour_heatmap_{month.strftime('%Y-%m')}.png"),
+                    'dpi': self.dpi
+                })
+
+        return jobs
+
+    def render(self, jobs):
+        """
+        Render all jobs in a process pool.
+
+        Args:
+            jobs (list): Job descriptions from build_jobs().
+
+        Returns:
+            list: The jobs with their 'success' flag and render 'seconds'.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        if not jobs:
+            logger.warning("No figures to render")
+            return []
+
+        # Sort once here so the workers only wrap the shared dataset
+        data = self.data
+        if 'bildankunft_timestamp' in data.columns and not data['bildankunft_timestamp'].is_monotonic_increasing:
+            data = data.sort_values('bildankunft_timestamp', kind='mergesort', na_position='first')
+
+        workers = min(self.workers, len(jobs))
+        logger.info(f"Rendering {len(jobs)} figures with {workers} worker processes")
+        started = time.perf_counter()
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data, logging.getLogger().level)) as executor:
+            futures = [executor.submit(_render_job, job) for job in jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if result['success']:
+                    logger.info(f"Rendered {result['path']} in {result['seconds']:.1f}s")
+                else:
+                    logger.error(f"Failed to render {result['path']}")
+
+        failed = sum(1 for result in results if not result['success'])
+        logger.info(f"Rendered {len(results) - failed} of {len(results)} figures in {time.perf_counter() - started:.1f}s")
+        return results
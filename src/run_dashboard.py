@@ -12,6 +12,7 @@ import os
 import sys
 import logging
 import argparse
+import tempfile
 from modules.data_preparation.database import Database
 from modules.interactive_analysis.timeline_analyzer import TimelineAnalyzer
 from modules.interactive_analysis.anomaly_detector import AnomalyDetector
@@ -54,6 +55,37 @@ def parse_arguments():
         help="Run the dashboard in debug mode"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes serving the dashboard (default: 1); with more "
+             "than one, each request runs in its own process, so identical requests are "
+             "not coalesced and superseded requests are not cancelled"
+    )
+    
+    parser.add_argument(
+        "--dataset-dir",
+        type=str,
+        default=None,
+        help="Directory for the memory-mapped datasets shared by the workers "
+             "(default: a temporary directory when --workers is above 1)"
+    )
+    
+    parser.add_argument(
+        "--job-dir",
+        type=str,
+        default=None,
+        help="Directory of a local job queue to run long computations as background "
+             "jobs with progress reporting (requires diskcache)"
+    )
+    
+    parser.add_argument(
+        "--no-warm-up",
+        action="store_true",
+        help="Start without precomputing the views of the date range options"
+    )
+    
     return parser.parse_args()
 
 def main():
@@ -83,18 +115,31 @@ def main():
         logger.info("Initializing anomaly detector")
         anomaly_detector = AnomalyDetector(db_connection=db)
         
+        # Workers map one shared copy of each selected dataset
+        dataset_dir = args.dataset_dir
+        if args.workers > 1 and not dataset_dir:
+            dataset_dir = tempfile.mkdtemp(prefix="dashboard-datasets-")
+        if dataset_dir:
+            logger.info(f"Sharing datasets between workers in: {dataset_dir}")
+        
         # Initialize dashboard
         logger.info("Initializing dashboard")
         dashboard = Dashboard(
             db_connection=db,
             timeline_analyzer=timeline_analyzer,
-            anomaly_detector=anomaly_detector
+            anomaly_detector=anomaly_detector,
+            dataset_dir=dataset_dir,
+            job_dir=args.job_dir
         )
         
         # Run the dashboard
         logger.info(f"Starting dashboard on port {args.port}")
         app = dashboard.initialize_app()
         
+        # Fill the caches in the background while the server starts
+        if not args.no_warm_up:
+            dashboard.warm_up()
+        
         # Display access instructions
         url = f"http://127.0.0.1:{args.port}"
         logger.info("=" * 60)
@@ -104,7 +149,7 @@ def main():
         logger.info("=" * 60)
         
         # Start the server
-        dashboard.run_server(debug=args.debug, port=args.port)
+        dashboard.run_server(debug=args.debug, port=args.port, processes=args.workers)
         
     except Exception as e:
         logger.error(f"Error running dashboard: {str(e)}")